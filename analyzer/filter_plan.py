@@ -0,0 +1,120 @@
+# analyzer/filter_plan.py
+
+import fnmatch
+import hashlib
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, Optional, Pattern, Tuple
+
+
+GLOB_CHARS = set("*?[")
+
+
+def _normalize_extension(ext: str) -> str:
+    ext = ext.strip().lower()
+    if ext and not ext.startswith("."):
+        ext = "." + ext
+    return ext
+
+
+@dataclass(frozen=True)
+class FilterPlan:
+    """
+    Скомпилированные фильтры анализа.
+
+    Неизменяемый и хешируемый: строится один раз из настроек шаблона,
+    после чего проверки имён — это поиск в множествах и одно регулярное
+    выражение для масок файлов. Свойство key — стабильный между запусками
+    отпечаток фильтров, пригодный как ключ кэша результатов.
+    """
+
+    ignored_dirs: FrozenSet[str] = frozenset()
+    ignored_files: FrozenSet[str] = frozenset()
+    ignored_file_globs: Tuple[str, ...] = ()
+    allowed_extensions: FrozenSet[str] = frozenset()
+
+    _glob_regex: Optional[Pattern] = field(default=None, compare=False, repr=False)
+    _key: str = field(default="", compare=False, repr=False)
+
+    def __post_init__(self):
+        if self.ignored_file_globs:
+            pattern = "|".join(fnmatch.translate(g) for g in self.ignored_file_globs)
+            object.__setattr__(self, "_glob_regex", re.compile(pattern))
+
+        canonical = json.dumps(self.to_settings(), sort_keys=True, ensure_ascii=False)
+        object.__setattr__(
+            self, "_key", hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:16]
+        )
+
+    # =====================
+    # Построение
+    # =====================
+
+    @classmethod
+    def from_lists(
+        cls,
+        ignored_dirs: Optional[Iterable[str]] = None,
+        ignored_files: Optional[Iterable[str]] = None,
+        allowed_extensions: Optional[Iterable[str]] = None,
+    ) -> "FilterPlan":
+        names = set()
+        globs = set()
+        for name in ignored_files or []:
+            name = name.strip()
+            if not name:
+                continue
+            if GLOB_CHARS & set(name):
+                globs.add(name)
+            else:
+                names.add(name)
+
+        return cls(
+            ignored_dirs=frozenset(d.strip() for d in ignored_dirs or [] if d.strip()),
+            ignored_files=frozenset(names),
+            ignored_file_globs=tuple(sorted(globs)),
+            allowed_extensions=frozenset(
+                ext for ext in map(_normalize_extension, allowed_extensions or []) if ext
+            ),
+        )
+
+    @classmethod
+    def from_settings(cls, settings: Dict) -> "FilterPlan":
+        """Строит план из словаря настроек шаблона/истории"""
+        return cls.from_lists(
+            settings.get("ignored_dirs"),
+            settings.get("ignored_files"),
+            settings.get("allowed_extensions"),
+        )
+
+    # =====================
+    # Проверки
+    # =====================
+
+    def is_dir_pruned(self, name: str) -> bool:
+        return name in self.ignored_dirs
+
+    def is_file_ignored(self, name: str) -> bool:
+        if name in self.ignored_files:
+            return True
+        return self._glob_regex is not None and self._glob_regex.match(name) is not None
+
+    def is_extension_allowed(self, suffix: str) -> bool:
+        """suffix — расширение файла в нижнем регистре (как Path.suffix.lower())"""
+        return not self.allowed_extensions or suffix in self.allowed_extensions
+
+    # =====================
+    # Ключ кэша
+    # =====================
+
+    @property
+    def key(self) -> str:
+        """Стабильный отпечаток фильтров (в отличие от hash(), не зависит от запуска)"""
+        return self._key
+
+    def to_settings(self) -> Dict:
+        return {
+            "ignored_dirs": sorted(self.ignored_dirs),
+            "ignored_files": sorted(self.ignored_files) + list(self.ignored_file_globs),
+            "allowed_extensions": sorted(self.allowed_extensions),
+        }
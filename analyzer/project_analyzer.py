@@ -1,9 +1,107 @@
+import io
+import multiprocessing
 import os
+import posixpath
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Iterable, Optional, Set
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .filter_plan import FilterPlan
+from .snapshot import DirectorySnapshot, SnapshotDir
+from .sources import ProjectSource, open_git_index_source, open_source
+from .transforms import ContentTransforms
+from .tree_model import TreeModel
+from .tree_render import tree_lines
+
+
+# Сколько байт копировать за один системный вызов при сборке результата
+APPEND_CHUNK = 64 * 1024 * 1024
+
+
+def append_file(dst_fd: int, src_fd: int, count: int) -> None:
+    """
+    Дописывает count байт из src_fd в dst_fd (с текущих позиций) средствами
+    ядра — os.copy_file_range, затем os.sendfile, — без копирования данных
+    в Python. Где это недоступно (Windows, разные файловые системы на
+    старых ядрах), копирует блоками через os.read/os.write.
+    """
+    methods = []
+    if hasattr(os, "copy_file_range"):
+        methods.append(lambda n: os.copy_file_range(src_fd, dst_fd, n))
+    if hasattr(os, "sendfile") and sys.platform.startswith("linux"):
+        methods.append(lambda n: os.sendfile(dst_fd, src_fd, None, n))
+
+    for method in methods:
+        try:
+            while count > 0:
+                copied = method(min(count, APPEND_CHUNK))
+                if copied == 0:
+                    return
+                count -= copied
+            return
+        except OSError:
+            # Способ не поддерживается — продолжаем следующим с той же позиции
+            continue
+
+    while count > 0:
+        chunk = os.read(src_fd, min(count, APPEND_CHUNK))
+        if not chunk:
+            return
+        view = memoryview(chunk)
+        while view:
+            view = view[os.write(dst_fd, view):]
+        count -= len(chunk)
+
+
+def _write_shard(
+    root_dir: Path,
+    shard_dir: Path,
+    filter_plan: FilterPlan,
+    shard_file: Path,
+    transform_names: List[str]
+) -> Tuple[int, int, int, Dict[str, int]]:
+    """
+    Исполнитель для ProcessPoolExecutor: пишет раздел содержимого папки
+    shard_dir в shard_file. Возвращает число строк, число файлов и
+    счётчики преобразований.
+    """
+    transforms = ContentTransforms(transform_names) if transform_names else None
+    analyzer = ProjectAnalyzer(
+        root_dir, shard_file, filter_plan=filter_plan, transforms=transforms
+    )
+    analyzer._write_shard_contents(shard_dir)
+
+    if transforms is None:
+        return analyzer.line_count, analyzer.file_count, 0, {}
+    return analyzer.line_count, analyzer.file_count, transforms.bytes_in, transforms.bytes_saved
+
+
+class RunEstimate:
+    """Оценка результата анализа без чтения файлов (ProjectAnalyzer.dry_run)"""
+
+    def __init__(self):
+        self.file_count = 0
+        self.content_bytes = 0
+        # Размер файла результата (точный, если файлы не изменятся)
+        self.output_bytes = 0
+        # По выборке файлов; None — источник не поддерживает выборочное чтение
+        self.line_count: Optional[int] = None
+        self.sampled_files = 0
+        # Время оценки и прогноз времени анализа (секунды)
+        self.scan_time = 0.0
+        self.projected_time: Optional[float] = None
+        # False — обход не уложился в time_limit: значения — нижняя граница
+        self.complete = True
 
 
 class ProjectAnalyzer:
+    # Выборка для оценки числа строк: сколько файлов и сколько байт из каждого
+    SAMPLE_FILES = 64
+    SAMPLE_BYTES = 64 * 1024
+
     def __init__(
         self,
         root_dir: Path,
@@ -11,21 +109,70 @@ class ProjectAnalyzer:
         ignored_dirs: Optional[Iterable[str]] = None,
         ignored_files: Optional[Iterable[str]] = None,
         allowed_extensions: Optional[Iterable[str]] = None,
+        filter_plan: Optional[FilterPlan] = None,
+        source: Optional[ProjectSource] = None,
+        use_git_index: bool = False,
+        include_untracked: bool = False,
+        transforms: Optional[ContentTransforms] = None,
+        workers: int = 1,
+        listing_cache=None,
     ):
+        """
+        Фильтры можно передать списками или готовым FilterPlan
+        (например, из TemplateManager.get_filter_plan); план важнее списков.
+
+        root_dir — папка проекта или архив (.zip, .tar, .tar.gz, ...);
+        архив читается напрямую, без распаковки. source позволяет
+        передать другой источник файлов, например ревизию git-репозитория
+        (см. analyzer/sources.py).
+
+        use_git_index — для папки в git-репозитории брать список файлов
+        из индекса git вместо обхода диска (include_untracked добавляет
+        неотслеживаемые, но не игнорируемые файлы). Вне репозитория
+        папка обходится как обычно.
+
+        transforms — преобразования содержимого перед записью (удаление
+        комментариев, пустых строк и т.п., см. analyzer/transforms.py);
+        сэкономленные байты накапливаются в transforms.bytes_saved.
+
+        workers > 1 — раздел содержимого папки пишется параллельно,
+        по процессу на папку верхнего уровня; порядок и текст результата
+        те же, что при workers=1.
+
+        listing_cache — кэш списков папок для раздела структуры
+        (storage/listing_cache.py): папки, не изменившиеся с прошлого
+        запуска, не перечитываются.
+        """
         self.root_dir: Path = Path(root_dir).resolve()
         self.output_file: Path = Path(output_file).resolve()
 
-        if not self.root_dir.exists() or not self.root_dir.is_dir():
+        if source is None:
+            source = open_source(self.root_dir)
+        if source is None and use_git_index:
+            source = open_git_index_source(self.root_dir, include_untracked)
+        self.source: Optional[ProjectSource] = source
+
+        if source is None and (not self.root_dir.exists() or not self.root_dir.is_dir()):
             raise ValueError(f"Корневая директория не существует: {self.root_dir}")
 
-        self.ignored_dirs: Set[str] = set(ignored_dirs or [])
-        self.ignored_files: Set[str] = set(ignored_files or [])
-        self.allowed_extensions: Set[str] = set(
-            ext.lower() for ext in (allowed_extensions or [])
-        )
+        if filter_plan is None:
+            filter_plan = FilterPlan.from_lists(
+                ignored_dirs, ignored_files, allowed_extensions
+            )
+        self.filter_plan: FilterPlan = filter_plan
+
+        if transforms is not None and transforms.is_empty():
+            transforms = None
+        self.transforms: Optional[ContentTransforms] = transforms
+        self.workers = workers
+        self.listing_cache = listing_cache
 
         self._file = None
 
+        # Заполняются во время run(): число строк и разделов файлов в результате
+        self.line_count = 0
+        self.file_count = 0
+
     # =====================
     # Публичный API
     # =====================
@@ -34,101 +181,382 @@ class ProjectAnalyzer:
         """
         Запускает анализ проекта и записывает результат в output_file.
         """
-        self.output_file.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            self.output_file.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(self.output_file, "w", encoding="utf-8") as f:
-            self._file = f
+            with open(self.output_file, "w", encoding="utf-8") as f:
+                self._file = f
 
-            self._write(f"Анализ проекта: {self.root_dir}\n\n")
-            self._write("Структура проекта:\n")
-            self._print_project_structure(self.root_dir)
-            self._write("\nТекст из файлов проекта:\n")
-            self._print_file_contents(self.root_dir)
-            self._write(
-                f"\nАнализ завершен. Результаты сохранены в {self.output_file}\n"
+                self._write(f"Анализ проекта: {self._title()}\n\n")
+                self._write("Структура проекта:\n")
+                if self.source is None:
+                    self._print_structure_cached()
+                else:
+                    self._print_source_structure(self.source.tree())
+                self._write("\nТекст из файлов проекта:\n")
+                if self.source is None and self.workers > 1:
+                    self._print_file_contents_sharded()
+                elif self.source is None:
+                    self._print_file_contents(self.root_dir)
+                else:
+                    self._print_source_contents(self.source)
+                self._write(self._footer())
+        finally:
+            self._file = None
+            # Архив или процесс git освобождаются и при ошибке анализа
+            self.close()
+
+    def analyze(self) -> TreeModel:
+        """
+        Анализ без записи текста: возвращает модель дерева (TreeModel)
+        с учётом фильтров. Содержимое файлов читается из модели по
+        запросу, текст результата — TreeModel.render()/save().
+        Поддерживаются только папки на диске.
+        """
+        if self.source is not None:
+            raise ValueError("analyze() поддерживает только папки на диске")
+        return TreeModel.build(self.root_dir, self.filter_plan)
+
+    def dry_run(
+        self,
+        bytes_per_second: Optional[float] = None,
+        time_limit: Optional[float] = None,
+        snapshot: Optional[DirectorySnapshot] = None
+    ) -> RunEstimate:
+        """
+        Оценивает результат без анализа: только обход и stat с активными
+        фильтрами. Число строк оценивается по выборке файлов, время —
+        по скорости bytes_per_second (HistoryManager.recent_throughput).
+        После оценки можно вызвать run() или close().
+
+        time_limit — прервать обход папки через столько секунд; оценка
+        тогда неполная (complete=False). snapshot — готовый снимок папки
+        root_dir (например, из предпросмотра фильтров): обход не повторяется.
+        """
+        started = time.perf_counter()
+
+        if snapshot is None and self.source is None:
+            should_stop = None
+            if time_limit is not None:
+                deadline = started + time_limit
+                should_stop = lambda: time.perf_counter() > deadline
+            # Отсечённые папки не обходятся, как и при анализе
+            snapshot = DirectorySnapshot.take(
+                self.root_dir, should_stop, self.filter_plan, partial=True
+            )
+        elif snapshot is None:
+            # Заголовки разделов источника строятся от display_root
+            snapshot = DirectorySnapshot(
+                Path(self.source.display_root), self.source.sized_tree(), 0
             )
+        preview = snapshot.preview(self.filter_plan, max_tree_lines=0, with_files=True)
 
-            self._file = None
+        estimate = RunEstimate()
+        estimate.complete = snapshot.complete
+        estimate.file_count = preview.file_count
+        estimate.content_bytes = preview.content_bytes
+        # Снимок считает заголовок по пути папки; итоговая строка ему неизвестна
+        estimate.output_bytes = (
+            preview.estimated_bytes
+            + len(self._title().encode("utf-8")) - len(str(snapshot.root_dir).encode("utf-8"))
+            + len(self._footer().encode("utf-8"))
+        )
+
+        density = self._sample_line_density(preview.files, estimate)
+        if density is not None:
+            # Заголовок, подписи разделов и итог — 7 строк, на каждый файл
+            # ещё 3 строки сверх его собственных
+            estimate.line_count = (
+                7 + preview.tree_line_count + 3 * preview.file_count
+                + round(preview.content_bytes * density)
+            )
+
+        if bytes_per_second:
+            estimate.projected_time = estimate.output_bytes / bytes_per_second
+        estimate.scan_time = time.perf_counter() - started
+        return estimate
+
+    def close(self) -> None:
+        """Освобождает источник файлов (архив, процесс git)"""
+        if self.source is not None:
+            self.source.close()
 
     # =====================
     # Внутренняя логика
     # =====================
 
+    def _title(self) -> str:
+        return str(self.root_dir) if self.source is None else self.source.title
+
+    def _footer(self) -> str:
+        return f"\nАнализ завершен. Результаты сохранены в {self.output_file}\n"
+
     def _write(self, text: str) -> None:
         self._file.write(text)
+        self.line_count += text.count("\n")
 
-    def _print_project_structure(
-        self, current_dir: Path, indent: str = "", is_last: bool = True
-    ) -> None:
-        relative_path = current_dir.relative_to(self.root_dir)
-        display_name = (
-            self.root_dir.name if relative_path == Path(".") else current_dir.name
-        )
+    def _sample_line_density(
+        self, files: List[Tuple[str, int]], estimate: RunEstimate
+    ) -> Optional[float]:
+        """Доля переводов строк на байт по равномерной выборке непустых файлов"""
+        files = [f for f in files if f[1] > 0]
+        if not files:
+            return 0.0
 
-        branch = "└── " if is_last else "├── "
-        self._write(f"{indent}{branch}{display_name}\n")
+        step = max(1, len(files) // self.SAMPLE_FILES)
+        sample_bytes = 0
+        newlines = 0
+        for rel_path, _ in files[::step][:self.SAMPLE_FILES]:
+            try:
+                if self.source is None:
+                    with open(self.root_dir / rel_path, "rb") as f:
+                        data = f.read(self.SAMPLE_BYTES)
+                else:
+                    data = self.source.read_sample(rel_path, self.SAMPLE_BYTES)
+            except OSError:
+                continue
+            if data is None:
+                return None
+            sample_bytes += len(data)
+            newlines += data.count(b"\n")
+            estimate.sampled_files += 1
 
-        indent += "    " if is_last else "│   "
+        if sample_bytes == 0:
+            return None
+        return newlines / sample_bytes
+
+    def _print_structure_cached(self) -> None:
+        if self.listing_cache is None:
+            self._print_project_structure()
+            return
+
+        self.listing_cache.begin(self.root_dir)
+        self._print_project_structure()
+        try:
+            self.listing_cache.save()
+        except OSError:
+            # Кэш — только ускорение, анализ без него не ломается
+            pass
+
+    def _print_project_structure(self) -> None:
+        """Дерево папки на диске (с кэшем списков папок, если он передан)"""
+        plan = self.filter_plan
+
+        def listing(current_dir: Path):
+            entries = self._list_directory(current_dir)
+            if entries is None:
+                return None
+            dirs = [current_dir / name for name in entries[0] if not plan.is_dir_pruned(name)]
+            files = [name for name in entries[1] if not plan.is_file_ignored(name)]
+            return dirs, files
+
+        for line in tree_lines(self.root_dir, lambda path: path.name, listing):
+            self._write(line + "\n")
+
+    def _list_directory(self, current_dir: Path) -> Optional[Tuple[List[str], List[str]]]:
+        """
+        Имена вложенных папок и файлов, отсортированные без учёта регистра,
+        или None, если папку не прочитать. Неизменившиеся папки берутся
+        из кэша списков (listing_cache).
+        """
+        stamp = None
+        if self.listing_cache is not None:
+            listing, stamp = self.listing_cache.get(current_dir)
+            if listing is not None:
+                return listing
 
         try:
             items = sorted(current_dir.iterdir(), key=lambda p: p.name.lower())
         except (PermissionError, FileNotFoundError):
-            self._write(f"{indent}└── <нет доступа>\n")
-            return
+            return None
 
-        dirs = [
-            p
-            for p in items
-            if p.is_dir() and p.name not in self.ignored_dirs
+        dirs = [p.name for p in items if p.is_dir()]
+        files = [p.name for p in items if p.is_file()]
+
+        if self.listing_cache is not None:
+            self.listing_cache.put(current_dir, stamp, dirs, files)
+        return dirs, files
+
+    def _print_file_contents(self, root_dir: Path) -> None:
+        for root, dirs, files in os.walk(root_dir):
+            root_path = Path(root)
+            self._filter_walk_level(root_path, dirs, files)
+            self._print_files(root_path, files)
+
+    def _filter_walk_level(self, root_path: Path, dirs: List[str], files: List[str]) -> None:
+        """Применяет фильтры к одному уровню os.walk (списки меняются на месте)"""
+        plan = self.filter_plan
+
+        dirs[:] = [
+            d for d in dirs
+            if not plan.is_dir_pruned(d)
+            and (root_path / d).resolve().is_relative_to(self.root_dir)
         ]
 
-        files = [
-            p
-            for p in items
-            if p.is_file() and p.name not in self.ignored_files
+        files[:] = [
+            f for f in files
+            if not plan.is_file_ignored(f)
+            and (root_path / f).resolve().is_relative_to(self.root_dir)
         ]
 
-        for i, dir_path in enumerate(dirs):
-            is_last_dir = (i == len(dirs) - 1) and not files
-            self._print_project_structure(dir_path, indent, is_last_dir)
+    def _print_files(self, root_path: Path, files: List[str]) -> None:
+        plan = self.filter_plan
 
-        for i, file_path in enumerate(files):
-            is_last_file = i == len(files) - 1
-            branch = "└── " if is_last_file else "├── "
-            self._write(f"{indent}{branch}{file_path.name}\n")
+        for filename in files:
+            file_path = root_path / filename
+            file_ext = file_path.suffix.lower()
 
-    def _print_file_contents(self, root_dir: Path) -> None:
-        for root, dirs, files in os.walk(root_dir):
-            root_path = Path(root)
+            if not plan.is_extension_allowed(file_ext):
+                continue
 
-            dirs[:] = [
-                d for d in dirs
-                if d not in self.ignored_dirs
-                and (root_path / d).resolve().is_relative_to(self.root_dir)
-            ]
-
-            files[:] = [
-                f for f in files
-                if f not in self.ignored_files
-                and (root_path / f).resolve().is_relative_to(self.root_dir)
-            ]
-
-            for filename in files:
-                file_path = root_path / filename
-                file_ext = file_path.suffix.lower()
-
-                if self.allowed_extensions and file_ext not in self.allowed_extensions:
-                    continue
-
-                try:
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        content = f.read()
-                    self._write(f"\nСодержимое {file_path}:\n{content}\n")
-                except UnicodeDecodeError:
-                    self._write(
-                        f"\nСодержимое {file_path}:\n<бинарный или нечитаемый файл>\n"
-                    )
-                except Exception as e:
-                    self._write(
-                        f"\nОшибка при чтении {file_path}: {e}\n"
+            if self.transforms is not None and self.transforms.applies_to(file_ext):
+                self._write_transformed_file(file_path, file_ext)
+                continue
+
+            try:
+                with open(file_path, "r", encoding="utf-8") as f:
+                    content = f.read()
+                self._write(f"\nСодержимое {file_path}:\n{content}\n")
+                self.file_count += 1
+            except UnicodeDecodeError:
+                self._write(
+                    f"\nСодержимое {file_path}:\n<бинарный или нечитаемый файл>\n"
+                )
+                self.file_count += 1
+            except Exception as e:
+                self._write(
+                    f"\nОшибка при чтении {file_path}: {e}\n"
+                )
+
+    def _print_file_contents_sharded(self) -> None:
+        """
+        Раздел содержимого по частям: файлы корня пишутся здесь, каждая папка
+        верхнего уровня — в отдельном процессе во временный файл. Части
+        дописываются в результат средствами ОС (append_file) в порядке
+        os.walk, поэтому результат совпадает с последовательным анализом.
+        """
+        root, dirs, files = next(os.walk(self.root_dir))
+        root_path = Path(root)
+        self._filter_walk_level(root_path, dirs, files)
+
+        # os.walk не заходит в символические ссылки на папки
+        shard_dirs = [root_path / d for d in dirs if not (root_path / d).is_symlink()]
+        if len(shard_dirs) < 2:
+            self._print_file_contents(self.root_dir)
+            return
+
+        transform_names = self.transforms.names if self.transforms is not None else []
+
+        with tempfile.TemporaryDirectory(
+            prefix=".structurizer-shards-", dir=self.output_file.parent
+        ) as shards_dir:
+            shard_files = [Path(shards_dir) / f"{i:05d}.txt" for i in range(len(shard_dirs))]
+
+            # spawn, а не fork: анализ запускается из GUI-процесса с потоками
+            with ProcessPoolExecutor(
+                max_workers=min(self.workers, len(shard_dirs)),
+                mp_context=multiprocessing.get_context("spawn")
+            ) as pool:
+                futures = [
+                    pool.submit(
+                        _write_shard, self.root_dir, shard_dir, self.filter_plan,
+                        shard_file, transform_names
                     )
+                    for shard_dir, shard_file in zip(shard_dirs, shard_files)
+                ]
+
+                # Пока процессы обрабатывают папки, пишем файлы корня
+                self._print_files(root_path, files)
+
+                for future, shard_file in zip(futures, shard_files):
+                    line_count, file_count, bytes_in, bytes_saved = future.result()
+                    self._append_shard(shard_file)
+
+                    self.line_count += line_count
+                    self.file_count += file_count
+                    if self.transforms is not None:
+                        self.transforms.bytes_in += bytes_in
+                        for name, saved in bytes_saved.items():
+                            self.transforms.bytes_saved[name] += saved
+
+    def _append_shard(self, shard_file: Path) -> None:
+        self._file.flush()
+        with open(shard_file, "rb") as shard:
+            append_file(self._file.fileno(), shard.fileno(), os.fstat(shard.fileno()).st_size)
+        # Позиция дескриптора сдвинулась в обход буферов — синхронизируем объект файла
+        self._file.seek(0, os.SEEK_END)
+
+    def _write_shard_contents(self, shard_dir: Path) -> None:
+        """Раздел содержимого одной папки верхнего уровня (в процессе-исполнителе)"""
+        self.output_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.output_file, "w", encoding="utf-8") as f:
+            self._file = f
+            self._print_file_contents(shard_dir)
+            self._file = None
+
+    def _write_transformed_file(self, file_path: Path, file_ext: str) -> None:
+        """
+        Пишет раздел файла, пропуская строки через преобразования, — файл
+        читается потоком. Если файл оказался бинарным или не дочитался,
+        уже записанная часть раздела откатывается.
+        """
+        start = self._file.tell()
+        line_count = self.line_count
+
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                self._write(f"\nСодержимое {file_path}:\n")
+                for line in self.transforms.apply(f, file_ext):
+                    self._write(line)
+                self._write("\n")
+        except Exception as e:
+            self._file.seek(start)
+            self._file.truncate()
+            self.line_count = line_count
+
+            if isinstance(e, UnicodeDecodeError):
+                self._write(
+                    f"\nСодержимое {file_path}:\n<бинарный или нечитаемый файл>\n"
+                )
+            else:
+                self._write(f"\nОшибка при чтении {file_path}: {e}\n")
+                return
+
+        self.file_count += 1
+
+    def _print_source_structure(self, tree: SnapshotDir) -> None:
+        """Дерево источника в том же формате, что и для папки"""
+        plan = self.filter_plan
+
+        def listing(node: SnapshotDir):
+            if node.denied:
+                return None
+            dirs = [d for d in node.dirs if not plan.is_dir_pruned(d.name)]
+            files = [name for name, _ in node.files if not plan.is_file_ignored(name)]
+            return dirs, files
+
+        for line in tree_lines(tree, lambda node: node.name, listing):
+            self._write(line + "\n")
+
+    def _print_source_contents(self, source: ProjectSource) -> None:
+        for rel_path, data in source.iter_contents(self.filter_plan):
+            file_path = source.display_path(rel_path)
+
+            if isinstance(data, Exception):
+                self._write(f"\nОшибка при чтении {file_path}: {data}\n")
+                continue
+
+            try:
+                # Как при чтении файла в текстовом режиме: UTF-8 и универсальные переводы строк
+                content = data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+                file_ext = posixpath.splitext(rel_path)[1].lower()
+                if self.transforms is not None and self.transforms.applies_to(file_ext):
+                    # Строки делятся только по «\n», как при чтении файла
+                    # (splitlines делит ещё и по \f, \v, U+2028...)
+                    content = "".join(self.transforms.apply(io.StringIO(content), file_ext))
+                self._write(f"\nСодержимое {file_path}:\n{content}\n")
+            except UnicodeDecodeError:
+                self._write(
+                    f"\nСодержимое {file_path}:\n<бинарный или нечитаемый файл>\n"
+                )
+            self.file_count += 1
@@ -0,0 +1,174 @@
+# analyzer/project_detector.py
+
+import os
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .filter_plan import FilterPlan
+
+
+# Файлы-маркеры типа проекта и расширения исходников, на которые они указывают
+PROJECT_MARKERS: Dict[str, tuple] = {
+    "pyproject.toml": ("python", (".py",)),
+    "setup.py": ("python", (".py",)),
+    "setup.cfg": ("python", (".py",)),
+    "requirements.txt": ("python", (".py",)),
+    "Pipfile": ("python", (".py",)),
+    "package.json": ("web", (".js", ".jsx", ".ts", ".tsx")),
+    "tsconfig.json": ("web", (".ts", ".tsx")),
+    "index.html": ("web", (".html", ".css", ".js")),
+    "Cargo.toml": ("rust", (".rs",)),
+    "go.mod": ("go", (".go",)),
+    "pom.xml": ("java", (".java",)),
+    "build.gradle": ("java", (".java", ".kt")),
+    "CMakeLists.txt": ("cpp", (".c", ".cpp", ".h", ".hpp")),
+    "composer.json": ("php", (".php",)),
+    "Gemfile": ("ruby", (".rb",)),
+}
+
+# Папки, которые не дают информации о типе проекта и бывают огромными
+SKIPPED_DIRS = {
+    ".git", ".hg", ".svn", ".idea", ".vscode", "node_modules", "__pycache__",
+    ".venv", "venv", "env", ".mypy_cache", ".pytest_cache", "dist", "build", "target",
+}
+
+# Вес маркера относительно одного найденного файла с расширением
+MARKER_WEIGHT = 20
+
+
+class ProjectDetection:
+    """Результат быстрого определения типа проекта"""
+
+    def __init__(self, root_dir: Path):
+        self.root_dir = root_dir
+        self.markers: List[str] = []
+        self.project_types: Counter = Counter()
+        self.extensions: Counter = Counter()
+        self.files_seen = 0
+        self.timed_out = False
+        self.elapsed = 0.0
+
+    @property
+    def project_type(self) -> Optional[str]:
+        """Наиболее вероятный тип проекта по маркерам"""
+        if not self.project_types:
+            return None
+        return self.project_types.most_common(1)[0][0]
+
+    def extension_weights(self) -> Counter:
+        """Гистограмма расширений с учётом веса найденных маркеров"""
+        weights = Counter(self.extensions)
+        for marker in self.markers:
+            for ext in PROJECT_MARKERS[marker][1]:
+                weights[ext] += MARKER_WEIGHT
+        return weights
+
+
+class ProjectDetector:
+    """
+    Определяет тип проекта без полного обхода.
+
+    Смотрит только корень и первый уровень вложенности: ищет файлы-маркеры
+    (pyproject.toml, package.json, Cargo.toml, ...) и собирает гистограмму
+    расширений по ограниченной выборке. Работа прерывается по бюджету
+    времени, поэтому на огромных репозиториях и медленных дисках вызов
+    не задерживает запуск анализа.
+    """
+
+    def __init__(self, time_budget: float = 0.05, max_entries: int = 2000):
+        self.time_budget = time_budget
+        self.max_entries = max_entries
+
+    # =====================
+    # Публичный API
+    # =====================
+
+    def detect(self, root_dir: Path) -> ProjectDetection:
+        root_dir = Path(root_dir)
+        detection = ProjectDetection(root_dir)
+        started = time.perf_counter()
+        deadline = started + self.time_budget
+
+        subdirs = self._scan_dir(root_dir, detection, deadline, top_level=True)
+        for subdir in subdirs:
+            if detection.timed_out or detection.files_seen >= self.max_entries:
+                break
+            self._scan_dir(subdir, detection, deadline, top_level=False)
+
+        detection.elapsed = time.perf_counter() - started
+        return detection
+
+    def suggest_template(self, detection: ProjectDetection, templates: Iterable[Dict]) -> Optional[Dict]:
+        """
+        Подбирает шаблон, чьи разрешённые расширения лучше всего описывают
+        найденные файлы. Шаблоны без ограничения расширений («Все файлы»)
+        не предлагаются — от них детектор и должен уберегать.
+
+        Оценка — доля веса найденных файлов, которую шаблон покрывает,
+        умноженная на долю его расширений, действительно встреченных
+        в проекте. Без второго множителя выигрывали бы шаблоны с длинными
+        списками расширений: каждый случайный .json добавлял бы им очки.
+        """
+        weights = detection.extension_weights()
+        candidates = []
+        for template in templates:
+            allowed = FilterPlan.from_settings(template.get("settings", {})).allowed_extensions
+            if allowed:
+                candidates.append((template, allowed))
+
+        # Учитываются только расширения, которые разрешает хоть один шаблон
+        relevant = set().union(*(allowed for _, allowed in candidates)) if candidates else set()
+        total = sum(weights[ext] for ext in relevant)
+        if not total:
+            return None
+
+        best, best_score = None, 0.0
+        for template, allowed in candidates:
+            covered = sum(weights[ext] for ext in allowed)
+            present = sum(1 for ext in allowed if weights[ext])
+            score = covered / total * present / len(allowed)
+            if score > best_score:
+                best, best_score = template, score
+
+        return best
+
+    # =====================
+    # Внутренние методы
+    # =====================
+
+    def _scan_dir(self, path: Path, detection: ProjectDetection, deadline: float, top_level: bool) -> List[Path]:
+        subdirs = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if time.perf_counter() > deadline:
+                        detection.timed_out = True
+                        break
+                    if detection.files_seen >= self.max_entries:
+                        break
+
+                    name = entry.name
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+
+                    if is_dir:
+                        if top_level and name not in SKIPPED_DIRS and not name.startswith("."):
+                            subdirs.append(Path(entry.path))
+                        continue
+
+                    detection.files_seen += 1
+                    if name in PROJECT_MARKERS:
+                        detection.markers.append(name)
+                        detection.project_types[PROJECT_MARKERS[name][0]] += 1
+
+                    suffix = os.path.splitext(name)[1].lower()
+                    if suffix:
+                        detection.extensions[suffix] += 1
+        except OSError:
+            pass
+
+        return subdirs
@@ -0,0 +1,221 @@
+# analyzer/snapshot.py
+
+import os
+from pathlib import Path
+from typing import Callable, List, Optional, Set, Tuple
+
+from .filter_plan import FilterPlan
+from .tree_render import tree_lines
+
+
+class SnapshotDir:
+    """Папка в снимке: вложенные папки и файлы с размерами"""
+
+    __slots__ = ("name", "dirs", "files", "denied", "linked", "external")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.dirs: List["SnapshotDir"] = []
+        self.files: List[Tuple[str, int]] = []
+        self.denied = False
+        # Папка — символическая ссылка: в структуре раскрыта, но её файлы
+        # не попадают в содержимое (os.walk в ссылки не заходит)
+        self.linked = False
+        # Файлы-ссылки за пределы проекта: в структуре есть, в содержимом нет
+        self.external: Set[str] = set()
+
+
+class SnapshotPreview:
+    """Результат применения фильтров к снимку"""
+
+    def __init__(self):
+        self.file_count = 0
+        self.content_bytes = 0
+        self.estimated_bytes = 0
+        self.tree_lines: List[str] = []
+        self.tree_line_count = 0
+        # Файлы в разделе содержимого (путь относительно корня через «/», размер);
+        # заполняется только по запросу (with_files=True)
+        self.files: List[Tuple[str, int]] = []
+
+    @property
+    def tree_truncated(self) -> bool:
+        return self.tree_line_count > len(self.tree_lines)
+
+
+class DirectorySnapshot:
+    """
+    Снимок дерева проекта в памяти: только имена и размеры файлов (stat),
+    без чтения содержимого.
+
+    Снимок делается один раз, после чего preview() применяет любые
+    фильтры за один проход по памяти — так настройки фильтров можно
+    подбирать, не запуская анализ. Обход повторяет ProjectAnalyzer.run():
+    порядок по имени без учёта регистра, папки перед файлами, ссылки на
+    папки раскрываются в структуре, но не в содержимом.
+    """
+
+    def __init__(
+        self, root_dir: Path, root: SnapshotDir, entry_count: int, complete: bool = True
+    ):
+        self.root_dir = root_dir
+        self.root = root
+        self.entry_count = entry_count
+        # False — обход прерван (take(..., partial=True)): в снимке только
+        # часть дерева, и всё, что по нему посчитано, — нижняя граница
+        self.complete = complete
+
+    # =====================
+    # Построение
+    # =====================
+
+    @classmethod
+    def take(
+        cls,
+        root_dir: Path,
+        should_stop: Optional[Callable[[], bool]] = None,
+        plan: Optional[FilterPlan] = None,
+        partial: bool = False
+    ) -> Optional["DirectorySnapshot"]:
+        """
+        Снимает дерево root_dir. Возвращает None, если should_stop()
+        потребовал остановиться (например, пользователь сменил путь).
+
+        plan — не заходить в отсечённые им папки (.git, node_modules...).
+        Такой снимок годится только для фильтров с теми же папками;
+        для предпросмотра с меняющимися фильтрами снимок берётся целиком.
+
+        partial — при остановке вернуть уже снятую часть дерева
+        (complete=False) вместо None; так обход ограничивают по времени.
+        """
+        root_dir = Path(root_dir).resolve()
+        counter = [0]
+        root = cls._scan(
+            str(root_dir), root_dir.name, counter, should_stop, plan, root_dir, {str(root_dir)},
+            partial
+        )
+        if root is None and not partial:
+            return None
+        # Без partial остановка дала бы None; с ним — проверяем ещё раз
+        complete = not partial or should_stop is None or not should_stop()
+        return cls(root_dir, root or SnapshotDir(root_dir.name), counter[0], complete)
+
+    @classmethod
+    def _scan(
+        cls, path: str, name: str, counter: List[int], should_stop, plan: Optional[FilterPlan],
+        root_dir: Path, ancestors: Set[str], partial: bool
+    ) -> Optional[SnapshotDir]:
+        if should_stop is not None and should_stop():
+            return None
+
+        node = SnapshotDir(name)
+        try:
+            with os.scandir(path) as it:
+                entries = sorted(it, key=lambda e: e.name.lower())
+        except (PermissionError, FileNotFoundError, NotADirectoryError):
+            node.denied = True
+            return node
+
+        for entry in entries:
+            counter[0] += 1
+            try:
+                # Как Path.is_dir() в ProjectAnalyzer: ссылки на папки раскрываются
+                if entry.is_dir():
+                    if plan is not None and plan.is_dir_pruned(entry.name):
+                        continue
+                    child = cls._scan_dir_entry(
+                        entry, counter, should_stop, plan, root_dir, ancestors, partial
+                    )
+                    if child is None:
+                        # Остановка: частичный снимок обрывается на этой папке
+                        return node if partial else None
+                    node.dirs.append(child)
+                elif entry.is_file():
+                    node.files.append((entry.name, entry.stat().st_size))
+                    if entry.is_symlink() and not Path(entry.path).resolve().is_relative_to(root_dir):
+                        node.external.add(entry.name)
+            except OSError:
+                continue
+
+        return node
+
+    @classmethod
+    def _scan_dir_entry(
+        cls, entry: os.DirEntry, counter: List[int], should_stop, plan: Optional[FilterPlan],
+        root_dir: Path, ancestors: Set[str], partial: bool
+    ) -> Optional[SnapshotDir]:
+        if not entry.is_symlink():
+            return cls._scan(
+                entry.path, entry.name, counter, should_stop, plan, root_dir, ancestors, partial
+            )
+
+        # Ссылка на папку выше по дереву дала бы бесконечный обход
+        target = os.path.realpath(entry.path)
+        if target in ancestors:
+            child = SnapshotDir(entry.name)
+            child.denied = True
+        else:
+            child = cls._scan(
+                entry.path, entry.name, counter, should_stop, plan, root_dir, ancestors | {target},
+                partial
+            )
+        if child is not None:
+            child.linked = True
+        return child
+
+    # =====================
+    # Предпросмотр
+    # =====================
+
+    def preview(
+        self,
+        plan: FilterPlan,
+        max_tree_lines: int = 1000,
+        with_files: bool = False
+    ) -> SnapshotPreview:
+        """
+        Считает, что попадёт в результат при данных фильтрах: число файлов,
+        оценку размера результата и дерево (первые max_tree_lines строк).
+        with_files — дополнительно вернуть список файлов содержимого.
+        """
+        result = SnapshotPreview()
+        tree_bytes = 0
+
+        # Узел дерева: (папка, путь для заголовков, путь от корня, попадают ли
+        # её файлы в содержимое). Содержимое учитывается при выводе списка папки.
+        def listing(node):
+            snapshot_dir, path, rel_dir, contents = node
+            if snapshot_dir.denied:
+                return None
+
+            dirs = [
+                (d, os.path.join(path, d.name), f"{rel_dir}{d.name}/", contents and not d.linked)
+                for d in snapshot_dir.dirs if not plan.is_dir_pruned(d.name)
+            ]
+            files = [f for f in snapshot_dir.files if not plan.is_file_ignored(f[0])]
+
+            for name, size in files:
+                if not contents or name in snapshot_dir.external:
+                    continue
+                if plan.is_extension_allowed(os.path.splitext(name)[1].lower()):
+                    result.file_count += 1
+                    result.content_bytes += size
+                    header = f"\nСодержимое {os.path.join(path, name)}:\n"
+                    result.estimated_bytes += len(header.encode("utf-8")) + size + 1
+                    if with_files:
+                        result.files.append((f"{rel_dir}{name}", size))
+
+            return dirs, [name for name, _ in files]
+
+        root_path = str(self.root_dir)
+        for line in tree_lines((self.root, root_path, "", True), lambda node: node[0].name, listing):
+            result.tree_line_count += 1
+            tree_bytes += len(line.encode("utf-8")) + 1
+            if len(result.tree_lines) < max_tree_lines:
+                result.tree_lines.append(line)
+
+        result.estimated_bytes += tree_bytes + len(
+            f"Анализ проекта: {root_path}\n\nСтруктура проекта:\n"
+            f"\nТекст из файлов проекта:\n".encode("utf-8")
+        )
+        return result
@@ -0,0 +1,479 @@
+# analyzer/sources.py
+
+import os
+import posixpath
+import subprocess
+import sys
+import tarfile
+import zipfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from .filter_plan import FilterPlan
+from .snapshot import SnapshotDir
+
+
+ARCHIVE_SUFFIXES = (
+    ".zip",
+    ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz",
+)
+
+# Содержимое файла или исключение, из-за которого его не удалось прочитать
+FileContent = Union[bytes, Exception]
+
+# В собранном GUI-приложении для Windows git не должен открывать консоль
+GIT_CREATION_FLAGS = subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0
+
+
+def is_archive(path: Path) -> bool:
+    name = Path(path).name.lower()
+    return any(name.endswith(suffix) for suffix in ARCHIVE_SUFFIXES)
+
+
+def open_source(path: Path) -> Optional["ProjectSource"]:
+    """
+    Возвращает источник для архива или None для обычной папки
+    (её ProjectAnalyzer обходит сам).
+    """
+    path = Path(path)
+    if path.is_file() and is_archive(path):
+        if path.name.lower().endswith(".zip"):
+            return ZipSource(path)
+        return TarSource(path)
+    return None
+
+
+def open_git_index_source(path: Path, include_untracked: bool = False) -> Optional["GitIndexSource"]:
+    """
+    Возвращает источник по индексу git, если path — папка внутри рабочей
+    копии git-репозитория, иначе None (папку обходит ProjectAnalyzer).
+    """
+    path = Path(path)
+    if not path.is_dir():
+        return None
+    try:
+        inside = run_git(path, ["rev-parse", "--is-inside-work-tree"]).strip()
+    except ValueError:
+        return None
+    if inside != b"true":
+        return None
+    return GitIndexSource(path, include_untracked)
+
+
+def is_path_included(rel_path: str, plan: FilterPlan) -> bool:
+    """Попадёт ли файл rel_path (через «/») в раздел содержимого"""
+    parts = rel_path.split("/")
+    if any(plan.is_dir_pruned(part) for part in parts[:-1]):
+        return False
+    name = parts[-1]
+    if plan.is_file_ignored(name):
+        return False
+    return plan.is_extension_allowed(posixpath.splitext(name)[1].lower())
+
+
+def build_tree(root_name: str, entries: Iterable[Tuple[str, bool, int]]) -> SnapshotDir:
+    """
+    Строит дерево из плоского списка (относительный путь через «/»,
+    это папка, размер). Промежуточные папки создаются, даже если
+    в списке их нет; порядок — по имени без учёта регистра.
+    """
+    root = SnapshotDir(root_name)
+    dirs = {"": root}
+
+    def get_dir(rel_dir: str) -> SnapshotDir:
+        node = dirs.get(rel_dir)
+        if node is None:
+            parent, _, name = rel_dir.rpartition("/")
+            node = SnapshotDir(name)
+            get_dir(parent).dirs.append(node)
+            dirs[rel_dir] = node
+        return node
+
+    for rel_path, is_dir, size in entries:
+        if is_dir:
+            get_dir(rel_path)
+        else:
+            parent, _, name = rel_path.rpartition("/")
+            get_dir(parent).files.append((name, size))
+
+    for node in dirs.values():
+        node.dirs.sort(key=lambda d: d.name.lower())
+        node.files.sort(key=lambda f: f[0].lower())
+    return root
+
+
+def normalize_member_name(name: str) -> Optional[str]:
+    """Относительный путь элемента архива или None для небезопасных имён"""
+    name = name.replace("\\", "/").strip("/")
+    if not name:
+        return None
+    name = posixpath.normpath(name)
+    if name == "." or name.startswith("../") or name == "..":
+        return None
+    return name
+
+
+class ProjectSource(ABC):
+    """
+    Источник файлов проекта, отличный от папки на диске.
+
+    Отдаёт дерево для раздела структуры (tree) и содержимое файлов,
+    прошедших фильтры (iter_contents), — потоком, по одному файлу,
+    чтобы память не зависела от размера проекта.
+    """
+
+    def __init__(self, display_root: str, root_name: str):
+        # Путь, с которого начинаются пути файлов в результате
+        self.display_root = display_root
+        self.root_name = root_name
+
+    @abstractmethod
+    def tree(self) -> SnapshotDir:
+        """
+        Дерево файлов для раздела структуры. Размеры файлов могут быть
+        нулевыми, если источнику они даются лишь ценой лишних чтений
+        (см. sized_tree).
+        """
+
+    @abstractmethod
+    def iter_contents(self, plan: FilterPlan) -> Iterator[Tuple[str, FileContent]]:
+        """Пары (относительный путь, содержимое или исключение)"""
+
+    def sized_tree(self) -> SnapshotDir:
+        """Дерево с настоящими размерами файлов — для оценки (ProjectAnalyzer.dry_run)"""
+        return self.tree()
+
+    @property
+    def title(self) -> str:
+        """Что анализируется — для заголовка результата"""
+        return self.display_root
+
+    def display_path(self, rel_path: str) -> str:
+        """Путь файла для результата — с разделителями ОС, как при обходе папки"""
+        return os.path.join(self.display_root, *rel_path.split("/"))
+
+    def read_sample(self, rel_path: str, limit: int) -> Optional[bytes]:
+        """
+        Первые limit байт файла для оценки (см. ProjectAnalyzer.dry_run)
+        или None, если источник не умеет читать файлы выборочно.
+        """
+        return None
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ZipSource(ProjectSource):
+    """zip-архив: список элементов из центрального каталога, чтение по требованию"""
+
+    def __init__(self, archive_path: Path):
+        archive_path = Path(archive_path).resolve()
+        super().__init__(str(archive_path), archive_path.name)
+        self._zip = zipfile.ZipFile(archive_path)
+        self._members = []
+        for info in self._zip.infolist():
+            rel_path = normalize_member_name(info.filename)
+            if rel_path is not None:
+                self._members.append((rel_path, info))
+        self._by_path = None
+
+    def tree(self) -> SnapshotDir:
+        return build_tree(
+            self.root_name,
+            ((rel, info.is_dir(), info.file_size) for rel, info in self._members)
+        )
+
+    def iter_contents(self, plan: FilterPlan) -> Iterator[Tuple[str, FileContent]]:
+        for rel_path, info in sorted(self._members, key=lambda m: m[0].lower()):
+            if info.is_dir() or not is_path_included(rel_path, plan):
+                continue
+            try:
+                yield rel_path, self._zip.read(info)
+            except Exception as e:
+                yield rel_path, e
+
+    def read_sample(self, rel_path: str, limit: int) -> Optional[bytes]:
+        if self._by_path is None:
+            self._by_path = dict(self._members)
+        info = self._by_path.get(rel_path)
+        if info is None:
+            return None
+        with self._zip.open(info) as f:
+            return f.read(limit)
+
+    def close(self) -> None:
+        self._zip.close()
+
+
+class TarSource(ProjectSource):
+    """
+    tar-архив (в том числе сжатый). Сжатый tar читается только
+    последовательно, поэтому содержимое отдаётся в порядке архива,
+    за один проход, без распаковки на диск.
+    """
+
+    def __init__(self, archive_path: Path):
+        archive_path = Path(archive_path).resolve()
+        super().__init__(str(archive_path), archive_path.name)
+        self.archive_path = archive_path
+        # Дерево запоминается: оценка и анализ не распаковывают архив дважды
+        self._tree: Optional[SnapshotDir] = None
+
+    def tree(self) -> SnapshotDir:
+        if self._tree is None:
+            self._tree = self._read_tree()
+        return self._tree
+
+    def iter_contents(self, plan: FilterPlan) -> Iterator[Tuple[str, FileContent]]:
+        with tarfile.open(self.archive_path, "r:*") as tar:
+            for member in tar:
+                if not member.isreg():
+                    continue
+                rel_path = normalize_member_name(member.name)
+                if rel_path is None or not is_path_included(rel_path, plan):
+                    continue
+                try:
+                    f = tar.extractfile(member)
+                    yield rel_path, f.read()
+                except Exception as e:
+                    yield rel_path, e
+
+    def _read_tree(self) -> SnapshotDir:
+        entries = []
+        with tarfile.open(self.archive_path, "r:*") as tar:
+            # Итерация по архиву не держит в памяти содержимое элементов
+            # (только их заголовки)
+            for member in tar:
+                rel_path = normalize_member_name(member.name)
+                if rel_path is None:
+                    continue
+                if member.isdir():
+                    entries.append((rel_path, True, 0))
+                elif member.isreg():
+                    entries.append((rel_path, False, member.size))
+        return build_tree(self.root_name, entries)
+
+
+def run_git(repo_dir: Path, args: List[str]) -> bytes:
+    """Выполняет git в репозитории и возвращает stdout; ошибки — ValueError"""
+    try:
+        result = subprocess.run(
+            ["git", "-C", str(repo_dir), *args],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            creationflags=GIT_CREATION_FLAGS,
+        )
+    except FileNotFoundError:
+        raise ValueError("git не найден: установите git или добавьте его в PATH")
+
+    if result.returncode != 0:
+        message = result.stderr.decode("utf-8", errors="replace").strip()
+        raise ValueError(f"git {args[0]}: {message}")
+    return result.stdout
+
+
+class GitRevisionSource(ProjectSource):
+    """
+    Ревизия локального git-репозитория — без checkout.
+
+    Дерево берётся из `git ls-tree -r` (с размерами объектов), содержимое
+    файлов читается через один долгоживущий процесс `git cat-file --batch`:
+    на каждый файл — запрос по хэшу объекта и ответ в том же канале.
+    Пути в результате — как у рабочей копии, ревизия указывается
+    в заголовке. Символические ссылки и подмодули пропускаются.
+    """
+
+    def __init__(self, repo_dir: Path, revision: str = "HEAD"):
+        repo_dir = Path(repo_dir).resolve()
+        if not repo_dir.is_dir():
+            raise ValueError(f"Корневая директория не существует: {repo_dir}")
+        super().__init__(str(repo_dir), repo_dir.name)
+        self.repo_dir = repo_dir
+        self.revision = revision
+
+        # Ревизия фиксируется хэшем коммита: анализ не зависит от того,
+        # куда ветка сдвинется за время работы
+        self.commit = run_git(
+            repo_dir, ["rev-parse", "--verify", "--end-of-options", f"{revision}^{{commit}}"]
+        ).decode("ascii").strip()
+
+        # (относительный путь, хэш объекта, размер)
+        self._blobs: List[Tuple[str, str, int]] = self._list_blobs()
+        self._cat_file: Optional[subprocess.Popen] = None
+
+    @property
+    def title(self) -> str:
+        return f"{self.display_root} @ {self.revision} ({self.commit[:12]})"
+
+    def tree(self) -> SnapshotDir:
+        return build_tree(self.root_name, ((rel, False, size) for rel, _, size in self._blobs))
+
+    def iter_contents(self, plan: FilterPlan) -> Iterator[Tuple[str, FileContent]]:
+        for rel_path, sha, _ in sorted(self._blobs, key=lambda b: b[0].lower()):
+            if not is_path_included(rel_path, plan):
+                continue
+            try:
+                yield rel_path, self._read_blob(sha)
+            except ValueError as e:
+                yield rel_path, e
+
+    def close(self) -> None:
+        if self._cat_file is None:
+            return
+        process, self._cat_file = self._cat_file, None
+        try:
+            process.stdin.close()
+            process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            process.kill()
+            process.wait()
+        process.stdout.close()
+
+    # =====================
+    # Внутренние методы
+    # =====================
+
+    def _list_blobs(self) -> List[Tuple[str, str, int]]:
+        output = run_git(self.repo_dir, ["ls-tree", "-r", "-z", "-l", "--full-tree", self.commit])
+
+        blobs = []
+        # Запись: «<режим> <тип> <объект> <размер>\t<путь>\0»
+        for record in output.split(b"\0"):
+            if not record:
+                continue
+            meta, _, path = record.partition(b"\t")
+            mode, object_type, sha, size = meta.split()
+            if object_type != b"blob" or mode == b"120000":
+                continue
+            rel_path = normalize_member_name(path.decode("utf-8", errors="replace"))
+            if rel_path is not None:
+                blobs.append((rel_path, sha.decode("ascii"), int(size)))
+        return blobs
+
+    def _start_cat_file(self) -> subprocess.Popen:
+        try:
+            return subprocess.Popen(
+                ["git", "-C", str(self.repo_dir), "cat-file", "--batch"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                creationflags=GIT_CREATION_FLAGS,
+            )
+        except FileNotFoundError:
+            raise ValueError("git не найден: установите git или добавьте его в PATH")
+
+    def _read_blob(self, sha: str) -> bytes:
+        if self._cat_file is None:
+            self._cat_file = self._start_cat_file()
+        process = self._cat_file
+
+        # Запрос и ответ строго по очереди — каналы не переполняются
+        try:
+            process.stdin.write(sha.encode("ascii") + b"\n")
+            process.stdin.flush()
+        except OSError as e:
+            self.close()
+            raise ValueError(f"git cat-file завершился: {e}")
+
+        # Ответ: «<объект> <тип> <размер>\n<содержимое>\n» или «<объект> missing\n»
+        header = process.stdout.readline().split()
+        if len(header) != 3:
+            if not header:
+                self.close()
+                raise ValueError("git cat-file завершился")
+            raise ValueError(f"объект {sha} не найден")
+
+        size = int(header[2])
+        data = process.stdout.read(size)
+        process.stdout.read(1)
+        if len(data) != size:
+            self.close()
+            raise ValueError("git cat-file завершился")
+        return data
+
+
+class GitIndexSource(ProjectSource):
+    """
+    Папка внутри рабочей копии git: список файлов берётся из индекса
+    (`git ls-files`), а не обходом диска, — игнорируемые сборочные
+    каталоги вроде node_modules или build даже не просматриваются.
+
+    Содержимое читается с диска, как при обычном обходе, поэтому пути
+    в результате те же. С include_untracked добавляются неотслеживаемые,
+    но не игнорируемые файлы (`--others --exclude-standard`). Удалённые
+    из рабочей копии файлы, символические ссылки и подмодули пропускаются.
+    """
+
+    def __init__(self, root_dir: Path, include_untracked: bool = False):
+        root_dir = Path(root_dir).resolve()
+        super().__init__(str(root_dir), root_dir.name)
+        self.root_dir = root_dir
+        self.include_untracked = include_untracked
+        self._paths: List[str] = self._list_paths()
+
+    def tree(self) -> SnapshotDir:
+        # Для раздела структуры размеры не нужны — диск не трогаем
+        return build_tree(self.root_name, ((rel_path, False, 0) for rel_path in self._paths))
+
+    def sized_tree(self) -> SnapshotDir:
+        entries = []
+        for rel_path in self._paths:
+            try:
+                size = os.stat(self.root_dir / rel_path).st_size
+            except OSError:
+                size = 0
+            entries.append((rel_path, False, size))
+        return build_tree(self.root_name, entries)
+
+    def iter_contents(self, plan: FilterPlan) -> Iterator[Tuple[str, FileContent]]:
+        for rel_path in sorted(self._paths, key=str.lower):
+            if not is_path_included(rel_path, plan):
+                continue
+            try:
+                with open(self.root_dir / rel_path, "rb") as f:
+                    yield rel_path, f.read()
+            except OSError as e:
+                yield rel_path, e
+
+    def read_sample(self, rel_path: str, limit: int) -> Optional[bytes]:
+        with open(self.root_dir / rel_path, "rb") as f:
+            return f.read(limit)
+
+    # =====================
+    # Внутренние методы
+    # =====================
+
+    def _git_paths(self, args: List[str]) -> List[bytes]:
+        # ls-files выводит пути относительно root_dir и только внутри неё
+        output = run_git(self.root_dir, ["ls-files", "-z", *args])
+        return [record for record in output.split(b"\0") if record]
+
+    def _list_paths(self) -> List[str]:
+        deleted = set(self._git_paths(["--deleted"]))
+
+        paths = set()
+        # Запись: «<режим> <объект> <стадия>\t<путь>»; при конфликте путь повторяется
+        for record in self._git_paths(["--stage"]):
+            meta, _, path = record.partition(b"\t")
+            mode = meta.split(b" ", 1)[0]
+            if mode in (b"120000", b"160000") or path in deleted:
+                continue
+            paths.add(path)
+
+        if self.include_untracked:
+            paths.update(self._git_paths(["--others", "--exclude-standard"]))
+
+        result = []
+        for path in paths:
+            rel_path = normalize_member_name(path.decode("utf-8", errors="replace"))
+            if rel_path is not None:
+                result.append(rel_path)
+        return result
@@ -0,0 +1,423 @@
+# analyzer/transforms.py
+
+"""
+Преобразования содержимого файлов перед записью в результат.
+
+Каждое преобразование — генератор над строками файла: получает строки
+по одной и отдаёт строки результата, поэтому файл не загружается
+в память целиком. Состояние между строками (многострочный комментарий
+или строковый литерал) хранится внутри генератора.
+"""
+
+import re
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+Transform = Callable[[Iterable[str]], Iterator[str]]
+
+PYTHON_EXTENSIONS = {".py", ".pyw"}
+JS_EXTENSIONS = {".js", ".mjs", ".cjs", ".jsx", ".ts", ".tsx"}
+CSS_EXTENSIONS = {".css"}
+# Код, где пробелы в концах строк и лишние пустые строки не значимы;
+# в разметке (.md: два пробела — перенос строки) и данных их не трогаем
+CODE_EXTENSIONS = PYTHON_EXTENSIONS | JS_EXTENSIONS | CSS_EXTENSIONS | {
+    ".java", ".kt", ".scala", ".c", ".h", ".cpp", ".hpp", ".cc", ".cs",
+    ".go", ".rs", ".rb", ".php", ".swift", ".scss", ".less", ".sql",
+}
+
+# Строка об авторских правах или SPDX-идентификатор — лицензия сама по себе
+COPYRIGHT_RE = re.compile(r"\bcopyright\b|spdx-license-identifier:|(?:\(c\)|©)\s*\d{4}")
+LICENSE_RE = re.compile(r"\blicen[cs]e[ds]?\b")
+# Без строки об авторских правах слово license делает лицензией
+# только блок хотя бы из стольких строк
+MIN_LICENSE_BLOCK_LINES = 3
+
+# Ключевые слова, после которых «/» начинает регулярное выражение
+REGEX_KEYWORDS = ("return", "typeof", "case", "yield", "in", "of", "delete", "void", "throw")
+
+# Сколько строк начального комментария держать в памяти, решая, лицензия ли это
+MAX_BANNER_LINES = 200
+
+
+# =====================
+# Сканеры комментариев
+# =====================
+
+def _strip_python_comments(lines: Iterable[str]) -> Iterator[str]:
+    """Убирает комментарии «#» вне строковых литералов (docstring остаются)"""
+    triple = None  # открытая тройная кавычка: '\'\'\'' или '"""'
+    quote = None  # открытая одинарная кавычка (продолжается только через «\» в конце строки)
+
+    for number, line in enumerate(lines):
+        # shebang и объявление кодировки — не комментарии по смыслу
+        if number < 2 and triple is None and line.startswith("#") and (
+                line.startswith("#!") or "coding" in line):
+            yield line
+            continue
+
+        newline = "\n" if line.endswith("\n") else ""
+        text = line[:-1] if newline else line
+        i = 0
+        cut = None
+
+        while i < len(text):
+            ch = text[i]
+            if triple is not None:
+                if ch == "\\":
+                    i += 2
+                    continue
+                if text.startswith(triple, i):
+                    triple = None
+                    i += 3
+                    continue
+            elif quote is not None:
+                if ch == "\\":
+                    i += 2
+                    continue
+                if ch == quote:
+                    quote = None
+            elif ch == "#":
+                cut = i
+                break
+            elif ch in "'\"":
+                if text.startswith(ch * 3, i):
+                    triple = ch * 3
+                    i += 3
+                    continue
+                quote = ch
+            i += 1
+
+        # «\» в конце строки экранирует перевод строки — i ушёл за конец
+        if quote is not None and i <= len(text):
+            quote = None
+
+        if cut is None:
+            yield line
+            continue
+
+        code = text[:cut].rstrip()
+        if code:
+            yield code + newline
+        # Строка только из комментария удаляется целиком
+
+
+def _strip_c_comments(lines: Iterable[str], line_comments: bool, template_strings: bool) -> Iterator[str]:
+    """
+    Убирает комментарии /* */ (и «//», если line_comments) вне строк.
+    Для JS учитываются шаблонные строки и литералы регулярных выражений.
+    """
+    in_block = False
+    in_template = False
+
+    for line in lines:
+        newline = "\n" if line.endswith("\n") else ""
+        text = line[:-1] if newline else line
+        out: List[str] = []
+        removed = in_block
+        i = 0
+        quote = None
+
+        while i < len(text):
+            ch = text[i]
+            if in_block:
+                end = text.find("*/", i)
+                if end < 0:
+                    i = len(text)
+                    break
+                in_block = False
+                i = end + 2
+                continue
+            if in_template:
+                out.append(ch)
+                if ch == "\\":
+                    out.append(text[i + 1:i + 2])
+                    i += 2
+                    continue
+                if ch == "`":
+                    in_template = False
+                i += 1
+                continue
+            if quote is not None:
+                out.append(ch)
+                if ch == "\\":
+                    out.append(text[i + 1:i + 2])
+                    i += 2
+                    continue
+                if ch == quote:
+                    quote = None
+                i += 1
+                continue
+
+            if text.startswith("/*", i):
+                in_block = True
+                removed = True
+                i += 2
+                continue
+            if line_comments and text.startswith("//", i):
+                removed = True
+                break
+            if ch in "'\"":
+                quote = ch
+            elif ch == "`" and template_strings:
+                in_template = True
+            elif ch == "/" and line_comments and _regex_allowed(out):
+                end = _regex_end(text, i)
+                out.append(text[i:end])
+                i = end
+                continue
+            out.append(ch)
+            i += 1
+
+        if not removed and not in_block:
+            yield line
+            continue
+
+        code = "".join(out).rstrip()
+        if code:
+            yield code + newline
+
+
+def _regex_allowed(out: List[str]) -> bool:
+    """Может ли «/» начинать литерал регулярного выражения (а не деление)"""
+    previous = "".join(out[-16:]).rstrip()
+    if not previous:
+        return True
+    if previous[-1] in "(,=:[!&|?{};+-*%<>~^":
+        return True
+    for keyword in REGEX_KEYWORDS:
+        # Только ключевое слово целиком: «margin / 2» — деление
+        if previous.endswith(keyword):
+            before = previous[-len(keyword) - 1:-len(keyword)]
+            return not (before.isalnum() or before in ("_", "$"))
+    return False
+
+
+def _regex_end(text: str, start: int) -> int:
+    """Позиция после литерала /.../флаги, начинающегося в start"""
+    i = start + 1
+    in_class = False
+    while i < len(text):
+        ch = text[i]
+        if ch == "\\":
+            i += 2
+            continue
+        if ch == "[":
+            in_class = True
+        elif ch == "]":
+            in_class = False
+        elif ch == "/" and not in_class:
+            i += 1
+            while i < len(text) and text[i].isalpha():
+                i += 1
+            return i
+        i += 1
+    # Не литерал (например, деление в конце строки) — берём только «/»
+    return start + 1
+
+
+def strip_comments(extension: str) -> Optional[Transform]:
+    if extension in PYTHON_EXTENSIONS:
+        return _strip_python_comments
+    if extension in JS_EXTENSIONS:
+        return lambda lines: _strip_c_comments(lines, line_comments=True, template_strings=True)
+    if extension in CSS_EXTENSIONS:
+        return lambda lines: _strip_c_comments(lines, line_comments=False, template_strings=False)
+    return None
+
+
+# =====================
+# Общие преобразования
+# =====================
+
+def _is_comment_start(stripped: str, extension: str) -> bool:
+    # Строки «* ...» — продолжение блока /* */, а не начало: в CSS «* {» — селектор
+    if extension in PYTHON_EXTENSIONS:
+        return stripped.startswith("#") and not stripped.startswith("#!")
+    if extension in JS_EXTENSIONS:
+        return stripped.startswith(("/*", "//"))
+    return stripped.startswith("/*")
+
+
+def _drop_license_banner(lines: Iterable[str], extension: str) -> Iterator[str]:
+    """
+    Убирает начальный блок комментариев, если это лицензия (_is_license).
+    Строки shebang и объявления кодировки сохраняются.
+    """
+    lines = iter(lines)
+    banner: List[str] = []
+    in_block = False
+
+    for line in lines:
+        stripped = line.strip()
+
+        # Пролог до комментария: shebang, «coding:»
+        if not banner and (stripped.startswith("#!") or (
+                extension in PYTHON_EXTENSIONS and stripped.startswith("#") and "coding" in stripped)):
+            yield line
+            continue
+
+        if in_block or (stripped and _is_comment_start(stripped, extension)) or (banner and not stripped):
+            if stripped.startswith("/*"):
+                in_block = True
+            if in_block and "*/" in stripped:
+                in_block = False
+            banner.append(line)
+            if len(banner) < MAX_BANNER_LINES:
+                continue
+            # Слишком длинный для заголовка комментарий остаётся как есть
+            yield from banner
+            break
+
+        if not _is_license(banner):
+            yield from banner
+        yield line
+        break
+
+    else:
+        # Файл закончился на комментарии
+        if not _is_license(banner):
+            yield from banner
+        return
+
+    yield from lines
+
+
+def _is_license(banner: List[str]) -> bool:
+    """
+    Лицензия — блок со строкой copyright/SPDX или многострочный блок
+    со словом license. Однострочное «# Compute the license fee» остаётся.
+    """
+    text = "".join(banner).lower()
+    if COPYRIGHT_RE.search(text):
+        return True
+    lines = sum(1 for line in banner if line.strip())
+    return lines >= MIN_LICENSE_BLOCK_LINES and LICENSE_RE.search(text) is not None
+
+
+def drop_license_banner(extension: str) -> Optional[Transform]:
+    if extension in PYTHON_EXTENSIONS | JS_EXTENSIONS | CSS_EXTENSIONS:
+        return lambda lines: _drop_license_banner(lines, extension)
+    return None
+
+
+def _strip_trailing_whitespace(lines: Iterable[str]) -> Iterator[str]:
+    for line in lines:
+        if line.endswith("\n"):
+            yield line[:-1].rstrip() + "\n"
+        else:
+            yield line.rstrip()
+
+
+def strip_trailing_whitespace(extension: str) -> Optional[Transform]:
+    if extension in CODE_EXTENSIONS:
+        return _strip_trailing_whitespace
+    return None
+
+
+def _collapse_blank_lines(lines: Iterable[str]) -> Iterator[str]:
+    """Несколько пустых строк подряд заменяет одной"""
+    previous_blank = False
+    for line in lines:
+        blank = not line.strip()
+        if not (blank and previous_blank):
+            yield line
+        previous_blank = blank
+
+
+def collapse_blank_lines(extension: str) -> Optional[Transform]:
+    if extension in CODE_EXTENSIONS:
+        return _collapse_blank_lines
+    return None
+
+
+# Имя -> (описание, фабрика преобразования для расширения).
+# Порядок в списке — порядок применения.
+TRANSFORMS: List[Tuple[str, str, Callable[[str], Optional[Transform]]]] = [
+    ("drop_license", "Убрать лицензионные заголовки", drop_license_banner),
+    ("strip_comments", "Убрать комментарии (.py, .js, .css)", strip_comments),
+    ("trailing_whitespace", "Убрать пробелы в концах строк", strip_trailing_whitespace),
+    ("collapse_blank_lines", "Схлопнуть пустые строки", collapse_blank_lines),
+]
+
+TRANSFORM_TITLES: Dict[str, str] = {name: title for name, title, _ in TRANSFORMS}
+
+
+def _text_size(line: str) -> int:
+    return len(line) if line.isascii() else len(line.encode("utf-8"))
+
+
+class ContentTransforms:
+    """
+    Набор включённых преобразований и счётчик сэкономленных байт.
+
+        transforms = ContentTransforms(["strip_comments", "collapse_blank_lines"])
+        for line in transforms.apply(lines, ".py"):
+            ...
+        transforms.bytes_saved  # {"strip_comments": 1234, ...}
+    """
+
+    def __init__(self, names: Iterable[str]):
+        names = set(names)
+        unknown = names - set(TRANSFORM_TITLES)
+        if unknown:
+            raise ValueError(f"Неизвестные преобразования: {', '.join(sorted(unknown))}")
+
+        self._factories = [(name, factory) for name, _, factory in TRANSFORMS if name in names]
+        self._pipelines: Dict[str, List[Tuple[str, Transform]]] = {}
+
+        # Байты содержимого до преобразований и экономия каждого из них
+        self.bytes_in = 0
+        self.bytes_saved: Dict[str, int] = {name: 0 for name, _ in self._factories}
+
+    @property
+    def names(self) -> List[str]:
+        return [name for name, _ in self._factories]
+
+    def is_empty(self) -> bool:
+        return not self._factories
+
+    def applies_to(self, extension: str) -> bool:
+        return bool(self._pipeline(extension))
+
+    def apply(self, lines: Iterable[str], extension: str) -> Iterator[str]:
+        """
+        Пропускает строки файла через преобразования для его расширения.
+        Экономия учитывается, только если файл прочитан до конца —
+        при ошибке чтения на середине счётчики не меняются.
+        """
+        pipeline = self._pipeline(extension)
+        # counts[i] — байты на входе i-го преобразования; последний — на выходе
+        counts = [0] * (len(pipeline) + 1)
+
+        def counted(stage_lines: Iterable[str], index: int) -> Iterator[str]:
+            for line in stage_lines:
+                counts[index] += _text_size(line)
+                yield line
+
+        stream = counted(lines, 0)
+        for index, (_, transform) in enumerate(pipeline, start=1):
+            stream = counted(transform(stream), index)
+
+        yield from stream
+
+        self.bytes_in += counts[0]
+        for index, (name, _) in enumerate(pipeline):
+            self.bytes_saved[name] += counts[index] - counts[index + 1]
+
+    @property
+    def total_saved(self) -> int:
+        return sum(self.bytes_saved.values())
+
+    # =====================
+    # Внутренние методы
+    # =====================
+
+    def _pipeline(self, extension: str) -> List[Tuple[str, Transform]]:
+        pipeline = self._pipelines.get(extension)
+        if pipeline is None:
+            pipeline = []
+            for name, factory in self._factories:
+                transform = factory(extension)
+                if transform is not None:
+                    pipeline.append((name, transform))
+            self._pipelines[extension] = pipeline
+        return pipeline
@@ -0,0 +1,270 @@
+# analyzer/tree_model.py
+
+import os
+from array import array
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, TextIO
+
+from .filter_plan import FilterPlan
+from .tree_render import tree_lines
+
+
+KIND_DIR = 0
+KIND_FILE = 1
+# Папка, которую не удалось прочитать («<нет доступа>» в структуре)
+KIND_DENIED = 2
+
+
+class TreeModel:
+    """
+    Результат анализа в памяти — таблица узлов вместо объектов Path.
+
+    Узел — индекс в параллельных массивах: родитель, номер имени в пуле
+    строк (одинаковые имена вроде __init__.py хранятся один раз), вид,
+    размер, флаг «попадает в раздел содержимого» и место среди соседей
+    в порядке os.scandir. Узлы лежат в порядке обхода в глубину, поэтому
+    поддерево узла — непрерывный диапазон [i, end(i)), а дети
+    перебираются без отдельных списков. Около 24 байт на узел плюс пул
+    имён: дерево в 2 млн элементов занимает сотни МБ даже при уникальных
+    именах.
+
+    В модели только то, что попадает в раздел структуры (без отсечённых
+    папок и игнорируемых файлов). Содержимое читается с диска по запросу
+    (read_bytes, read_text); render() выводит текст в формате результата.
+    """
+
+    def __init__(self, root_dir: Path):
+        self.root_dir = Path(root_dir)
+
+        self.parents = array("i")
+        self.name_ids = array("I")
+        self.kinds = bytearray()
+        self.sizes = array("q")
+        self.included = bytearray()
+        # Номер среди соседей в порядке os.scandir: в нём os.walk, а значит
+        # и ProjectAnalyzer.run(), выводит содержимое (структура — по имени)
+        self.walk_order = array("I")
+        # Индекс за последним узлом поддерева
+        self.ends = array("I")
+
+        self.names: List[str] = []
+        self._name_ids: Optional[Dict[str, int]] = {}
+
+    # =====================
+    # Построение
+    # =====================
+
+    @classmethod
+    def build(cls, root_dir: Path, plan: FilterPlan) -> "TreeModel":
+        """
+        Обходит папку (os.scandir) и строит модель с учётом фильтров.
+        Как в ProjectAnalyzer.run(), символические ссылки на папки
+        раскрываются в структуре, но их файлы не попадают в содержимое
+        (os.walk в них не заходит).
+        """
+        root_dir = Path(root_dir).resolve()
+        model = cls(root_dir)
+        model._scan(str(root_dir), root_dir.name, -1, 0, plan, True)
+        # Словарь нужен только для интернирования при построении
+        model._name_ids = None
+        return model
+
+    def _add(
+        self, parent: int, walk_order: int, name: str, kind: int, size: int, included: bool
+    ) -> int:
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = len(self.names)
+            self._name_ids[name] = name_id
+            self.names.append(name)
+
+        index = len(self.kinds)
+        self.parents.append(parent)
+        self.name_ids.append(name_id)
+        self.kinds.append(kind)
+        self.sizes.append(size)
+        self.included.append(included)
+        self.walk_order.append(walk_order)
+        self.ends.append(index + 1)
+        return index
+
+    def _scan(
+        self, path: str, name: str, parent: int, walk_order: int, plan: FilterPlan, contents: bool
+    ) -> None:
+        index = self._add(parent, walk_order, name, KIND_DIR, 0, False)
+
+        try:
+            with os.scandir(path) as it:
+                entries = sorted(enumerate(it), key=lambda e: e[1].name.lower())
+        except (PermissionError, FileNotFoundError, NotADirectoryError):
+            self.kinds[index] = KIND_DENIED
+            return
+
+        dirs = []
+        files = []
+        for order, entry in entries:
+            try:
+                if entry.is_dir():
+                    if not plan.is_dir_pruned(entry.name):
+                        dirs.append((order, entry))
+                elif entry.is_file() and not plan.is_file_ignored(entry.name):
+                    files.append((order, entry))
+            except OSError:
+                continue
+
+        for order, entry in dirs:
+            self._scan(
+                entry.path, entry.name, index, order, plan, contents and not entry.is_symlink()
+            )
+
+        root = str(self.root_dir)
+        for order, entry in files:
+            try:
+                size = entry.stat().st_size
+            except OSError:
+                size = 0
+
+            included = contents and plan.is_extension_allowed(
+                os.path.splitext(entry.name)[1].lower()
+            )
+            # Ссылки за пределы проекта в содержимое не попадают (как в ProjectAnalyzer)
+            if included and entry.is_symlink():
+                included = Path(entry.path).resolve().is_relative_to(root)
+            self._add(index, order, entry.name, KIND_FILE, size, included)
+
+        self.ends[index] = len(self.kinds)
+
+    # =====================
+    # Доступ к узлам
+    # =====================
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def name(self, index: int) -> str:
+        return self.names[self.name_ids[index]]
+
+    def kind(self, index: int) -> int:
+        return self.kinds[index]
+
+    def size(self, index: int) -> int:
+        return self.sizes[index]
+
+    def is_included(self, index: int) -> bool:
+        return bool(self.included[index])
+
+    def parent(self, index: int) -> int:
+        """Индекс родителя или -1 для корня"""
+        return self.parents[index]
+
+    def children(self, index: int) -> Iterator[int]:
+        """Дети узла: сначала папки, затем файлы, по имени без учёта регистра"""
+        child = index + 1
+        end = self.ends[index]
+        while child < end:
+            yield child
+            child = self.ends[child]
+
+    def rel_path(self, index: int) -> str:
+        """Путь относительно корня через «/» (пустая строка для корня)"""
+        parts = []
+        while index > 0:
+            parts.append(self.name(index))
+            index = self.parents[index]
+        return "/".join(reversed(parts))
+
+    def path(self, index: int) -> Path:
+        rel_path = self.rel_path(index)
+        return self.root_dir / rel_path if rel_path else self.root_dir
+
+    def iter_included(self) -> Iterator[int]:
+        """
+        Файлы раздела содержимого в порядке ProjectAnalyzer.run() (os.walk):
+        файлы папки, затем её папки, и те и другие в порядке os.scandir
+        """
+        if len(self) == 0:
+            return
+        by_walk_order = self.walk_order.__getitem__
+        stack = [0]
+        while stack:
+            index = stack.pop()
+            dirs = []
+            files = []
+            for child in self.children(index):
+                if self.kinds[child] == KIND_FILE:
+                    if self.included[child]:
+                        files.append(child)
+                else:
+                    dirs.append(child)
+            files.sort(key=by_walk_order)
+            yield from files
+            dirs.sort(key=by_walk_order, reverse=True)
+            stack.extend(dirs)
+
+    @property
+    def file_count(self) -> int:
+        return self.kinds.count(KIND_FILE)
+
+    @property
+    def included_count(self) -> int:
+        return self.included.count(1)
+
+    @property
+    def included_bytes(self) -> int:
+        return sum(self.sizes[i] for i in range(len(self)) if self.included[i])
+
+    # =====================
+    # Содержимое
+    # =====================
+
+    def read_bytes(self, index: int) -> bytes:
+        with open(self.path(index), "rb") as f:
+            return f.read()
+
+    def read_text(self, index: int) -> str:
+        """Содержимое как при анализе: UTF-8, универсальные переводы строк"""
+        with open(self.path(index), "r", encoding="utf-8") as f:
+            return f.read()
+
+    # =====================
+    # Текст результата
+    # =====================
+
+    def render(self, out: TextIO) -> None:
+        """Пишет структуру и содержимое так же, как ProjectAnalyzer.run()"""
+        out.write(f"Анализ проекта: {self.root_dir}\n\n")
+        out.write("Структура проекта:\n")
+        if len(self):
+            for line in tree_lines(0, self.name, self._tree_listing):
+                out.write(line + "\n")
+        out.write("\nТекст из файлов проекта:\n")
+
+        for index in self.iter_included():
+            file_path = self.path(index)
+            try:
+                content = self.read_text(index)
+                out.write(f"\nСодержимое {file_path}:\n{content}\n")
+            except UnicodeDecodeError:
+                out.write(f"\nСодержимое {file_path}:\n<бинарный или нечитаемый файл>\n")
+            except Exception as e:
+                out.write(f"\nОшибка при чтении {file_path}: {e}\n")
+
+    def save(self, output_file: Path) -> None:
+        """Записывает результат в файл (с итоговой строкой, как run())"""
+        output_file = Path(output_file).resolve()
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_file, "w", encoding="utf-8") as f:
+            self.render(f)
+            f.write(f"\nАнализ завершен. Результаты сохранены в {output_file}\n")
+
+    def _tree_listing(self, index: int):
+        if self.kinds[index] == KIND_DENIED:
+            return None
+        dirs = []
+        files = []
+        for child in self.children(index):
+            if self.kinds[child] == KIND_FILE:
+                files.append(self.name(child))
+            else:
+                dirs.append(child)
+        return dirs, files
@@ -0,0 +1,50 @@
+# analyzer/tree_render.py
+
+"""
+Строки раздела «Структура проекта».
+
+Дерево выводится одним кодом для всех представлений проекта: папки на
+диске (ProjectAnalyzer), источника (архив, ревизия git), снимка для
+предпросмотра (DirectorySnapshot) и модели в памяти (TreeModel), —
+поэтому их текст не расходится. Представление передаёт узел корня
+и две функции: имя узла и список папки.
+"""
+
+from typing import Callable, Iterator, Optional, Sequence, Tuple, TypeVar
+
+Node = TypeVar("Node")
+
+# Список папки: вложенные папки (узлы) и имена файлов, уже отфильтрованные
+# и упорядоченные; None — папку не удалось прочитать
+Listing = Optional[Tuple[Sequence[Node], Sequence[str]]]
+
+DENIED = "<нет доступа>"
+
+
+def tree_lines(
+    root: Node,
+    name: Callable[[Node], str],
+    listing: Callable[[Node], Listing]
+) -> Iterator[str]:
+    """
+    Строки дерева без перевода строки. listing вызывается для каждой
+    папки один раз, после строки с её именем и в порядке вывода.
+    """
+    return _lines(root, name, listing, "", True)
+
+
+def _lines(node, name, listing, indent: str, is_last: bool) -> Iterator[str]:
+    yield f"{indent}{'└── ' if is_last else '├── '}{name(node)}"
+    indent += "    " if is_last else "│   "
+
+    entries = listing(node)
+    if entries is None:
+        yield f"{indent}└── {DENIED}"
+        return
+
+    dirs, files = entries
+    for i, child in enumerate(dirs):
+        yield from _lines(child, name, listing, indent, i == len(dirs) - 1 and not files)
+
+    for i, file_name in enumerate(files):
+        yield f"{indent}{'└── ' if i == len(files) - 1 else '├── '}{file_name}"
@@ -1,9 +1,15 @@
+# Импортируется первым: от него отсчитывается время запуска
+from structurizer.ui import startup_timing
+
+import multiprocessing
 import sys
 import os
 from PySide6.QtWidgets import QApplication
 from PySide6.QtGui import QIcon
 from structurizer.ui.main_window import MainWindow
 
+startup_timing.mark("импорт модулей")
+
 def main():
     # Устанавливаем переменные окружения для Qt
     os.environ["QT_ENABLE_HIGHDPI_SCALING"] = "1"
@@ -31,8 +37,11 @@ def main():
     
     window = MainWindow()
     window.show()
+    startup_timing.mark("окно показано")
     
     sys.exit(app.exec())
 
 if __name__ == "__main__":
+    # Нужно собранному приложению для процессов параллельного анализа
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -19,4 +19,23 @@ def get_storage_dir():
     return storage_dir
 
 BASE_DIR = get_base_dir()
-STORAGE_DIR = get_storage_dir()
\ No newline at end of file
+STORAGE_DIR = get_storage_dir()
+
+# Политика хранения файлов результатов (None — ограничение не действует)
+RETENTION_MAX_TOTAL_MB = None
+RETENTION_MAX_RUNS_PER_PROJECT = None
+RETENTION_MAX_AGE_DAYS = None
+
+# Предупреждение перед анализом, если результат больше порога (None — порог
+# не проверяется). Оценка — по прошлому запуску проекта с теми же фильтрами,
+# а без него — по обходу папки (ProjectAnalyzer.dry_run), прерываемому через
+# RUN_ESTIMATE_TIME_LIMIT_SECONDS: не уложившийся обход сам повод предупредить
+LARGE_RUN_WARNING_MB = 200
+LARGE_RUN_WARNING_SECONDS = 60
+RUN_ESTIMATE_TIME_LIMIT_SECONDS = 2
+
+# Параллельная запись результата: число процессов (None — по числу ядер)
+# и минимальный размер результата, с которого имеет смысл их запускать;
+# размер — та же оценка, что и для предупреждения о большом результате
+ANALYSIS_WORKERS = None
+PARALLEL_MIN_MB = 100
@@ -0,0 +1,109 @@
+# storage/file_lock.py
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+
+class FileLock:
+    """
+    Рекомендательная межпроцессная блокировка на отдельном .lock-файле.
+
+    Внутри процесса блокировка реентерабельна и дополнительно
+    защищена threading.RLock, поэтому её можно брать из разных потоков.
+    Сам .lock-файл не удаляется: удаление открывает гонку между процессами.
+    """
+
+    def __init__(self, path: Path, poll_interval: float = 0.01):
+        self.path = Path(path)
+        self.poll_interval = poll_interval
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def acquire(self) -> None:
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            try:
+                self._fd = os.open(str(self.path), os.O_RDWR | os.O_CREAT, 0o644)
+                self._lock_fd(self._fd)
+            except BaseException:
+                if self._fd is not None:
+                    os.close(self._fd)
+                    self._fd = None
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+
+    def release(self) -> None:
+        self._depth -= 1
+        if self._depth == 0:
+            try:
+                self._unlock_fd(self._fd)
+            finally:
+                os.close(self._fd)
+                self._fd = None
+        self._thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+    # =====================
+    # Платформенная часть
+    # =====================
+
+    if sys.platform == "win32":
+        def _lock_fd(self, fd: int) -> None:
+            import msvcrt
+            while True:
+                try:
+                    os.lseek(fd, 0, os.SEEK_SET)
+                    msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                    return
+                except OSError:
+                    time.sleep(self.poll_interval)
+
+        def _unlock_fd(self, fd: int) -> None:
+            import msvcrt
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    else:
+        def _lock_fd(self, fd: int) -> None:
+            import fcntl
+            fcntl.flock(fd, fcntl.LOCK_EX)
+
+        def _unlock_fd(self, fd: int) -> None:
+            import fcntl
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+def atomic_write_json(path: Path, data: Any) -> None:
+    """
+    Записывает JSON во временный файл рядом с целевым и подменяет его
+    через os.replace. Читатель видит либо старую, либо новую версию файла.
+    """
+    path = Path(path)
+    fd, tmp_name = tempfile.mkstemp(
+        dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, str(path))
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
@@ -1,8 +1,18 @@
 import json
+import os
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .file_lock import FileLock, atomic_write_json
+from .project_stats import ProjectStats
+from .section_index import SectionIndex
+from .output_stats import OutputStatsCache
+from .run_diff import ManifestCache
 
 
 class HistoryEntry:
@@ -22,6 +32,42 @@ class HistoryEntry:
     def __str__(self):
         return str(self.project_path)
     
+
+class HistoryBatch:
+    """
+    Набор изменений истории, применяемых одной записью файла.
+    Создаётся через HistoryManager.batch().
+    """
+
+    def __init__(self, manager: "HistoryManager"):
+        self._manager = manager
+        self._operations: List[tuple] = []
+
+        # Заполняются после применения пакета
+        self.added: List[Dict] = []
+        self.updated: List[Dict] = []
+        self.removed: List[Dict] = []
+
+    def add(self, project_path: Path, output_file: Path, settings: Dict) -> Dict:
+        """Добавляет новую запись и возвращает её"""
+        item = self._manager._new_item(project_path, output_file, settings)
+        self._operations.append(("add", item))
+        return item
+
+    def add_item(self, item: Dict) -> None:
+        """Добавляет готовую запись (например, при импорте чужой истории)"""
+        self._operations.append(("add", dict(item)))
+
+    def update(self, item_id: str, **kwargs) -> None:
+        self._operations.append(("update", item_id, kwargs))
+
+    def remove(self, item_id: str, delete_output: bool = True) -> None:
+        self._operations.append(("remove", item_id, delete_output))
+
+    def __len__(self):
+        return len(self._operations)
+
+
 class HistoryManager:
     HISTORY_VERSION = 1
 
@@ -32,15 +78,34 @@ class HistoryManager:
         self.base_dir = Path(base_dir).resolve()
         self.outputs_dir = self.base_dir / "outputs"
         self.history_file = self.base_dir / "history.json"
-        
+
         self.base_dir.mkdir(parents=True, exist_ok=True)
         self.outputs_dir.mkdir(parents=True, exist_ok=True)
 
-        if not self.history_file.exists():
-            self._write_history({
-                "version": self.HISTORY_VERSION,
-                "items": []
-            })
+        # Блокировка чтения-изменения-записи между процессами и потоками
+        # (несколько окон, фоновая очистка, консольные скрипты)
+        self._lock = FileLock(self.base_dir / "history.json.lock")
+
+        # Сводка по проектам, которую обновляют add/update/remove
+        self.project_stats = ProjectStats(self.base_dir)
+
+        # Кэш разделов файлов результатов (для копирования отдельных файлов)
+        self.section_index = SectionIndex(self.base_dir / "cache" / "sections")
+
+        # Число строк/размер/число файлов результатов без повторного чтения
+        self.output_stats = OutputStatsCache(self.base_dir / "cache" / "outputs")
+
+        # Манифесты файлов результатов для сравнения запусков (RunDiffEngine)
+        self.manifests = ManifestCache(self.base_dir / "cache" / "manifests")
+
+        with self._lock:
+            if not self.history_file.exists():
+                self._write_history({
+                    "version": self.HISTORY_VERSION,
+                    "items": []
+                })
+            if not self.project_stats.stats_file.exists():
+                self.project_stats.rebuild(self._read_history().get("items", []))
 
     # =====================
     # Публичный API
@@ -59,44 +124,48 @@ class HistoryManager:
         self,
         project_path: Path,
         output_file: Path,
-        settings: Dict
+        settings: Dict,
+        **fields
     ) -> Dict:
         """
         Добавляет новую запись в историю и возвращает её.
+        fields — дополнительные поля записи (line_count, output_size,
+        analysis_time и т.п.), чтобы не делать отдельный update.
         """
-        data = self._read_history()
+        item = self._new_item(project_path, output_file, settings)
+        item.update(fields)
 
-        item = {
-            "id": uuid.uuid4().hex[:8],
-            "project_path": str(project_path),
-            "output_file": str(output_file),
-            "created_at": datetime.now().isoformat(timespec="seconds"),
-            "settings": settings,
-            "display_name": project_path.name,
-            "description": "",
-            "line_count": 0,
-        }
-
-        data["items"].append(item)
-        self._write_history(data)
+        def apply(data, changes):
+            data.setdefault("items", []).append(item)
+            changes.append((None, dict(item)))
+            return True, item
 
-        return item
+        return self._mutate(apply)
     
     def update(self, item_id: str, **kwargs) -> Optional[Dict]:
         """
         Обновляет запись по id. kwargs - поля для обновления.
         Возвращает обновленную запись или None, если запись не найдена.
         """
-        data = self._read_history()
-        items = data.get("items", [])
+        def apply(data, changes):
+            for item in data.get("items", []):
+                if item.get("id") == item_id:
+                    old_item = dict(item)
+                    item.update(kwargs)
+                    changes.append((old_item, dict(item)))
+                    return True, item
+            return False, None
 
-        for item in items:
-            if item.get("id") == item_id:
-                item.update(kwargs)
-                self._write_history(data)
-                return item
-    
-        return None
+        return self._mutate(apply)
+
+    def touch(self, item_id: str) -> Optional[Dict]:
+        """
+        Отмечает время последнего обращения к результату (для очистки по LRU).
+        """
+        return self.update(
+            item_id,
+            last_accessed_at=datetime.now().isoformat(timespec="seconds")
+        )
 
     def get_all(self) -> List[Dict]:
         """
@@ -110,26 +179,9 @@ class HistoryManager:
         Удаляет запись по id.
         Если delete_output=True — удаляет и файл результата.
         """
-        data = self._read_history()
-        items = data.get("items", [])
-
-        item = next((i for i in items if i["id"] == item_id), None)
-        if not item:
-            return False
-
-        if delete_output:
-            output_path = Path(item["output_file"])
-            try:
-                if output_path.exists():
-                    output_path.unlink()
-            except Exception:
-                # Файл мог быть удалён вручную — это не критично
-                pass
-
-        data["items"] = [i for i in items if i["id"] != item_id]
-        self._write_history(data)
-
-        return True
+        with self.batch() as batch:
+            batch.remove(item_id, delete_output)
+        return bool(batch.removed)
 
     def get(self, item_id: str) -> Optional[Dict]:
         """
@@ -138,23 +190,268 @@ class HistoryManager:
         items = self.load()
         return next((i for i in items if i["id"] == item_id), None)
 
+    def find_latest(self, project_path: Path, filter_plan_key: str) -> Optional[Dict]:
+        """
+        Возвращает последний запуск проекта с теми же фильтрами
+        (по FilterPlan.key) или None.
+        """
+        project_path = str(project_path)
+        for item in reversed(self.load()):
+            if (
+                item.get("project_path") == project_path
+                and item.get("filter_plan_key") == filter_plan_key
+                and not item.get("evicted")
+            ):
+                return item
+        return None
+
+    def recent_throughput(self, limit: int = 20) -> Optional[float]:
+        """
+        Скорость записи результата (байт в секунду) по последним limit
+        запускам с известными размером и временем анализа, или None.
+        """
+        total_bytes = 0
+        total_time = 0.0
+        counted = 0
+        for item in reversed(self.load()):
+            size = item.get("output_size") or 0
+            seconds = item.get("analysis_time") or 0
+            if size <= 0 or seconds <= 0:
+                continue
+            total_bytes += size
+            total_time += seconds
+            counted += 1
+            if counted >= limit:
+                break
+
+        if counted == 0:
+            return None
+        return total_bytes / total_time
+
+    @contextmanager
+    def batch(self) -> Iterator[HistoryBatch]:
+        """
+        Пакетное изменение истории: одно чтение и одна запись файла
+        на любое количество операций. Если блок with завершился
+        исключением, история не меняется.
+
+            with history.batch() as batch:
+                batch.update(item_id, description="...")
+                batch.remove(other_id)
+
+        Файлы результатов удалённых записей удаляются параллельно
+        после записи истории.
+        """
+        batch = HistoryBatch(self)
+        yield batch
+
+        if not len(batch):
+            return
+
+        def apply(data, changes):
+            outputs = self._apply_batch(data, batch, changes)
+            changed = bool(batch.added or batch.updated or batch.removed)
+            return changed, outputs
+
+        outputs_to_delete = self._mutate(apply)
+        self.delete_outputs(outputs_to_delete)
+
+    def remove_many(self, item_ids: Iterable[str], delete_output: bool = True) -> List[Dict]:
+        """
+        Удаляет несколько записей за одну запись файла.
+        Возвращает удалённые записи.
+        """
+        with self.batch() as batch:
+            for item_id in item_ids:
+                batch.remove(item_id, delete_output)
+        return batch.removed
+
+    def update_many(self, updates: Dict[str, Dict]) -> List[Dict]:
+        """
+        Обновляет несколько записей: {item_id: {поле: значение}}.
+        Возвращает обновлённые записи.
+        """
+        with self.batch() as batch:
+            for item_id, fields in updates.items():
+                batch.update(item_id, **fields)
+        return batch.updated
+
+    def rebuild_project_stats(self) -> None:
+        """Пересчитывает сводку по проектам с нуля"""
+        with self._lock:
+            self.project_stats.rebuild(self._read_history().get("items", []))
+
+    def delete_outputs(self, paths: Iterable[Path]) -> List[str]:
+        """
+        Параллельно удаляет файлы результатов.
+        Возвращает описания ошибок; отсутствующие файлы ошибкой не считаются.
+        """
+        paths = [Path(p) for p in paths]
+        if not paths:
+            return []
+
+        def unlink(path: Path) -> Optional[str]:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                return f"{path}: {e}"
+            self.section_index.discard(path)
+            self.output_stats.discard(path)
+            self.manifests.discard(path)
+            return None
+
+        with ThreadPoolExecutor(max_workers=min(8, len(paths))) as executor:
+            return [error for error in executor.map(unlink, paths) if error]
+
     # =====================
     # Внутренние методы
     # =====================
 
-    def _read_history(self) -> Dict:
+    def _new_item(self, project_path: Path, output_file: Path, settings: Dict) -> Dict:
+        return {
+            "id": uuid.uuid4().hex[:8],
+            "project_path": str(project_path),
+            "output_file": str(output_file),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "settings": settings,
+            "display_name": project_path.name,
+            "description": "",
+            "line_count": 0,
+        }
+
+    def _apply_batch(self, data: Dict, batch: HistoryBatch, changes: List) -> List[Path]:
+        """
+        Применяет операции пакета к данным истории, записывая в changes
+        пары (старая, новая версия записи) для сводки по проектам.
+        Возвращает пути файлов результатов, которые нужно удалить.
+        """
+        # Пакет может применяться повторно, если файл изменил другой процесс
+        batch.added, batch.updated, batch.removed = [], [], []
+
+        items = data.setdefault("items", [])
+        by_id = {item.get("id"): item for item in items}
+        removed_ids = set()
+        outputs_to_delete = []
+
+        for operation in batch._operations:
+            kind = operation[0]
+
+            if kind == "add":
+                item = operation[1]
+                items.append(item)
+                by_id[item.get("id")] = item
+                batch.added.append(item)
+                changes.append((None, dict(item)))
+
+            elif kind == "update":
+                _, item_id, fields = operation
+                item = by_id.get(item_id)
+                if item is not None and item_id not in removed_ids:
+                    old_item = dict(item)
+                    item.update(fields)
+                    batch.updated.append(item)
+                    changes.append((old_item, dict(item)))
+
+            elif kind == "remove":
+                _, item_id, delete_output = operation
+                item = by_id.get(item_id)
+                if item is None or item_id in removed_ids:
+                    continue
+                removed_ids.add(item_id)
+                batch.removed.append(item)
+                changes.append((dict(item), None))
+                if delete_output and item.get("output_file"):
+                    outputs_to_delete.append(Path(item["output_file"]))
+
+        if removed_ids:
+            data["items"] = [i for i in items if i.get("id") not in removed_ids]
+
+        return outputs_to_delete
+
+    def _mutate(self, apply: Callable[[Dict, List], Tuple[bool, object]]):
+        """
+        Чтение-изменение-запись с оптимистичной проверкой версии.
+
+        apply(data, changes) меняет данные, дописывает в changes пары
+        (старая, новая версия записи) и возвращает (изменено, результат).
+        Файл читается и изменяется без блокировки; под блокировкой
+        проверяется, что его никто не переписал, и выполняется только
+        запись. Если файл успел измениться, он перечитывается и apply
+        применяется заново уже под блокировкой.
+        """
+        data, stamp = self._read_history_with_stamp()
+        changes = []
+        changed, result = apply(data, changes)
+
+        with self._lock:
+            if self._file_stamp() != stamp:
+                data, _ = self._read_history_with_stamp()
+                changes = []
+                changed, result = apply(data, changes)
+
+            if changed:
+                self._write_history(data)
+                self.project_stats.apply_changes(changes, data.get("items", []))
+
+        return result
+
+    def _file_stamp(self) -> Optional[Tuple[int, int, int]]:
         try:
-            with open(self.history_file, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            # Восстановление при повреждённом файле
-            data = {
-                "version": self.HISTORY_VERSION,
-                "items": []
-            }
+            st = os.stat(self.history_file)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _empty_history(self) -> Dict:
+        return {
+            "version": self.HISTORY_VERSION,
+            "items": []
+        }
+
+    def _read_history(self) -> Dict:
+        return self._read_history_with_stamp()[0]
+
+    def _read_history_with_stamp(self, attempts: int = 3) -> Tuple[Dict, Optional[Tuple[int, int, int]]]:
+        """
+        Читает историю вместе с отметкой версии файла (inode, mtime_ns, size).
+        """
+        for attempt in range(attempts):
+            try:
+                with open(self.history_file, "r", encoding="utf-8") as f:
+                    st = os.fstat(f.fileno())
+                    data = json.load(f)
+                return data, (st.st_ino, st.st_mtime_ns, st.st_size)
+            except FileNotFoundError:
+                return self._empty_history(), None
+            except json.JSONDecodeError:
+                # Старая версия программы могла писать файл на месте — ждём
+                time.sleep(0.05 * (attempt + 1))
+
+        return self._recover_corrupted_history(), self._file_stamp()
+
+    def _recover_corrupted_history(self) -> Dict:
+        """
+        Откладывает повреждённый файл в сторону и начинает историю заново.
+        Старое содержимое не теряется, его можно восстановить вручную.
+        """
+        with self._lock:
+            try:
+                with open(self.history_file, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except FileNotFoundError:
+                return self._empty_history()
+            except json.JSONDecodeError:
+                pass
+
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            backup = self.history_file.with_name(f"history.json.corrupt-{timestamp}")
+            os.replace(self.history_file, backup)
+
+            data = self._empty_history()
             self._write_history(data)
             return data
 
     def _write_history(self, data: Dict) -> None:
-        with open(self.history_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        atomic_write_json(self.history_file, data)
@@ -0,0 +1,148 @@
+# storage/listing_cache.py
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .file_lock import atomic_write_json
+
+
+# Отметка актуальности папки: (mtime_ns, inode)
+Stamp = Tuple[int, int]
+
+# Список папки: имена вложенных папок и файлов, отсортированные как в анализаторе
+Listing = Tuple[List[str], List[str]]
+
+
+class DirectoryListingCache:
+    """
+    Кэш списков папок для раздела структуры проекта.
+
+    Для каждой папки хранится отсортированный список вложенных папок
+    и файлов (уже разобранный по типам) и отметка папки — mtime_ns
+    и inode. Добавление, удаление и переименование элемента меняют
+    mtime папки, поэтому при совпадающей отметке список берётся из
+    кэша: вместо iterdir и is_dir/is_file для каждого элемента — один
+    stat папки.
+
+    Кэш свой для каждого корня проекта (отдельный JSON), при сохранении
+    остаются только папки, пройденные в этом запуске. Хранятся кэши
+    не более MAX_ROOTS корней — давно не анализировавшиеся удаляются.
+    """
+
+    CACHE_VERSION = 1
+
+    # Папку, изменённую меньше чем RACY_NS назад, не кэшируем: изменение
+    # в тот же квант mtime не было бы замечено при следующем запуске
+    RACY_NS = 2 * 10**9
+
+    # Сколько корней хранить; лишние удаляются по давности использования (mtime файла)
+    MAX_ROOTS = 50
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+        self._root: Optional[Path] = None
+        self._entries: Dict[str, List] = {}
+        self._visited: Dict[str, List] = {}
+        self._changed = False
+
+    # =====================
+    # Публичный API
+    # =====================
+
+    def begin(self, root_dir: Path) -> None:
+        """Загружает кэш корня root_dir перед обходом"""
+        self._root = Path(root_dir)
+        self._entries = self._read().get("dirs", {})
+        self._visited = {}
+        self._changed = False
+
+    def get(self, path: Path) -> Tuple[Optional[Listing], Optional[Stamp]]:
+        """
+        Возвращает (список папки или None, отметка папки). Отметку нужно
+        передать в put: она снята до чтения папки, поэтому изменение во
+        время чтения не попадёт в кэш под новой отметкой.
+        """
+        key = str(path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None, None
+        stamp = (stat.st_mtime_ns, stat.st_ino)
+
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == stamp[0] and entry[1] == stamp[1]:
+            self._visited[key] = entry
+            return (entry[2], entry[3]), stamp
+        return None, stamp
+
+    def put(self, path: Path, stamp: Optional[Stamp], dirs: List[str], files: List[str]) -> None:
+        if stamp is None or time.time_ns() - stamp[0] < self.RACY_NS:
+            return
+        self._visited[str(path)] = [stamp[0], stamp[1], dirs, files]
+        self._changed = True
+
+    def save(self) -> None:
+        """Сохраняет пройденные папки, если что-то изменилось"""
+        if self._root is None:
+            return
+        cache_file = self._cache_file()
+        if not self._changed and len(self._visited) == len(self._entries):
+            # Кэш использован — отмечаем, чтобы его не вытеснили первым
+            try:
+                os.utime(cache_file)
+            except OSError:
+                pass
+            return
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        atomic_write_json(cache_file, {
+            "version": self.CACHE_VERSION,
+            "root": str(self._root),
+            "dirs": self._visited,
+        })
+        self._changed = False
+        self._prune(keep=cache_file)
+
+    # =====================
+    # Внутренние методы
+    # =====================
+
+    def _cache_file(self) -> Path:
+        key = hashlib.sha1(os.path.abspath(self._root).encode("utf-8")).hexdigest()[:16]
+        return self.cache_dir / f"{key}.json"
+
+    def _prune(self, keep: Path) -> None:
+        """Удаляет кэши сверх MAX_ROOTS, начиная с давно использованных"""
+        files = []
+        for path in self.cache_dir.glob("*.json"):
+            if path == keep:
+                continue
+            try:
+                files.append((path.stat().st_mtime_ns, path))
+            except OSError:
+                continue
+
+        excess = len(files) + 1 - self.MAX_ROOTS
+        if excess <= 0:
+            return
+        files.sort()
+        for _, path in files[:excess]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def _read(self) -> Dict:
+        try:
+            with open(self._cache_file(), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            return {}
+
+        if data.get("version") != self.CACHE_VERSION:
+            return {}
+        return data
@@ -0,0 +1,157 @@
+# storage/output_stats.py
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from .file_lock import atomic_write_json
+from .section_index import SECTION_PREFIX
+
+
+class OutputStatsCache:
+    """
+    Кэш характеристик файлов результатов: число строк, размер в байтах
+    и число файлов проекта в результате.
+
+    Запись действительна, пока у файла те же размер и mtime_ns, поэтому
+    окно деталей показывает цифры без чтения многогигабайтного файла.
+    Заполняется при анализе (record), а пересчёт изменившегося файла
+    выполняется в фоне (refresh_in_background).
+
+    Как и SectionIndex, хранит по маленькому JSON на файл результата:
+    чтение и удаление записи не трогают записи других результатов.
+    """
+
+    STATS_VERSION = 1
+
+    # Размер блока при пересчёте
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+
+    # =====================
+    # Публичный API
+    # =====================
+
+    def get(self, output_file: Path) -> Optional[Dict]:
+        """
+        Возвращает {"line_count", "byte_size", "file_count"}, если запись
+        соответствует файлу на диске, иначе None.
+        """
+        try:
+            stat = os.stat(output_file)
+        except OSError:
+            return None
+
+        entry = self._read(output_file)
+        if (
+            entry is None
+            or entry.get("size") != stat.st_size
+            or entry.get("mtime_ns") != stat.st_mtime_ns
+        ):
+            return None
+        return self._public(entry)
+
+    def record(self, output_file: Path, line_count: int, file_count: int) -> Dict:
+        """Сохраняет характеристики, известные сразу после анализа"""
+        stat = os.stat(output_file)
+        entry = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "line_count": line_count,
+            "file_count": file_count,
+        }
+        self._store(output_file, entry)
+        return self._public(entry)
+
+    def compute(self, output_file: Path) -> Dict:
+        """Пересчитывает характеристики одним проходом по файлу и кэширует их"""
+        stat = os.stat(output_file)
+        needle = b"\n\n" + SECTION_PREFIX
+        line_count = 0
+        file_count = 0
+        tail = b""
+
+        with open(output_file, "rb") as f:
+            while True:
+                chunk = f.read(self.CHUNK_SIZE)
+                if not chunk:
+                    break
+                line_count += chunk.count(b"\n")
+                # Хвост предыдущего блока — чтобы не потерять заголовок на границе
+                data = tail + chunk
+                file_count += data.count(needle)
+                tail = data[-(len(needle) - 1):]
+
+        if stat.st_size and not tail.endswith(b"\n"):
+            line_count += 1
+
+        entry = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "line_count": line_count,
+            "file_count": file_count,
+        }
+        self._store(output_file, entry)
+        return self._public(entry)
+
+    def refresh_in_background(
+        self,
+        output_file: Path,
+        on_finished: Optional[Callable[[Optional[Dict]], None]] = None,
+    ) -> threading.Thread:
+        """
+        Пересчитывает характеристики в фоновом потоке.
+        on_finished вызывается из этого потока (None — файл недоступен).
+        """
+        def worker():
+            try:
+                stats = self.compute(output_file)
+            except OSError:
+                stats = None
+            if on_finished:
+                on_finished(stats)
+
+        thread = threading.Thread(target=worker, name="structurizer-output-stats", daemon=True)
+        thread.start()
+        return thread
+
+    def discard(self, output_file: Path) -> None:
+        try:
+            self._cache_file(output_file).unlink()
+        except FileNotFoundError:
+            pass
+
+    # =====================
+    # Внутренние методы
+    # =====================
+
+    def _cache_file(self, output_file: Path) -> Path:
+        key = hashlib.sha1(os.path.abspath(output_file).encode("utf-8")).hexdigest()[:16]
+        return self.cache_dir / f"{key}.json"
+
+    def _public(self, entry: Dict) -> Dict:
+        return {
+            "line_count": entry["line_count"],
+            "byte_size": entry["size"],
+            "file_count": entry["file_count"],
+        }
+
+    def _store(self, output_file: Path, entry: Dict) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        atomic_write_json(self._cache_file(output_file), dict(entry, version=self.STATS_VERSION))
+
+    def _read(self, output_file: Path) -> Optional[Dict]:
+        try:
+            with open(self._cache_file(output_file), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            return None
+
+        if data.get("version") != self.STATS_VERSION:
+            return None
+        return data
@@ -0,0 +1,230 @@
+# storage/project_stats.py
+
+import json
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .file_lock import atomic_write_json
+
+
+class ProjectStats:
+    """
+    Материализованная сводка по проектам для панели статистики.
+
+    Хранится в project_stats.json рядом с history.json и обновляется
+    HistoryManager инкрементально: каждое изменение записи истории
+    превращается в разницу (убрать вклад старой версии, добавить вклад
+    новой). Чтение сводки стоит O(число проектов) и не требует ни разбора
+    history.json, ни обращения к файлам результатов.
+    """
+
+    STATS_VERSION = 1
+
+    # Сколько последних запусков хранить для тренда числа строк
+    TREND_LENGTH = 10
+
+    def __init__(self, base_dir: Path):
+        self.stats_file = Path(base_dir) / "project_stats.json"
+
+    # =====================
+    # Публичный API
+    # =====================
+
+    def get_all(self) -> List[Dict]:
+        """
+        Возвращает сводку по всем проектам, от недавно запускавшихся к старым.
+        """
+        projects = self._read().get("projects", {})
+
+        result = []
+        for project_path, stats in projects.items():
+            recent = stats.get("recent", [])
+            timed_runs = stats.get("timed_runs", 0)
+            # У записей старых версий размера нет — берём последний известный
+            sizes = [run["output_size"] for run in recent if run.get("output_size") is not None]
+            result.append({
+                "project_path": project_path,
+                "run_count": stats.get("run_count", 0),
+                "total_output_bytes": stats.get("total_output_bytes", 0),
+                "last_output_bytes": sizes[-1] if sizes else 0,
+                "last_run_at": recent[-1]["created_at"] if recent else "",
+                "line_count_trend": [run["line_count"] for run in recent],
+                "avg_analysis_time": (
+                    stats.get("total_analysis_time", 0.0) / timed_runs
+                    if timed_runs else None
+                ),
+            })
+
+        result.sort(key=lambda p: p["last_run_at"], reverse=True)
+        return result
+
+    def apply_changes(
+        self,
+        changes: Iterable[Tuple[Optional[Dict], Optional[Dict]]],
+        items: Optional[List[Dict]] = None
+    ) -> None:
+        """
+        Применяет изменения истории: пары (старая запись, новая запись).
+        None слева — запись добавлена, None справа — удалена.
+        items — записи истории после изменений: по ним восстанавливается
+        окно последних запусков проекта, если удаление его укоротило.
+        Вызывается HistoryManager под блокировкой истории.
+        """
+        changes = list(changes)
+        if not changes:
+            return
+
+        data = self._read()
+        projects = data.setdefault("projects", {})
+        shrunk = set()
+
+        for old_item, new_item in changes:
+            if (
+                old_item is not None and new_item is not None
+                and old_item.get("project_path") == new_item.get("project_path")
+            ):
+                self._replace(projects, old_item, new_item)
+                continue
+            if old_item is not None and self._subtract(projects, old_item):
+                shrunk.add(old_item.get("project_path", ""))
+            if new_item is not None:
+                self._add(projects, new_item)
+
+        if items is not None:
+            self._refill_recent(projects, shrunk, items)
+
+        self._write(data)
+
+    def rebuild(self, items: Iterable[Dict]) -> None:
+        """Пересчитывает сводку с нуля по всем записям истории"""
+        projects: Dict[str, Dict] = {}
+        for item in items:
+            self._add(projects, item)
+        self._write({"version": self.STATS_VERSION, "projects": projects})
+
+    # =====================
+    # Внутренние методы
+    # =====================
+
+    def _add(self, projects: Dict, item: Dict) -> None:
+        stats = projects.setdefault(item.get("project_path", ""), {
+            "run_count": 0,
+            "total_output_bytes": 0,
+            "total_analysis_time": 0.0,
+            "timed_runs": 0,
+            "recent": [],
+        })
+
+        stats["run_count"] += 1
+        self._add_totals(stats, item, 1)
+
+        recent = stats["recent"]
+        recent.append(self._run_record(item))
+        recent.sort(key=lambda r: r["created_at"])
+        del recent[:-self.TREND_LENGTH]
+
+    def _subtract(self, projects: Dict, item: Dict) -> bool:
+        """
+        Убирает вклад записи. Возвращает True, если окно последних
+        запусков стало короче, чем позволяет число оставшихся запусков.
+        """
+        project_path = item.get("project_path", "")
+        stats = projects.get(project_path)
+        if stats is None:
+            return False
+
+        stats["run_count"] -= 1
+        self._add_totals(stats, item, -1)
+        stats["recent"] = [r for r in stats["recent"] if r["id"] != item.get("id")]
+
+        if stats["run_count"] <= 0:
+            del projects[project_path]
+            return False
+        return len(stats["recent"]) < min(stats["run_count"], self.TREND_LENGTH)
+
+    def _refill_recent(self, projects: Dict, project_paths: Iterable[str], items: List[Dict]) -> None:
+        """Заново заполняет окно последних запусков проектов по записям истории"""
+        runs: Dict[str, List[Dict]] = {path: [] for path in project_paths if path in projects}
+        if not runs:
+            return
+
+        for item in items:
+            project_runs = runs.get(item.get("project_path", ""))
+            if project_runs is not None:
+                project_runs.append(self._run_record(item))
+
+        for project_path, project_runs in runs.items():
+            project_runs.sort(key=lambda r: r["created_at"])
+            projects[project_path]["recent"] = project_runs[-self.TREND_LENGTH:]
+
+    def _replace(self, projects: Dict, old_item: Dict, new_item: Dict) -> None:
+        """Обновление записи в пределах проекта: запуск остаётся на своём месте"""
+        stats = projects.get(new_item.get("project_path", ""))
+        if stats is None:
+            self._add(projects, new_item)
+            return
+
+        self._add_totals(stats, old_item, -1)
+        self._add_totals(stats, new_item, 1)
+
+        recent = stats["recent"]
+        for i, run in enumerate(recent):
+            if run["id"] == new_item.get("id"):
+                recent[i] = self._run_record(new_item)
+                break
+
+    def _add_totals(self, stats: Dict, item: Dict, sign: int) -> None:
+        if not item.get("evicted"):
+            stats["total_output_bytes"] += sign * (item.get("output_size", 0) or 0)
+
+        analysis_time = item.get("analysis_time")
+        if analysis_time is not None:
+            stats["total_analysis_time"] += sign * analysis_time
+            stats["timed_runs"] += sign
+
+    def _run_record(self, item: Dict) -> Dict:
+        return {
+            "id": item.get("id"),
+            "created_at": item.get("created_at", ""),
+            "line_count": item.get("line_count", 0) or 0,
+            # None — размер не записан (история старых версий)
+            "output_size": item.get("output_size"),
+        }
+
+    def _read(self) -> Dict:
+        try:
+            with open(self.stats_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            return {"version": self.STATS_VERSION, "projects": {}}
+
+    def _write(self, data: Dict) -> None:
+        atomic_write_json(self.stats_file, data)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    python -m structurizer.storage.project_stats rebuild [storage_dir]
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] != "rebuild":
+        print(main.__doc__.strip())
+        return 2
+
+    from .history_manager import HistoryManager
+
+    if len(argv) > 1:
+        storage_dir = Path(argv[1])
+    else:
+        from structurizer.config import STORAGE_DIR
+        storage_dir = STORAGE_DIR
+
+    history = HistoryManager(storage_dir)
+    history.rebuild_project_stats()
+    print(f"Статистика пересчитана: {len(history.project_stats.get_all())} проектов")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
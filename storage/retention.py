@@ -0,0 +1,195 @@
+# storage/retention.py
+
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+
+class RetentionPolicy:
+    """
+    Ограничения на хранение файлов результатов.
+    None означает, что ограничение не действует.
+    """
+
+    def __init__(
+        self,
+        max_total_bytes: Optional[int] = None,
+        max_runs_per_project: Optional[int] = None,
+        max_age_days: Optional[int] = None,
+    ):
+        self.max_total_bytes = max_total_bytes
+        self.max_runs_per_project = max_runs_per_project
+        self.max_age_days = max_age_days
+
+    def is_empty(self) -> bool:
+        return (
+            self.max_total_bytes is None
+            and self.max_runs_per_project is None
+            and self.max_age_days is None
+        )
+
+    def __repr__(self):
+        return (
+            f"RetentionPolicy(max_total_bytes={self.max_total_bytes}, "
+            f"max_runs_per_project={self.max_runs_per_project}, "
+            f"max_age_days={self.max_age_days})"
+        )
+
+
+class RetentionResult:
+    """Итог очистки: какие записи вытеснены и сколько места освобождено"""
+
+    def __init__(self):
+        self.evicted_ids: List[str] = []
+        self.bytes_reclaimed = 0
+        self.errors: List[str] = []
+
+    def __repr__(self):
+        return (
+            f"RetentionResult(evicted={len(self.evicted_ids)}, "
+            f"bytes_reclaimed={self.bytes_reclaimed}, errors={len(self.errors)})"
+        )
+
+
+class RetentionManager:
+    """
+    Очистка storage/outputs по политике хранения.
+
+    Кандидаты выбираются по давности последнего обращения (LRU):
+    last_accessed_at, а если его нет — created_at. Файлы результатов
+    удаляются, а записи истории остаются с пометкой evicted, чтобы
+    метаданные запуска не терялись.
+    """
+
+    def __init__(self, history_manager):
+        self.history_manager = history_manager
+
+    # =====================
+    # Публичный API
+    # =====================
+
+    def plan(self, policy: RetentionPolicy, now: Optional[datetime] = None) -> List[Dict]:
+        """
+        Возвращает записи, файлы которых нужно удалить, от самых старых к новым.
+        """
+        now = now or datetime.now()
+
+        live = []
+        for item in self.history_manager.load():
+            if item.get("evicted"):
+                continue
+            size = self._output_size(item)
+            if size is None:
+                continue
+            live.append((self._last_used(item), size, item))
+
+        # От давно неиспользуемых к свежим
+        live.sort(key=lambda entry: entry[0])
+
+        evict_ids = set()
+
+        if policy.max_age_days is not None:
+            threshold = now - timedelta(days=policy.max_age_days)
+            for last_used, _, item in live:
+                if last_used < threshold:
+                    evict_ids.add(item["id"])
+
+        if policy.max_runs_per_project is not None:
+            by_project: Dict[str, List[Dict]] = {}
+            for _, _, item in live:
+                if item["id"] not in evict_ids:
+                    by_project.setdefault(item.get("project_path", ""), []).append(item)
+
+            for project_items in by_project.values():
+                excess = len(project_items) - policy.max_runs_per_project
+                for item in project_items[:max(excess, 0)]:
+                    evict_ids.add(item["id"])
+
+        if policy.max_total_bytes is not None:
+            total = sum(size for _, size, item in live if item["id"] not in evict_ids)
+            for _, size, item in live:
+                if total <= policy.max_total_bytes:
+                    break
+                if item["id"] not in evict_ids:
+                    evict_ids.add(item["id"])
+                    total -= size
+
+        return [item for _, _, item in live if item["id"] in evict_ids]
+
+    def run(self, policy: RetentionPolicy) -> RetentionResult:
+        """
+        Удаляет файлы результатов по политике и помечает записи как вытесненные.
+        """
+        result = RetentionResult()
+        if policy.is_empty():
+            return result
+
+        candidates = []
+        for item in self.plan(policy):
+            size = self._output_size(item)
+            if size is not None:
+                candidates.append((item, size))
+
+        errors = self.history_manager.delete_outputs(
+            item["output_file"] for item, _ in candidates
+        )
+        result.errors.extend(errors)
+
+        evicted_at = datetime.now().isoformat(timespec="seconds")
+        updates = {}
+        for item, size in candidates:
+            if Path(item["output_file"]).exists():
+                continue  # Удалить не удалось — запись остаётся живой
+            updates[item["id"]] = {
+                "evicted": True,
+                "evicted_at": evicted_at,
+                "evicted_bytes": size,
+            }
+            result.evicted_ids.append(item["id"])
+            result.bytes_reclaimed += size
+
+        self.history_manager.update_many(updates)
+
+        return result
+
+    def run_in_background(
+        self,
+        policy: RetentionPolicy,
+        on_finished: Optional[Callable[[RetentionResult], None]] = None,
+    ) -> threading.Thread:
+        """
+        Запускает очистку в фоновом потоке.
+        on_finished вызывается из этого потока с RetentionResult.
+        """
+        def worker():
+            result = self.run(policy)
+            if on_finished:
+                on_finished(result)
+
+        thread = threading.Thread(target=worker, name="structurizer-retention", daemon=True)
+        thread.start()
+        return thread
+
+    # =====================
+    # Внутренние методы
+    # =====================
+
+    def _output_size(self, item: Dict) -> Optional[int]:
+        output_file = item.get("output_file")
+        if not output_file:
+            return None
+        try:
+            return Path(output_file).stat().st_size
+        except OSError:
+            return None
+
+    def _last_used(self, item: Dict) -> datetime:
+        for key in ("last_accessed_at", "created_at"):
+            value = item.get(key)
+            if value:
+                try:
+                    return datetime.fromisoformat(value)
+                except ValueError:
+                    continue
+        return datetime.min
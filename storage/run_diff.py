@@ -0,0 +1,183 @@
+# storage/run_diff.py
+
+import difflib
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .file_lock import atomic_write_json
+
+
+class RunDiff:
+    """Результат сравнения двух запусков: какие файлы проекта изменились"""
+
+    def __init__(self, added: List[str], removed: List[str], changed: List[str], unchanged_count: int):
+        self.added = added
+        self.removed = removed
+        self.changed = changed
+        self.unchanged_count = unchanged_count
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+class ManifestCache:
+    """
+    Кэш манифестов файлов результатов: по JSON на результат, как у
+    SectionIndex. Принадлежит HistoryManager, который удаляет запись
+    вместе с файлом результата.
+    """
+
+    MANIFEST_VERSION = 1
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+
+    def get(self, output_file: Path, stat: os.stat_result) -> Optional[Dict[str, Dict]]:
+        """Манифест, если он построен для файла с теми же размером и mtime_ns"""
+        try:
+            with open(self._cache_file(output_file), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            return None
+
+        if (
+            data.get("version") != self.MANIFEST_VERSION
+            or data.get("size") != stat.st_size
+            or data.get("mtime_ns") != stat.st_mtime_ns
+        ):
+            return None
+        return data["files"]
+
+    def put(self, output_file: Path, stat: os.stat_result, files: Dict[str, Dict]) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        atomic_write_json(self._cache_file(output_file), {
+            "version": self.MANIFEST_VERSION,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "files": files,
+        })
+
+    def discard(self, output_file: Path) -> None:
+        try:
+            self._cache_file(Path(output_file)).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _cache_file(self, output_file: Path) -> Path:
+        key = hashlib.sha1(os.path.abspath(output_file).encode("utf-8")).hexdigest()[:16]
+        return self.cache_dir / f"{key}.json"
+
+
+class RunDiffEngine:
+    """
+    Сравнение запусков по манифестам файлов результатов.
+
+    Манифест — для каждого файла проекта в результате: относительный путь,
+    размер и sha1 содержимого, плюс байтовый диапазон раздела. Он строится
+    одним потоковым проходом по разделам (SectionIndex) и кэшируется по
+    размеру и mtime_ns результата (HistoryManager.manifests). Сравнение
+    запусков — это сравнение двух словарей; построчный diff считается
+    только для выбранного файла.
+    """
+
+    def __init__(self, history_manager):
+        self.history_manager = history_manager
+        self.cache = history_manager.manifests
+
+    # =====================
+    # Публичный API
+    # =====================
+
+    def manifest(self, item: Dict) -> Dict[str, Dict]:
+        """
+        Возвращает {относительный путь: {"size", "hash", "start", "end"}}
+        для записи истории.
+        """
+        output_file = Path(item["output_file"])
+        stat = output_file.stat()
+
+        files = self.cache.get(output_file, stat)
+        if files is None:
+            files = self._build_manifest(item)
+            self.cache.put(output_file, stat, files)
+        return files
+
+    def compare(self, old_item: Dict, new_item: Dict) -> RunDiff:
+        """Сравнивает два запуска по манифестам (без чтения содержимого)"""
+        old_files = self.manifest(old_item)
+        new_files = self.manifest(new_item)
+
+        added = sorted(path for path in new_files if path not in old_files)
+        removed = sorted(path for path in old_files if path not in new_files)
+        changed = sorted(
+            path for path in new_files
+            if path in old_files and new_files[path]["hash"] != old_files[path]["hash"]
+        )
+        unchanged_count = len(new_files) - len(added) - len(changed)
+
+        return RunDiff(added, removed, changed, unchanged_count)
+
+    def file_diff(self, old_item: Dict, new_item: Dict, path: str, context: int = 3) -> List[str]:
+        """
+        Построчный unified diff одного файла между запусками.
+        Файл, отсутствующий в одном из запусков, сравнивается с пустым.
+        """
+        old_lines = self._read_file_lines(old_item, path)
+        new_lines = self._read_file_lines(new_item, path)
+
+        return list(difflib.unified_diff(
+            old_lines, new_lines,
+            fromfile=f"{path} ({old_item.get('created_at', '')})",
+            tofile=f"{path} ({new_item.get('created_at', '')})",
+            n=context,
+            lineterm=""
+        ))
+
+    # =====================
+    # Внутренние методы
+    # =====================
+
+    def _relative_path(self, path: str, project_path: str) -> str:
+        prefix = project_path.rstrip("/\\")
+        if prefix and path.startswith(prefix):
+            path = path[len(prefix):].lstrip("/\\")
+        return path.replace("\\", "/")
+
+    def _build_manifest(self, item: Dict) -> Dict[str, Dict]:
+        output_file = Path(item["output_file"])
+        index = self.history_manager.section_index.get(output_file)
+        project_path = item.get("project_path", "")
+
+        files = {}
+        with open(output_file, "rb") as f:
+            # Разделы идут по возрастанию смещений — чтение последовательное
+            for path, start, end in index.get("sections", []):
+                content = self._read_section(f, start, end)
+                files[self._relative_path(path, project_path)] = {
+                    "size": len(content),
+                    "hash": hashlib.sha1(content).hexdigest(),
+                    "start": start,
+                    "end": end,
+                }
+        return files
+
+    def _read_file_lines(self, item: Dict, path: str) -> List[str]:
+        entry = self.manifest(item).get(path)
+        if entry is None:
+            return []
+
+        with open(item["output_file"], "rb") as f:
+            content = self._read_section(f, entry["start"], entry["end"])
+
+        return content.decode("utf-8", errors="replace").splitlines()
+
+    def _read_section(self, f, start: int, end: int) -> bytes:
+        """Содержимое файла из раздела: без строки-заголовка и завершающего перевода строки"""
+        f.seek(start)
+        f.readline()  # «Содержимое <путь>:»
+        content = f.read(end - f.tell())
+        return content[:-1] if content.endswith(b"\n") else content
@@ -0,0 +1,176 @@
+# storage/section_index.py
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .file_lock import atomic_write_json
+
+
+TREE_HEADER = "Структура проекта:".encode("utf-8")
+TEXT_HEADER = "Текст из файлов проекта:".encode("utf-8")
+SECTION_PREFIX = "Содержимое ".encode("utf-8")
+ERROR_PREFIX = "Ошибка при чтении ".encode("utf-8")
+FOOTER_PREFIX = "Анализ завершен".encode("utf-8")
+
+# Как часто (в строках) scan проверяет запрос на остановку
+STOP_CHECK_LINES = 4096
+
+
+class SectionIndex:
+    """
+    Индекс разделов файла результата: байтовые диапазоны структуры
+    проекта и содержимого каждого файла.
+
+    Индекс строится одним потоковым проходом и кэшируется в JSON рядом
+    с остальными данными storage/, ключ актуальности — размер и mtime_ns
+    файла. После этого копирование нескольких файлов из большого
+    результата читает только их диапазоны.
+    """
+
+    INDEX_VERSION = 1
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+
+    # =====================
+    # Публичный API
+    # =====================
+
+    def get(self, output_file: Path, should_stop: Optional[Callable[[], bool]] = None) -> Optional[Dict]:
+        """
+        Возвращает {"tree": [start, end] | None,
+        "sections": [[путь файла, start, end], ...]}.
+        Пересканирует файл, только если он изменился с прошлого раза.
+        None — сканирование прервано через should_stop.
+        """
+        output_file = Path(output_file)
+        stat = output_file.stat()
+
+        cached = self._read_cache(output_file)
+        if (
+            cached is not None
+            and cached.get("size") == stat.st_size
+            and cached.get("mtime_ns") == stat.st_mtime_ns
+        ):
+            return cached
+
+        index = self.scan(output_file, should_stop)
+        if index is None:
+            return None
+        index.update({
+            "version": self.INDEX_VERSION,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        })
+        self._write_cache(output_file, index)
+        return index
+
+    def read_sections(
+        self,
+        output_file: Path,
+        ranges: Iterable[Tuple[int, int]],
+        include_tree: bool = False
+    ) -> str:
+        """
+        Собирает текст из выбранных диапазонов (в порядке следования
+        в файле) в том же виде, в каком они записаны в результате.
+        """
+        index = self.get(output_file)
+        ranges = sorted(set(tuple(r) for r in ranges))
+        if include_tree and index.get("tree"):
+            ranges.insert(0, tuple(index["tree"]))
+
+        parts = []
+        with open(output_file, "rb") as f:
+            for start, end in ranges:
+                f.seek(start)
+                parts.append(f.read(end - start).decode("utf-8", errors="replace"))
+
+        return "\n".join(parts)
+
+    def discard(self, output_file: Path) -> None:
+        try:
+            self._cache_file(Path(output_file)).unlink()
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def scan(output_file: Path, should_stop: Optional[Callable[[], bool]] = None) -> Optional[Dict]:
+        """
+        Потоковый проход по файлу результата. Раздел файла начинается
+        строкой «Содержимое <путь>:» после пустой строки и заканчивается
+        перед пустой строкой, предшествующей следующему заголовку.
+        Если should_stop вернул True, проход прерывается и возвращается None.
+        """
+        tree: Optional[List[int]] = None
+        sections: List[list] = []
+        current: Optional[list] = None
+
+        offset = 0
+        prev_start = 0
+        prev_blank = False
+
+        with open(output_file, "rb") as f:
+            for number, line in enumerate(f):
+                if should_stop is not None and number % STOP_CHECK_LINES == 0 and should_stop():
+                    return None
+
+                stripped = line.rstrip(b"\r\n")
+
+                if prev_blank and (
+                    stripped.startswith(SECTION_PREFIX)
+                    or stripped.startswith(ERROR_PREFIX)
+                    or stripped.startswith(FOOTER_PREFIX)
+                    or stripped == TEXT_HEADER
+                ):
+                    # Предыдущий раздел заканчивается перед пустой строкой
+                    if current is not None:
+                        current[2] = prev_start
+                        sections.append(current)
+                        current = None
+                    if tree is not None and tree[1] is None:
+                        tree[1] = prev_start
+
+                    if stripped.startswith(SECTION_PREFIX) and stripped.endswith(b":"):
+                        path = stripped[len(SECTION_PREFIX):-1].decode("utf-8", errors="replace")
+                        current = [path, offset, None]
+                elif tree is None and stripped == TREE_HEADER:
+                    tree = [offset, None]
+
+                prev_start = offset
+                prev_blank = not stripped
+                offset += len(line)
+
+        if current is not None:
+            current[2] = offset
+            sections.append(current)
+        if tree is not None and tree[1] is None:
+            tree[1] = offset
+
+        return {"tree": tree, "sections": sections}
+
+    # =====================
+    # Внутренние методы
+    # =====================
+
+    def _cache_file(self, output_file: Path) -> Path:
+        key = hashlib.sha1(os.path.abspath(output_file).encode("utf-8")).hexdigest()[:16]
+        return self.cache_dir / f"{key}.json"
+
+    def _read_cache(self, output_file: Path) -> Optional[Dict]:
+        try:
+            with open(self._cache_file(output_file), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            return None
+
+        if data.get("version") != self.INDEX_VERSION:
+            return None
+        return data
+
+    def _write_cache(self, output_file: Path, index: Dict) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        atomic_write_json(self._cache_file(output_file), index)
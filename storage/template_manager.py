@@ -1,19 +1,47 @@
 # storage/template_manager.py
 
+import atexit
 import json
+import os
+import threading
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 import uuid
 from datetime import datetime
 
+from structurizer.analyzer.filter_plan import FilterPlan
+
+from .file_lock import atomic_write_json
+
 
 class TemplateManager:
-    """Менеджер шаблонов настроек анализа"""
+    """
+    Менеджер шаблонов настроек анализа.
+
+    Шаблоны держатся в памяти, индексированные по id. Файл перечитывается
+    только если изменился на диске (mtime_ns/размер), а изменения копятся
+    и записываются одной атомарной записью после короткой паузы.
+    """
+
+    # Пауза, в течение которой изменения объединяются в одну запись
+    WRITE_DELAY = 0.5
     
-    def __init__(self, storage_dir: Path):
+    def __init__(self, storage_dir: Path, write_delay: Optional[float] = None):
         self.storage_dir = Path(storage_dir)
         self.templates_file = self.storage_dir / "templates.json"
+        self.write_delay = self.WRITE_DELAY if write_delay is None else write_delay
+
+        self._lock = threading.RLock()
+        self._templates: Dict[str, Dict] = {}
+        self._stamp: Optional[Tuple[int, int, int]] = None
+        self._dirty = False
+        self._flush_timer: Optional[threading.Timer] = None
+
+        # Скомпилированные фильтры: (id, updated_at) -> FilterPlan
+        self._plan_cache: Dict[Tuple[str, str], FilterPlan] = {}
+
         self._ensure_storage()
+        atexit.register(self.flush)
     
     def _ensure_storage(self):
         """Создаёт необходимые директории и файлы"""
@@ -23,69 +51,106 @@ class TemplateManager:
                 "version": 1,
                 "templates": []
             })
+        self._reload()
     
     def get_all(self) -> List[Dict]:
         """Возвращает все шаблоны"""
-        data = self._load_templates()
-        return data.get("templates", [])
+        with self._lock:
+            self._refresh_if_changed()
+            return [dict(t) for t in self._templates.values()]
     
     def get(self, template_id: str) -> Optional[Dict]:
         """Возвращает шаблон по ID"""
-        templates = self.get_all()
-        return next((t for t in templates if t["id"] == template_id), None)
+        with self._lock:
+            self._refresh_if_changed()
+            template = self._templates.get(template_id)
+            return dict(template) if template is not None else None
     
     def create(self, name: str, settings: Dict) -> Dict:
         """Создаёт новый шаблон"""
-        templates = self.get_all()
-        
-        template = {
-            "id": str(uuid.uuid4()),
-            "name": name,
-            "settings": settings,
-            "created_at": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat(),
-        }
-        
-        templates.append(template)
-        self._save_templates({
-            "version": 1,
-            "templates": templates
-        })
-        
-        return template
+        return self.create_many([(name, settings)])[0]
+
+    def create_many(self, templates: Iterable[Tuple[str, Dict]]) -> List[Dict]:
+        """Создаёт несколько шаблонов одной записью (например, стандартные)"""
+        created = []
+        with self._lock:
+            self._refresh_if_changed()
+            for name, settings in templates:
+                now = datetime.now().isoformat()
+                template = {
+                    "id": str(uuid.uuid4()),
+                    "name": name,
+                    "settings": settings,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                self._templates[template["id"]] = template
+                created.append(dict(template))
+            self._schedule_flush()
+
+        return created
     
     def update(self, template_id: str, name: str = None, settings: Dict = None) -> Optional[Dict]:
         """Обновляет шаблон"""
-        templates = self.get_all()
-        
-        for template in templates:
-            if template["id"] == template_id:
-                if name is not None:
-                    template["name"] = name
-                if settings is not None:
-                    template["settings"] = settings
-                template["updated_at"] = datetime.now().isoformat()
-                
-                self._save_templates({
-                    "version": 1,
-                    "templates": templates
-                })
-                return template
-        
-        return None
+        with self._lock:
+            self._refresh_if_changed()
+            template = self._templates.get(template_id)
+            if template is None:
+                return None
+
+            if name is not None:
+                template["name"] = name
+            if settings is not None:
+                template["settings"] = settings
+            template["updated_at"] = datetime.now().isoformat()
+
+            self._schedule_flush()
+            return dict(template)
     
     def delete(self, template_id: str) -> bool:
         """Удаляет шаблон"""
-        templates = self.get_all()
-        new_templates = [t for t in templates if t["id"] != template_id]
-        
-        if len(new_templates) != len(templates):
+        with self._lock:
+            self._refresh_if_changed()
+            if self._templates.pop(template_id, None) is None:
+                return False
+
+            self._schedule_flush()
+            return True
+
+    def get_filter_plan(self, template_id: str) -> Optional[FilterPlan]:
+        """
+        Возвращает скомпилированные фильтры шаблона.
+        План кэшируется по id и updated_at, так что после правки
+        шаблона он строится заново.
+        """
+        with self._lock:
+            self._refresh_if_changed()
+            template = self._templates.get(template_id)
+            if template is None:
+                return None
+
+            cache_key = (template_id, template.get("updated_at", ""))
+            plan = self._plan_cache.get(cache_key)
+            if plan is None:
+                plan = FilterPlan.from_settings(template.get("settings", {}))
+                self._plan_cache[cache_key] = plan
+            return plan
+
+    def flush(self) -> None:
+        """Немедленно записывает накопленные изменения на диск"""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+
+            if not self._dirty:
+                return
+
             self._save_templates({
                 "version": 1,
-                "templates": new_templates
+                "templates": list(self._templates.values())
             })
-            return True
-        return False
+            self._dirty = False
     
     def get_default_templates(self) -> List[Dict]:
         """Возвращает стандартные шаблоны"""
@@ -119,15 +184,55 @@ class TemplateManager:
             }
         ]
     
+    # =====================
+    # Внутренние методы
+    # =====================
+
+    def _schedule_flush(self) -> None:
+        """Откладывает запись, чтобы серия правок дала одну запись файла"""
+        self._dirty = True
+        if self.write_delay <= 0:
+            self.flush()
+            return
+
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+        self._flush_timer = threading.Timer(self.write_delay, self.flush)
+        self._flush_timer.daemon = True
+        self._flush_timer.start()
+
+    def _file_stamp(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(self.templates_file)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _refresh_if_changed(self) -> None:
+        """
+        Перечитывает файл, если его изменил кто-то другой.
+        Пока есть незаписанные правки, источником истины остаётся память.
+        """
+        if not self._dirty and self._file_stamp() != self._stamp:
+            self._reload()
+
+    def _reload(self) -> None:
+        data = self._load_templates()
+        self._templates = {t["id"]: t for t in data.get("templates", [])}
+
     def _load_templates(self) -> Dict:
         """Загружает шаблоны из файла"""
         try:
             with open(self.templates_file, "r", encoding="utf-8") as f:
-                return json.load(f)
+                st = os.fstat(f.fileno())
+                data = json.load(f)
+            self._stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+            return data
         except (json.JSONDecodeError, FileNotFoundError):
+            self._stamp = self._file_stamp()
             return {"version": 1, "templates": []}
     
     def _save_templates(self, data: Dict):
         """Сохраняет шаблоны в файл"""
-        with open(self.templates_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
\ No newline at end of file
+        atomic_write_json(self.templates_file, data)
+        self._stamp = self._file_stamp()
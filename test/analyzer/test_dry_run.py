@@ -0,0 +1,140 @@
+import shutil
+import subprocess
+import tarfile
+from pathlib import Path
+
+import pytest
+
+from analyzer import snapshot as snapshot_module
+from analyzer.filter_plan import FilterPlan
+from analyzer.project_analyzer import ProjectAnalyzer
+from analyzer.sources import GitIndexSource, TarSource
+
+FILES = {
+    "main.py": "print('привет')\nx = 1\n",
+    "pkg/util.py": "def f():\n    return 1\n",
+    "pkg/data.txt": "a\nb\nc\n",
+    "node_modules/lib/index.js": "module.exports = 1;\n",
+}
+
+PLAN = FilterPlan.from_lists(["node_modules"], [], [".py", ".txt"])
+
+
+def _make_project(root: Path) -> Path:
+    for rel_path, text in FILES.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+    return root
+
+
+def test_estimate_matches_actual_output(tmp_path):
+    project = _make_project(tmp_path / "project")
+    output_file = tmp_path / "out.txt"
+
+    analyzer = ProjectAnalyzer(project, output_file, filter_plan=PLAN)
+    estimate = analyzer.dry_run(bytes_per_second=1000)
+    analyzer.run()
+
+    assert estimate.file_count == analyzer.file_count == 3
+    assert estimate.output_bytes == output_file.stat().st_size
+    assert estimate.line_count == analyzer.line_count
+    assert estimate.projected_time == pytest.approx(estimate.output_bytes / 1000)
+
+
+def test_time_limited_estimate_is_lower_bound(tmp_path):
+    project = _make_project(tmp_path / "project")
+    analyzer = ProjectAnalyzer(project, tmp_path / "out.txt", filter_plan=PLAN)
+
+    full = analyzer.dry_run(time_limit=60)
+    cut = analyzer.dry_run(time_limit=0)
+
+    assert full.complete and full.file_count == 3
+    assert not cut.complete
+    assert cut.file_count < full.file_count and cut.output_bytes < full.output_bytes
+
+
+def test_estimate_reuses_given_snapshot(tmp_path, monkeypatch):
+    project = _make_project(tmp_path / "project")
+    analyzer = ProjectAnalyzer(project, tmp_path / "out.txt", filter_plan=PLAN)
+    expected = analyzer.dry_run()
+    snapshot = snapshot_module.DirectorySnapshot.take(project)
+
+    def take(*args, **kwargs):
+        raise AssertionError("папка обойдена повторно")
+
+    monkeypatch.setattr(snapshot_module.DirectorySnapshot, "take", take)
+    estimate = analyzer.dry_run(snapshot=snapshot)
+
+    assert (estimate.file_count, estimate.output_bytes, estimate.line_count) == (
+        expected.file_count, expected.output_bytes, expected.line_count
+    )
+
+
+def test_pruned_dirs_are_not_scanned(tmp_path, monkeypatch):
+    project = _make_project(tmp_path / "project")
+    scanned = []
+    original_scandir = snapshot_module.os.scandir
+
+    def scandir(path):
+        scanned.append(Path(path).name)
+        return original_scandir(path)
+
+    monkeypatch.setattr(snapshot_module.os, "scandir", scandir)
+    ProjectAnalyzer(project, tmp_path / "out.txt", filter_plan=PLAN).dry_run()
+
+    assert "pkg" in scanned
+    assert "node_modules" not in scanned and "lib" not in scanned
+
+
+def test_tar_tree_is_read_once(tmp_path, monkeypatch):
+    project = _make_project(tmp_path / "project")
+    archive = tmp_path / "project.tar.gz"
+    with tarfile.open(archive, "w:gz") as tf:
+        for rel_path in sorted(FILES):
+            tf.add(project / rel_path, rel_path)
+
+    opened = []
+    original_open = tarfile.open
+
+    def open_tar(*args, **kwargs):
+        opened.append(args[0])
+        return original_open(*args, **kwargs)
+
+    monkeypatch.setattr(tarfile, "open", open_tar)
+    output_file = tmp_path / "out.txt"
+    analyzer = ProjectAnalyzer(project, output_file, filter_plan=PLAN, source=TarSource(archive))
+    estimate = analyzer.dry_run()
+    analyzer.run()
+
+    # Один проход — за деревом, второй — за содержимым
+    assert len(opened) == 2
+    assert estimate.output_bytes == output_file.stat().st_size
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git не установлен")
+def test_git_index_tree_stats_files_only_for_estimate(tmp_path, monkeypatch):
+    repo = _make_project(tmp_path / "repo")
+    subprocess.run(["git", "-C", str(repo), "init", "-q"], check=True)
+    subprocess.run(["git", "-C", str(repo), "add", "-A"], check=True)
+
+    source = GitIndexSource(repo)
+    try:
+        stat_calls = []
+        original_stat = snapshot_module.os.stat
+
+        def stat(path, *args, **kwargs):
+            stat_calls.append(path)
+            return original_stat(path, *args, **kwargs)
+
+        monkeypatch.setattr("analyzer.sources.os.stat", stat)
+
+        tree = source.tree()
+        assert stat_calls == []
+        assert [size for _, size in tree.files] == [0]
+
+        sized = source.sized_tree()
+        assert len(stat_calls) == len(FILES)
+        assert sized.files == [("main.py", len(FILES["main.py"].encode("utf-8")))]
+    finally:
+        source.close()
@@ -0,0 +1,46 @@
+from analyzer.filter_plan import FilterPlan
+
+
+def test_key_ignores_order_duplicates_and_extension_spelling():
+    first = FilterPlan.from_lists([".git", "node_modules"], ["secret.py", "*.min.js"], [".PY", "js"])
+    second = FilterPlan.from_lists(["node_modules", " .git", ".git"], ["*.min.js", "secret.py"], ["py", ".js"])
+
+    assert first == second
+    assert first.key == second.key
+    assert len(first.key) == 16
+
+
+def test_key_changes_with_any_filter():
+    base = FilterPlan.from_lists([".git"], ["secret.py"], [".py"])
+    variants = [
+        FilterPlan.from_lists([".git", "build"], ["secret.py"], [".py"]),
+        FilterPlan.from_lists([".git"], ["secret.py", "*.log"], [".py"]),
+        FilterPlan.from_lists([".git"], ["secret.py"], [".py", ".md"]),
+        FilterPlan.from_lists([".git"], ["secret.py"], None),
+    ]
+    keys = {base.key} | {plan.key for plan in variants}
+    assert len(keys) == len(variants) + 1
+
+
+def test_key_is_stable_and_round_trips_through_settings():
+    plan = FilterPlan.from_settings({
+        "ignored_dirs": ["__pycache__"],
+        "ignored_files": ["*.pyc"],
+        "allowed_extensions": [".py"],
+    })
+    # Ключ хранится в истории, поэтому не должен зависеть от запуска
+    assert plan.key == FilterPlan.from_settings(plan.to_settings()).key
+    assert FilterPlan.from_settings(plan.to_settings()) == plan
+
+
+def test_checks():
+    plan = FilterPlan.from_lists(["node_modules"], ["secret.py", "*.min.js"], [".py"])
+
+    assert plan.is_dir_pruned("node_modules")
+    assert not plan.is_dir_pruned("src")
+    assert plan.is_file_ignored("secret.py")
+    assert plan.is_file_ignored("app.min.js")
+    assert not plan.is_file_ignored("app.js")
+    assert plan.is_extension_allowed(".py")
+    assert not plan.is_extension_allowed(".js")
+    assert FilterPlan.from_lists().is_extension_allowed(".anything")
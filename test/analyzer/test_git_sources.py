@@ -0,0 +1,160 @@
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from analyzer.filter_plan import FilterPlan
+from analyzer.project_analyzer import ProjectAnalyzer
+from analyzer.sources import GitRevisionSource
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git не установлен")
+
+GIT_ENV = {
+    "GIT_AUTHOR_NAME": "test", "GIT_AUTHOR_EMAIL": "test@example.com",
+    "GIT_COMMITTER_NAME": "test", "GIT_COMMITTER_EMAIL": "test@example.com",
+}
+
+
+def _git(repo: Path, *args: str) -> str:
+    result = subprocess.run(
+        ["git", "-C", str(repo), *args], check=True, stdout=subprocess.PIPE,
+        env={**os.environ, **GIT_ENV}
+    )
+    return result.stdout.decode("utf-8").strip()
+
+
+def _write(repo: Path, files: dict) -> None:
+    for rel_path, text in files.items():
+        path = repo / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _git(repo, "init", "-q")
+    _write(repo, {"main.py": "v1\n", "pkg/util.py": "def f():\n    pass\n", "docs/readme.md": "doc\n"})
+    os.symlink("main.py", repo / "link.py")
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-q", "-m", "first")
+    _git(repo, "tag", "v1")
+
+    _write(repo, {"main.py": "v2\n", "new.py": "new\n"})
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-q", "-m", "second")
+
+    # Незакоммиченные изменения не должны попадать в анализ ревизии
+    _write(repo, {"main.py": "dirty\n", "untracked.py": "u\n"})
+    return repo.resolve()
+
+
+def _sections(output: str) -> dict:
+    text = output.split("\nТекст из файлов проекта:\n", 1)[1].rsplit("\nАнализ завершен.", 1)[0]
+    sections = {}
+    for chunk in text.split("\nСодержимое ")[1:]:
+        header, _, body = chunk.partition(":\n")
+        sections[header] = body
+    return sections
+
+
+def test_revision_source_reads_committed_files(repo, tmp_path):
+    output_file = tmp_path / "out.txt"
+    source = GitRevisionSource(repo, "v1")
+    ProjectAnalyzer(repo, output_file, filter_plan=FilterPlan.from_lists(["docs"]), source=source).run()
+    output = output_file.read_text(encoding="utf-8")
+
+    commit = _git(repo, "rev-parse", "v1^{commit}")
+    assert source.commit == commit
+    assert output.startswith(f"Анализ проекта: {repo} @ v1 ({commit[:12]})\n")
+    # Символические ссылки пропускаются, отсечённые папки не читаются
+    assert _sections(output) == {
+        f"{repo}/main.py": "v1\n\n",
+        f"{repo}/pkg/util.py": "def f():\n    pass\n\n",
+    }
+
+
+def test_revision_source_matches_checkout(repo, tmp_path):
+    checkout = tmp_path / "checkout"
+    _git(repo, "worktree", "add", "-q", "--detach", str(checkout), "HEAD")
+    checkout = checkout.resolve()
+    (checkout / "link.py").unlink()
+
+    # В рабочей копии worktree .git — файл, а не папка
+    plan = FilterPlan.from_lists([".git"], [".git"])
+    ProjectAnalyzer(repo, tmp_path / "rev.txt", filter_plan=plan, source=GitRevisionSource(repo)).run()
+    ProjectAnalyzer(checkout, tmp_path / "dir.txt", filter_plan=plan).run()
+
+    from_revision = {
+        path[len(str(repo)):]: body
+        for path, body in _sections((tmp_path / "rev.txt").read_text(encoding="utf-8")).items()
+    }
+    from_checkout = {
+        path[len(str(checkout)):]: body
+        for path, body in _sections((tmp_path / "dir.txt").read_text(encoding="utf-8")).items()
+    }
+    assert from_revision == from_checkout
+
+
+def test_revision_source_errors(repo, tmp_path):
+    with pytest.raises(ValueError):
+        GitRevisionSource(repo, "no-such-branch")
+    with pytest.raises(ValueError):
+        GitRevisionSource(tmp_path / "missing")
+
+
+def test_revision_source_read_after_close_restarts_git(repo):
+    with GitRevisionSource(repo) as source:
+        first = dict(source.iter_contents(FilterPlan.from_lists()))
+    # После close процесс cat-file запускается заново
+    assert dict(source.iter_contents(FilterPlan.from_lists())) == first
+    source.close()
+    assert first["main.py"] == b"v2\n"
+
+
+def _index_run(root: Path, output_file: Path, include_untracked: bool) -> ProjectAnalyzer:
+    analyzer = ProjectAnalyzer(
+        root, output_file, use_git_index=True, include_untracked=include_untracked
+    )
+    analyzer.run()
+    return analyzer
+
+
+def test_git_index_lists_tracked_files_only(repo, tmp_path):
+    _write(repo, {".gitignore": "build/\n", "build/big.js": "x\n"})
+    (repo / "pkg" / "util.py").unlink()
+
+    analyzer = _index_run(repo, tmp_path / "out.txt", include_untracked=False)
+    output = (tmp_path / "out.txt").read_text(encoding="utf-8")
+
+    assert analyzer.source is not None
+    # Содержимое читается с диска: изменения рабочей копии видны
+    assert _sections(output) == {f"{repo}/main.py": "dirty\n\n", f"{repo}/new.py": "new\n\n",
+                                 f"{repo}/docs/readme.md": "doc\n\n"}
+    assert "build" not in output.split("Текст из файлов проекта:")[0]
+    assert "util.py" not in output
+
+
+def test_git_index_with_untracked_files(repo, tmp_path):
+    _write(repo, {".gitignore": "build/\n", "build/big.js": "x\n"})
+
+    _index_run(repo, tmp_path / "out.txt", include_untracked=True)
+    sections = _sections((tmp_path / "out.txt").read_text(encoding="utf-8"))
+
+    assert f"{repo}/untracked.py" in sections
+    assert f"{repo}/.gitignore" in sections
+    assert f"{repo}/build/big.js" not in sections
+
+
+def test_git_index_subdirectory_and_fallback(repo, tmp_path):
+    _index_run(repo / "pkg", tmp_path / "sub.txt", include_untracked=False)
+    assert list(_sections((tmp_path / "sub.txt").read_text(encoding="utf-8"))) == [f"{repo}/pkg/util.py"]
+
+    plain = tmp_path / "plain"
+    _write(plain, {"a.py": "a\n"})
+    analyzer = _index_run(plain, tmp_path / "plain.txt", include_untracked=False)
+    assert analyzer.source is None
+    assert analyzer.file_count == 1
@@ -0,0 +1,71 @@
+from analyzer.project_detector import ProjectDetector
+
+TEMPLATES = [
+    {"id": "python", "settings": {"allowed_extensions": [".py"]}},
+    {"id": "web", "settings": {
+        "allowed_extensions": [".html", ".css", ".js", ".jsx", ".ts", ".tsx", ".json"]
+    }},
+    {"id": "all", "settings": {"allowed_extensions": []}},
+]
+
+
+def _make_tree(root, files):
+    for rel_path in files:
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("", encoding="utf-8")
+    return root
+
+
+def _suggest(root):
+    detector = ProjectDetector(time_budget=5.0)
+    template = detector.suggest_template(detector.detect(root), TEMPLATES)
+    return template["id"] if template is not None else None
+
+
+def test_python_project(tmp_path):
+    root = _make_tree(tmp_path, [
+        "pyproject.toml", "README.md", "app/__init__.py", "app/main.py", "app/config.json",
+    ])
+    assert _suggest(root) == "python"
+
+
+def test_python_project_with_many_web_assets(tmp_path):
+    # Django-проект: шаблонов и статики больше, чем модулей, но это Python
+    files = ["manage.py", "requirements.txt"]
+    files += [f"app/module{i}.py" for i in range(10)]
+    files += [f"templates/page{i}.html" for i in range(15)]
+    files += [f"static/style{i}.css" for i in range(8)]
+    files += [f"fixtures/data{i}.json" for i in range(10)]
+    root = _make_tree(tmp_path, files)
+
+    assert _suggest(root) == "python"
+
+
+def test_web_project(tmp_path):
+    root = _make_tree(tmp_path, [
+        "package.json", "index.html", "src/app.js", "src/view.jsx", "src/style.css",
+        "scripts/build.py",
+    ])
+    assert _suggest(root) == "web"
+
+
+def test_typescript_project_despite_long_template(tmp_path):
+    root = _make_tree(tmp_path, ["tsconfig.json"] + [f"src/m{i}.ts" for i in range(5)])
+    assert _suggest(root) == "web"
+
+
+def test_no_matching_template(tmp_path):
+    root = _make_tree(tmp_path, ["Cargo.toml", "src/main.rs", "README.md"])
+    assert _suggest(root) is None
+
+
+def test_empty_directory(tmp_path):
+    assert _suggest(tmp_path) is None
+
+
+def test_skipped_dirs_are_not_sampled(tmp_path):
+    root = _make_tree(tmp_path, ["main.py"] + [f"node_modules/lib/m{i}.js" for i in range(50)])
+    detection = ProjectDetector().detect(root)
+    assert ".js" not in detection.extensions
+    assert _suggest(root) == "python"
@@ -0,0 +1,79 @@
+import os
+
+from analyzer.filter_plan import FilterPlan
+from analyzer.project_analyzer import ProjectAnalyzer
+from analyzer.transforms import ContentTransforms
+
+FILES = {
+    "setup.py": "# установка\nimport os\n",
+    "README.md": "# readme\n",
+    "app/__init__.py": "",
+    "app/main.py": "x = 1  # комментарий\n\n\n\ny = 2\n",
+    "app/data.bin": b"\xff\xfe\x00binary",
+    "lib/util.js": "const a = 1; // a\n",
+    "lib/nested/deep.py": "print('глубоко')\n",
+    "docs/index.md": "текст\n",
+    "build/out.log": "log\n",
+}
+
+PLAN = FilterPlan.from_lists(["build"], ["README.md"], [".py", ".js", ".md", ".bin"])
+
+
+def _make_project(root):
+    for rel_path, data in FILES.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        path.write_bytes(data)
+    if hasattr(os, "symlink"):
+        try:
+            os.symlink(root / "lib", root / "link", target_is_directory=True)
+        except OSError:
+            pass
+    return root
+
+
+def _run(project, output_file, workers, transforms=None):
+    analyzer = ProjectAnalyzer(
+        project, output_file, filter_plan=PLAN, workers=workers,
+        transforms=ContentTransforms(transforms) if transforms is not None else None
+    )
+    analyzer.run()
+    output = output_file.read_text(encoding="utf-8").replace(str(output_file), "<output>")
+    return analyzer, output
+
+
+def test_sharded_output_equals_sequential(tmp_path, monkeypatch):
+    project = _make_project(tmp_path / "project")
+    appended = []
+    append_shard = ProjectAnalyzer._append_shard
+
+    def record_append(self, shard_file):
+        appended.append(shard_file)
+        append_shard(self, shard_file)
+
+    monkeypatch.setattr(ProjectAnalyzer, "_append_shard", record_append)
+
+    sequential, expected = _run(project, tmp_path / "sequential.txt", workers=1)
+    sharded, actual = _run(project, tmp_path / "sharded.txt", workers=2)
+
+    # По части на app, docs и lib; ссылка link и отсечённая build не делятся
+    assert len(appended) == 3
+    assert actual == expected
+    assert (sharded.line_count, sharded.file_count) == (sequential.line_count, sequential.file_count)
+    # Временные файлы частей удалены
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["project", "sequential.txt", "sharded.txt"]
+
+
+def test_sharded_transforms_count_the_same_savings(tmp_path):
+    project = _make_project(tmp_path / "project")
+    names = ["strip_comments", "collapse_blank_lines"]
+
+    sequential, expected = _run(project, tmp_path / "sequential.txt", workers=1, transforms=names)
+    sharded, actual = _run(project, tmp_path / "sharded.txt", workers=3, transforms=names)
+
+    assert actual == expected
+    assert sharded.transforms.bytes_in == sequential.transforms.bytes_in
+    assert sharded.transforms.bytes_saved == sequential.transforms.bytes_saved
+    assert sharded.transforms.total_saved > 0
@@ -0,0 +1,123 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from analyzer.filter_plan import FilterPlan
+from analyzer.project_analyzer import ProjectAnalyzer
+from analyzer.snapshot import DirectorySnapshot
+
+
+def _make_project(root: Path) -> Path:
+    files = {
+        "main.py": "print('привет')\n",
+        "README.md": "# readme\n",
+        "pkg/__init__.py": "",
+        "pkg/Util.py": "x = 1\ny = 2\n",
+        "pkg/data.json": "{}\n",
+        "pkg/sub/deep.py": "pass\n",
+        "node_modules/lib/index.js": "module.exports = 1;\n",
+        "build/out.log": "log\n",
+    }
+    for rel_path, text in files.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+    return root
+
+
+def _structure(output: str) -> list:
+    section = output.split("Структура проекта:\n", 1)[1].split("\nТекст из файлов проекта:\n", 1)[0]
+    return section.splitlines()
+
+
+PLANS = [
+    FilterPlan.from_lists(),
+    FilterPlan.from_lists(["node_modules", "build"], ["*.json"], [".py"]),
+    FilterPlan.from_lists(["pkg"], ["README.md"], None),
+]
+
+
+def _assert_preview_matches_run(root: Path, tmp_path: Path) -> None:
+    snapshot = DirectorySnapshot.take(root)
+
+    for i, plan in enumerate(PLANS):
+        output_file = tmp_path / f"out{i}.txt"
+        analyzer = ProjectAnalyzer(root, output_file, filter_plan=plan)
+        analyzer.run()
+        output = output_file.read_text(encoding="utf-8")
+        footer = f"\nАнализ завершен. Результаты сохранены в {output_file.resolve()}\n"
+
+        preview = snapshot.preview(plan, with_files=True)
+
+        assert preview.tree_lines == _structure(output)
+        assert preview.file_count == analyzer.file_count
+        assert preview.estimated_bytes == len(output.encode("utf-8")) - len(footer.encode("utf-8"))
+        assert sorted(rel for rel, _ in preview.files) == sorted(
+            str(Path(line.split("Содержимое ", 1)[1][:-1]).relative_to(root.resolve())).replace("\\", "/")
+            for line in output.splitlines() if line.startswith("Содержимое ")
+        )
+
+
+def test_preview_matches_analyzer_output(tmp_path):
+    _assert_preview_matches_run(_make_project(tmp_path / "project"), tmp_path)
+
+
+def test_preview_matches_analyzer_output_with_symlinks(tmp_path):
+    root = _make_project(tmp_path / "project")
+    (tmp_path / "outside.py").write_text("secret = 1\n", encoding="utf-8")
+    try:
+        # Ссылка на папку проекта, на файл проекта, на файл снаружи и на саму себя по кругу
+        os.symlink(root / "pkg", root / "link", target_is_directory=True)
+        os.symlink(root / "main.py", root / "alias.py")
+        os.symlink(tmp_path / "outside.py", root / "outside.py")
+        os.symlink(root / "pkg", root / "pkg" / "sub" / "loop", target_is_directory=True)
+    except (OSError, NotImplementedError):
+        pytest.skip("символические ссылки недоступны")
+
+    snapshot = DirectorySnapshot.take(root)
+    link = next(d for d in snapshot.root.dirs if d.name == "link")
+    assert link.linked and [d.name for d in link.dirs] == ["sub"]
+    assert snapshot.root.external == {"outside.py"}
+
+    # Петля обрывается (run() на ней ушёл бы в бесконечную рекурсию),
+    # поэтому сравнение с run() — без неё
+    os.unlink(root / "pkg" / "sub" / "loop")
+    _assert_preview_matches_run(root, tmp_path)
+
+
+def test_preview_truncates_tree_lines(tmp_path):
+    root = _make_project(tmp_path / "project")
+    preview = DirectorySnapshot.take(root).preview(FilterPlan.from_lists(), max_tree_lines=3)
+
+    assert len(preview.tree_lines) == 3
+    assert preview.tree_truncated
+    assert preview.tree_line_count > 3
+
+
+def test_take_can_be_stopped(tmp_path):
+    root = _make_project(tmp_path / "project")
+    calls = []
+
+    def should_stop():
+        calls.append(1)
+        return len(calls) > 2
+
+    assert DirectorySnapshot.take(root, should_stop=should_stop) is None
+
+
+def test_partial_take_keeps_scanned_part(tmp_path):
+    root = _make_project(tmp_path / "project")
+    calls = []
+
+    def should_stop():
+        calls.append(1)
+        return len(calls) > 2
+
+    # Корень и build сняты, на node_modules обход остановлен
+    snapshot = DirectorySnapshot.take(root, should_stop=should_stop, partial=True)
+
+    assert not snapshot.complete
+    assert [d.name for d in snapshot.root.dirs] == ["build"]
+    assert [name for name, _ in snapshot.root.files] == ["main.py"]
+    assert DirectorySnapshot.take(root, partial=True).complete
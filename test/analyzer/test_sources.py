@@ -0,0 +1,149 @@
+import ntpath
+import os
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from analyzer import sources
+from analyzer.filter_plan import FilterPlan
+from analyzer.project_analyzer import ProjectAnalyzer
+from analyzer.sources import ProjectSource, TarSource, ZipSource, normalize_member_name, open_source
+from analyzer.snapshot import SnapshotDir
+
+FILES = {
+    "main.py": "print('привет')\r\nx = 1\n",
+    "README.md": "# readme\n",
+    "pkg/__init__.py": "",
+    "pkg/util.py": "def f():\n    return 1\n",
+    "pkg/data.bin": b"\xff\xfe\x00binary",
+    "build/out.log": "log\n",
+}
+
+PLAN = FilterPlan.from_lists(["build"], ["README.md"], None)
+
+
+def _make_project(root: Path) -> Path:
+    for rel_path, data in FILES.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        path.write_bytes(data)
+    return root
+
+
+def _make_zip(project: Path, archive: Path) -> Path:
+    with zipfile.ZipFile(archive, "w") as zf:
+        for rel_path in FILES:
+            zf.write(project / rel_path, rel_path)
+    return archive
+
+
+def _make_tar(project: Path, archive: Path) -> Path:
+    with tarfile.open(archive, "w:gz") as tf:
+        for rel_path in sorted(FILES):
+            tf.add(project / rel_path, rel_path)
+    return archive
+
+
+def _sections(output: str, root: str) -> dict:
+    """{относительный путь: текст раздела} из раздела содержимого результата"""
+    text = output.split("\nТекст из файлов проекта:\n", 1)[1]
+    text = text.rsplit("\nАнализ завершен.", 1)[0]
+    sections = {}
+    for chunk in text.split("\nСодержимое ")[1:]:
+        header, _, body = chunk.partition(":\n")
+        sections[header[len(root) + 1:].replace("\\", "/")] = body
+    return sections
+
+
+def _structure(output: str) -> list:
+    section = output.split("Структура проекта:\n", 1)[1].split("\nТекст из файлов проекта:\n", 1)[0]
+    return section.splitlines()
+
+
+def _run(root: Path, output_file: Path) -> str:
+    analyzer = ProjectAnalyzer(root, output_file, filter_plan=PLAN)
+    analyzer.run()
+    return output_file.read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize("make_archive, name", [(_make_zip, "project.zip"), (_make_tar, "project.tar.gz")])
+def test_archive_output_matches_directory(tmp_path, make_archive, name):
+    project = _make_project(tmp_path / "project").resolve()
+    archive = make_archive(project, tmp_path / name).resolve()
+
+    from_dir = _run(project, tmp_path / "dir.txt")
+    from_archive = _run(archive, tmp_path / "archive.txt")
+
+    assert from_archive.startswith(f"Анализ проекта: {archive}\n")
+    assert _structure(from_archive)[0] == f"└── {name}"
+    assert _structure(from_archive)[1:] == _structure(from_dir)[1:]
+    assert _sections(from_archive, str(archive)) == _sections(from_dir, str(project))
+    assert "pkg/data.bin" in _sections(from_archive, str(archive))
+    assert not any(path.startswith("build/") for path in _sections(from_archive, str(archive)))
+
+
+def test_open_source_only_for_archives(tmp_path):
+    project = _make_project(tmp_path / "project")
+    assert open_source(project) is None
+    assert isinstance(open_source(_make_zip(project, tmp_path / "p.zip")), ZipSource)
+    assert isinstance(open_source(_make_tar(project, tmp_path / "p.tgz")), TarSource)
+
+
+def test_unsafe_member_names_are_skipped():
+    assert normalize_member_name("../etc/passwd") is None
+    assert normalize_member_name("/") is None
+    assert normalize_member_name("a/./b\\c.py") == "a/b/c.py"
+    assert normalize_member_name("/abs/x.py") == "abs/x.py"
+
+
+def test_zip_read_sample(tmp_path):
+    project = _make_project(tmp_path / "project")
+    with ZipSource(_make_zip(project, tmp_path / "p.zip")) as source:
+        assert source.read_sample("pkg/util.py", 3) == b"def"
+        assert source.read_sample("missing.py", 3) is None
+
+
+def test_project_source_is_abstract():
+    with pytest.raises(TypeError):
+        ProjectSource("/p", "p")
+
+
+class _FailingSource(ProjectSource):
+    def __init__(self):
+        super().__init__("/virtual", "virtual")
+        self.closed = False
+
+    def tree(self) -> SnapshotDir:
+        return SnapshotDir(self.root_name)
+
+    def iter_contents(self, plan):
+        raise RuntimeError("сбой источника")
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def test_run_closes_source_on_error(tmp_path):
+    source = _FailingSource()
+    analyzer = ProjectAnalyzer(tmp_path, tmp_path / "out.txt", source=source)
+
+    with pytest.raises(RuntimeError):
+        analyzer.run()
+    assert source.closed
+
+
+def test_display_path_uses_os_separators(monkeypatch):
+    source = _FailingSource()
+    source.display_root = "C:\\work\\repo"
+
+    # Пути в результате собираются как в run(): через os.path
+    with monkeypatch.context() as m:
+        m.setattr(sources.os, "path", ntpath)
+        assert source.display_path("pkg/sub/util.py") == "C:\\work\\repo\\pkg\\sub\\util.py"
+
+    source.display_root = "/work/repo"
+    assert source.display_path("pkg/util.py") == os.path.join("/work/repo", "pkg", "util.py")
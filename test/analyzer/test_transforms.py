@@ -0,0 +1,131 @@
+import io
+import zipfile
+
+from analyzer.filter_plan import FilterPlan
+from analyzer.project_analyzer import ProjectAnalyzer
+from analyzer.sources import ZipSource
+from analyzer.transforms import ContentTransforms
+
+
+def _apply(names, text: str, extension: str) -> str:
+    transforms = ContentTransforms(names)
+    return "".join(transforms.apply(io.StringIO(text), extension))
+
+
+def test_python_comments_outside_strings_are_removed():
+    text = (
+        "#!/usr/bin/env python\n"
+        "x = 1  # комментарий\n"
+        "# целая строка\n"
+        "s = 'a # не комментарий'\n"
+        '"""\n'
+        "# в docstring\n"
+        '"""\n'
+    )
+    assert _apply(["strip_comments"], text, ".py") == (
+        "#!/usr/bin/env python\n"
+        "x = 1\n"
+        "s = 'a # не комментарий'\n"
+        '"""\n'
+        "# в docstring\n"
+        '"""\n'
+    )
+
+
+def test_js_comments_and_regex_literals():
+    text = (
+        "const url = 'http://example.com'; // адрес\n"
+        "/* блок\n"
+        "   комментария */\n"
+        "const re = /\\/\\/ not a comment/g;\n"
+        "const t = `// в шаблоне`;\n"
+        "if (x in /a/.source) {}\n"
+    )
+    assert _apply(["strip_comments"], text, ".js") == (
+        "const url = 'http://example.com';\n"
+        "const re = /\\/\\/ not a comment/g;\n"
+        "const t = `// в шаблоне`;\n"
+        "if (x in /a/.source) {}\n"
+    )
+
+
+def test_division_after_identifier_ending_in_keyword():
+    # «margin» оканчивается на «in», но это не ключевое слово
+    text = "const half = margin / 2; // half\nconst r = typeof_ / 2; // r\n"
+    assert _apply(["strip_comments"], text, ".js") == (
+        "const half = margin / 2;\nconst r = typeof_ / 2;\n"
+    )
+
+
+def test_regex_after_keyword():
+    text = "function f() { return /x\\/\\/y/.test(s); } // f\n"
+    assert _apply(["strip_comments"], text, ".js") == "function f() { return /x\\/\\/y/.test(s); }\n"
+
+
+def test_css_comments():
+    text = "a { color: red; /* цвет */ }\n/* целиком */\nb {}\n"
+    assert _apply(["strip_comments"], text, ".css") == "a { color: red;  }\nb {}\n"
+
+
+def test_license_banner_with_copyright_is_removed():
+    text = (
+        "#!/usr/bin/env python\n"
+        "# Copyright 2024 Example Inc.\n"
+        "# SPDX-License-Identifier: MIT\n"
+        "\n"
+        "import os\n"
+    )
+    assert _apply(["drop_license"], text, ".py") == "#!/usr/bin/env python\nimport os\n"
+
+
+def test_multiline_license_block_is_removed():
+    text = (
+        "/*\n"
+        " * Licensed under the Apache License, Version 2.0.\n"
+        " * You may not use this file except in compliance.\n"
+        " */\n"
+        "export const x = 1;\n"
+    )
+    assert _apply(["drop_license"], text, ".js") == "export const x = 1;\n"
+
+
+def test_ordinary_comment_mentioning_license_is_kept():
+    text = "# Compute the license fee\nfee = price * 0.1\n"
+    assert _apply(["drop_license"], text, ".py") == text
+
+
+def test_css_universal_selector_is_not_a_banner():
+    text = "* {\n  box-sizing: border-box; /* license */\n}\n"
+    assert _apply(["drop_license"], text, ".css") == text
+
+    banner = "/*\n * Copyright 2024 Example Inc.\n */\n"
+    assert _apply(["drop_license"], banner + text, ".css") == text
+
+
+def test_whitespace_transforms_skip_markdown():
+    names = ["trailing_whitespace", "collapse_blank_lines"]
+    text = "строка с переносом  \nследующая\n\n\n\nабзац\n"
+
+    assert _apply(names, text, ".md") == text
+    assert _apply(names, text, ".py") == "строка с переносом\nследующая\n\nабзац\n"
+
+
+def test_source_contents_split_only_on_newlines(tmp_path):
+    # \f и U+2028 внутри строки не должны делить её при преобразованиях
+    text = "x = 1  # a\fb\ny = '\u2028'  # c\n"
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "main.py").write_text(text, encoding="utf-8")
+
+    archive = tmp_path / "project.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.write(project / "main.py", "main.py")
+
+    for name, source in (("dir", None), ("zip", ZipSource(archive))):
+        output_file = tmp_path / f"{name}.txt"
+        ProjectAnalyzer(
+            project, output_file, filter_plan=FilterPlan.from_lists([], [], None), source=source,
+            transforms=ContentTransforms(["strip_comments"])
+        ).run()
+        output = output_file.read_text(encoding="utf-8")
+        assert "main.py:\nx = 1\ny = '\u2028'\n\n" in output
@@ -0,0 +1,92 @@
+import os
+
+import pytest
+
+from analyzer.filter_plan import FilterPlan
+from analyzer.project_analyzer import ProjectAnalyzer
+from analyzer.tree_model import KIND_DIR, TreeModel
+
+FILES = {
+    "main.py": "print('привет')\n",
+    "README.md": "# readme\n",
+    "a/util.py": "def f():\n    return 1\n",
+    "a/b/deep.py": "x = 1\n",
+    "a/data.bin": b"\xff\xfe\x00binary",
+    "node_modules/lib.js": "module.exports = 1;\n",
+}
+
+PLAN = FilterPlan.from_lists(["node_modules"], ["README.md"], [".py", ".bin"])
+
+
+def _make_project(root):
+    for rel_path, data in FILES.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        path.write_bytes(data)
+    return root
+
+
+def _save_both(project, tmp_path):
+    run_file = tmp_path / "run.txt"
+    ProjectAnalyzer(project, run_file, filter_plan=PLAN).run()
+
+    model_file = tmp_path / "model.txt"
+    model = TreeModel.build(project, PLAN)
+    model.save(model_file)
+
+    def read(path):
+        return path.read_text(encoding="utf-8").replace(str(path.resolve()), "<output>")
+
+    return model, read(model_file), read(run_file)
+
+
+def test_render_matches_run(tmp_path):
+    project = _make_project(tmp_path / "project")
+
+    model, rendered, expected = _save_both(project, tmp_path)
+
+    assert rendered == expected
+    assert model.included_count == 4
+    assert "node_modules" not in model.names
+
+
+def test_symlinked_directory_matches_run(tmp_path):
+    project = _make_project(tmp_path / "project")
+    try:
+        os.symlink(project / "a", project / "link", target_is_directory=True)
+    except (OSError, NotImplementedError):
+        pytest.skip("символические ссылки недоступны")
+
+    model, rendered, expected = _save_both(project, tmp_path)
+
+    assert rendered == expected
+    # Ссылка раскрыта в структуре, но её файлы не дублируются в содержимом
+    link = next(i for i in range(len(model)) if model.rel_path(i) == "link")
+    assert model.kind(link) == KIND_DIR
+    assert model.rel_path(next(model.children(link))) == "link/b"
+    assert sorted(model.rel_path(i) for i in model.iter_included()) == [
+        "a/b/deep.py", "a/data.bin", "a/util.py", "main.py"
+    ]
+
+
+def test_contents_follow_walk_order_of_sibling_dirs(tmp_path):
+    # Порядок создания не совпадает с алфавитным: содержимое идёт в порядке
+    # os.scandir (как os.walk в run()), структура — по имени
+    project = tmp_path / "project"
+    for rel_path in ("z/x.py", "a/y.py", "m/n.py", "b.py", "a/k/deep.py", "m/c.py"):
+        path = project / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"# {rel_path}\n", encoding="utf-8")
+
+    model, rendered, expected = _save_both(project, tmp_path)
+
+    assert rendered == expected
+    headers = [line for line in expected.splitlines() if line.startswith("Содержимое ")]
+    assert headers == [f"Содержимое {model.path(i)}:" for i in model.iter_included()]
+    walked = [
+        os.path.relpath(os.path.join(root, name), project).replace(os.sep, "/")
+        for root, _, files in os.walk(project) for name in files
+    ]
+    assert [model.rel_path(i) for i in model.iter_included()] == walked
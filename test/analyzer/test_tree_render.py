@@ -0,0 +1,51 @@
+from analyzer.tree_render import tree_lines
+
+# Папка: (имя, вложенные папки, файлы) или (имя, None, None) — нет доступа
+TREE = ("root", [
+    ("a", [("deep", [], ["x.py"])], []),
+    ("locked", None, None),
+    ("b", [], ["one.txt", "two.txt"]),
+], ["main.py"])
+
+
+def _listing(node):
+    _, dirs, files = node
+    if dirs is None:
+        return None
+    return dirs, files
+
+
+def test_tree_lines():
+    assert list(tree_lines(TREE, lambda node: node[0], _listing)) == [
+        "└── root",
+        "    ├── a",
+        "    │   └── deep",
+        "    │       └── x.py",
+        "    ├── locked",
+        "    │   └── <нет доступа>",
+        "    ├── b",
+        "    │   ├── one.txt",
+        "    │   └── two.txt",
+        "    └── main.py",
+    ]
+
+
+def test_last_directory_without_files():
+    tree = ("root", [("a", [], []), ("b", [], ["f"])], [])
+    assert list(tree_lines(tree, lambda node: node[0], _listing)) == [
+        "└── root",
+        "    ├── a",
+        "    └── b",
+        "        └── f",
+    ]
+
+
+def test_listing_is_called_in_output_order():
+    calls = []
+
+    def listing(node):
+        calls.append(node[0])
+        return _listing(node)
+
+    list(tree_lines(TREE, lambda node: node[0], listing))
+    assert calls == ["root", "a", "deep", "locked", "b"]
@@ -0,0 +1,85 @@
+"""
+Сравнение анализа ревизии git напрямую из репозитория (GitRevisionSource)
+с checkout ревизии во временную папку и обычным анализом.
+
+Запуск из корня проекта:
+    PYTHONPATH=. python test/benchmark_git_source.py <путь к репозиторию> [ревизия] [повторы]
+"""
+
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from analyzer.filter_plan import FilterPlan
+from analyzer.project_analyzer import ProjectAnalyzer
+from analyzer.sources import GitRevisionSource
+
+PLAN = FilterPlan.from_lists({".git", "__pycache__"}, set(), None)
+
+
+def analyze_revision(repo: Path, revision: str, output: Path) -> ProjectAnalyzer:
+    analyzer = ProjectAnalyzer(
+        repo, output, filter_plan=PLAN, source=GitRevisionSource(repo, revision)
+    )
+    analyzer.run()
+    return analyzer
+
+
+def checkout_and_analyze(repo: Path, revision: str, output: Path, work_dir: Path) -> ProjectAnalyzer:
+    checkout = work_dir / "checkout"
+    subprocess.run(
+        ["git", "-C", str(repo), "worktree", "add", "--detach", "--quiet", str(checkout), revision],
+        check=True
+    )
+    try:
+        analyzer = ProjectAnalyzer(checkout, output, filter_plan=PLAN)
+        analyzer.run()
+        return analyzer
+    finally:
+        subprocess.run(
+            ["git", "-C", str(repo), "worktree", "remove", "--force", str(checkout)],
+            check=True
+        )
+
+
+def measure(label: str, repeats: int, run) -> None:
+    timings = []
+    analyzer = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        analyzer = run()
+        timings.append(time.perf_counter() - started)
+
+    print(
+        f"{label:<22} лучшее {min(timings):7.3f} с, среднее {sum(timings) / len(timings):7.3f} с, "
+        f"файлов {analyzer.file_count}, строк {analyzer.line_count}"
+    )
+
+
+def main(argv) -> None:
+    if len(argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    repo = Path(argv[1]).resolve()
+    revision = argv[2] if len(argv) > 2 else "HEAD"
+    repeats = int(argv[3]) if len(argv) > 3 else 3
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp)
+        print(f"Репозиторий: {repo}, ревизия: {revision}, повторов: {repeats}")
+
+        measure(
+            "git cat-file --batch", repeats,
+            lambda: analyze_revision(repo, revision, work_dir / "source.txt")
+        )
+        measure(
+            "checkout + анализ", repeats,
+            lambda: checkout_and_analyze(repo, revision, work_dir / "checkout.txt", work_dir)
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv)
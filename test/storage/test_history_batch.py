@@ -0,0 +1,89 @@
+from pathlib import Path
+
+from storage.history_manager import HistoryManager
+
+
+def _add_runs(history: HistoryManager, count: int):
+    items = []
+    for i in range(count):
+        output_file = history.outputs_dir / f"run_{i}.txt"
+        output_file.write_text(f"run {i}\n", encoding="utf-8")
+        items.append(history.add(Path(f"/projects/p{i % 2}"), output_file, settings={}))
+    return items
+
+
+def test_batch_applies_all_operations_in_one_write(tmp_path):
+    history = HistoryManager(tmp_path)
+    first, second, third = _add_runs(history, 3)
+
+    with history.batch() as batch:
+        batch.update(first["id"], description="обновлено")
+        batch.remove(second["id"])
+        added = batch.add(Path("/projects/new"), history.outputs_dir / "new.txt", settings={})
+
+    assert [item["id"] for item in batch.updated] == [first["id"]]
+    assert [item["id"] for item in batch.removed] == [second["id"]]
+    assert [item["id"] for item in batch.added] == [added["id"]]
+
+    items = {item["id"]: item for item in history.load()}
+    assert set(items) == {first["id"], third["id"], added["id"]}
+    assert items[first["id"]]["description"] == "обновлено"
+    assert not Path(second["output_file"]).exists()
+
+
+def test_batch_is_discarded_on_exception(tmp_path):
+    history = HistoryManager(tmp_path)
+    first, = _add_runs(history, 1)
+
+    try:
+        with history.batch() as batch:
+            batch.remove(first["id"])
+            raise RuntimeError("отмена")
+    except RuntimeError:
+        pass
+
+    assert [item["id"] for item in history.load()] == [first["id"]]
+    assert Path(first["output_file"]).exists()
+
+
+def test_remove_many_deletes_entries_and_outputs(tmp_path):
+    history = HistoryManager(tmp_path)
+    items = _add_runs(history, 6)
+    to_remove = [item["id"] for item in items[:4]]
+
+    removed = history.remove_many(to_remove + ["missing"])
+
+    assert sorted(item["id"] for item in removed) == sorted(to_remove)
+    assert [item["id"] for item in history.load()] == [item["id"] for item in items[4:]]
+    for item in items[:4]:
+        assert not Path(item["output_file"]).exists()
+    for item in items[4:]:
+        assert Path(item["output_file"]).exists()
+
+    stats = {s["project_path"]: s["run_count"] for s in history.project_stats.get_all()}
+    assert sum(stats.values()) == 2
+
+
+def test_remove_many_can_keep_outputs(tmp_path):
+    history = HistoryManager(tmp_path)
+    items = _add_runs(history, 2)
+
+    history.remove_many([item["id"] for item in items], delete_output=False)
+
+    assert history.load() == []
+    assert all(Path(item["output_file"]).exists() for item in items)
+
+
+def test_find_latest_matches_project_and_filter_key(tmp_path):
+    history = HistoryManager(tmp_path)
+    project = Path("/projects/app")
+    older = history.add(project, history.outputs_dir / "1.txt", settings={}, filter_plan_key="k1")
+    history.add(project, history.outputs_dir / "2.txt", settings={}, filter_plan_key="k2")
+    newer = history.add(project, history.outputs_dir / "3.txt", settings={}, filter_plan_key="k1")
+
+    assert history.find_latest(project, "k1")["id"] == newer["id"]
+    assert history.find_latest(Path("/projects/other"), "k1") is None
+
+    # Результаты, удалённые очисткой, не предлагаются
+    history.update(newer["id"], evicted=True)
+    assert history.find_latest(project, "k1")["id"] == older["id"]
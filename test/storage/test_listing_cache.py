@@ -0,0 +1,132 @@
+import os
+import time
+from pathlib import Path
+
+from analyzer.filter_plan import FilterPlan
+from analyzer.project_analyzer import ProjectAnalyzer
+from storage.listing_cache import DirectoryListingCache
+
+# Отметки заведомо старше DirectoryListingCache.RACY_NS
+OLD_NS = time.time_ns() - 3600 * 10**9
+
+
+def _age(path: Path, offset_ns: int = 0) -> None:
+    os.utime(path, ns=(OLD_NS + offset_ns, OLD_NS + offset_ns))
+
+
+def _make_root(root: Path) -> Path:
+    (root / "pkg").mkdir(parents=True)
+    (root / "main.py").write_text("x = 1\n", encoding="utf-8")
+    (root / "pkg" / "util.py").write_text("y = 2\n", encoding="utf-8")
+    _age(root / "pkg")
+    _age(root)
+    return root
+
+
+def _put(cache: DirectoryListingCache, path: Path, dirs, files) -> None:
+    listing, stamp = cache.get(path)
+    assert listing is None
+    cache.put(path, stamp, dirs, files)
+
+
+def test_unchanged_directory_is_served_from_cache(tmp_path):
+    root = _make_root(tmp_path / "project")
+    cache = DirectoryListingCache(tmp_path / "cache")
+    cache.begin(root)
+    _put(cache, root, ["pkg"], ["main.py"])
+    cache.save()
+
+    reloaded = DirectoryListingCache(tmp_path / "cache")
+    reloaded.begin(root)
+    listing, _ = reloaded.get(root)
+    assert listing == (["pkg"], ["main.py"])
+
+
+def test_changed_mtime_invalidates_entry(tmp_path):
+    root = _make_root(tmp_path / "project")
+    cache = DirectoryListingCache(tmp_path / "cache")
+    cache.begin(root)
+    _put(cache, root, ["pkg"], ["main.py"])
+    cache.save()
+
+    (root / "new.py").write_text("", encoding="utf-8")
+    _age(root, offset_ns=10**9)
+
+    cache.begin(root)
+    listing, stamp = cache.get(root)
+    assert listing is None
+    assert stamp[0] == OLD_NS + 10**9
+
+
+def test_recently_modified_directory_is_not_cached(tmp_path):
+    root = tmp_path / "project"
+    root.mkdir()
+    cache = DirectoryListingCache(tmp_path / "cache")
+    cache.begin(root)
+    _put(cache, root, [], [])
+    cache.save()
+
+    cache.begin(root)
+    assert cache.get(root)[0] is None
+
+
+def test_directories_not_visited_are_dropped_on_save(tmp_path):
+    root = _make_root(tmp_path / "project")
+    cache = DirectoryListingCache(tmp_path / "cache")
+    cache.begin(root)
+    _put(cache, root, ["pkg"], ["main.py"])
+    _put(cache, root / "pkg", [], ["util.py"])
+    cache.save()
+
+    # Следующий обход не заходит в pkg (например, папка стала отсечённой)
+    cache.begin(root)
+    cache.get(root)
+    cache.save()
+
+    cache.begin(root)
+    assert cache.get(root)[0] is not None
+    assert cache.get(root / "pkg")[0] is None
+
+
+def test_oldest_roots_are_pruned_above_limit(tmp_path):
+    cache_dir = tmp_path / "cache"
+    roots = [_make_root(tmp_path / f"project{i}") for i in range(3)]
+    cache = DirectoryListingCache(cache_dir)
+    cache.MAX_ROOTS = 2
+
+    files = []
+    for i, root in enumerate(roots[:2]):
+        cache.begin(root)
+        _put(cache, root, ["pkg"], ["main.py"])
+        cache.save()
+        files.append(cache._cache_file())
+        _age(files[-1], offset_ns=i * 10**9)
+
+    # Первый корень снова использован без изменений — он свежее второго
+    cache.begin(roots[0])
+    cache.get(roots[0])
+    cache.save()
+
+    cache.begin(roots[2])
+    _put(cache, roots[2], ["pkg"], ["main.py"])
+    cache.save()
+
+    assert sorted(cache_dir.glob("*.json")) == sorted([files[0], cache._cache_file()])
+
+
+def test_analysis_with_cache_matches_fresh_listing(tmp_path):
+    root = _make_root(tmp_path / "project")
+    plan = FilterPlan.from_lists([], [], None)
+    cache = DirectoryListingCache(tmp_path / "cache")
+
+    def run(name):
+        output_file = tmp_path / f"{name}.txt"
+        ProjectAnalyzer(root, output_file, filter_plan=plan, listing_cache=cache).run()
+        return output_file.read_text(encoding="utf-8").split("\nТекст из файлов проекта:")[0]
+
+    first = run("first")
+    assert run("cached") == first
+
+    (root / "pkg" / "added.py").write_text("", encoding="utf-8")
+    _age(root / "pkg", offset_ns=10**9)
+    assert "added.py" in run("changed")
@@ -0,0 +1,67 @@
+from pathlib import Path
+
+from storage.history_manager import HistoryManager
+from storage.output_stats import OutputStatsCache
+
+
+def test_record_get_and_invalidate_on_change(tmp_path):
+    cache = OutputStatsCache(tmp_path / "cache")
+    output_file = tmp_path / "out.txt"
+    output_file.write_text("a\nb\n", encoding="utf-8")
+
+    assert cache.get(output_file) is None
+    recorded = cache.record(output_file, line_count=2, file_count=0)
+    assert recorded == {"line_count": 2, "byte_size": 4, "file_count": 0}
+    assert cache.get(output_file) == recorded
+
+    with open(output_file, "a", encoding="utf-8") as f:
+        f.write("c\n")
+    assert cache.get(output_file) is None
+
+
+def test_compute_counts_lines_and_file_sections(tmp_path):
+    cache = OutputStatsCache(tmp_path / "cache")
+    output_file = tmp_path / "out.txt"
+    output_file.write_text(
+        "Анализ проекта: /p\n\nТекст из файлов проекта:\n"
+        "\nСодержимое /p/a.py:\nx\n"
+        "\nСодержимое /p/b.py:\ny",
+        encoding="utf-8"
+    )
+
+    stats = cache.compute(output_file)
+    assert stats["line_count"] == 9
+    assert stats["file_count"] == 2
+    assert cache.get(output_file) == stats
+
+
+def test_each_output_has_its_own_entry(tmp_path):
+    cache = OutputStatsCache(tmp_path / "cache")
+    outputs = []
+    for i in range(3):
+        output_file = tmp_path / f"{i}.txt"
+        output_file.write_text("x\n" * (i + 1), encoding="utf-8")
+        cache.record(output_file, line_count=i + 1, file_count=0)
+        outputs.append(output_file)
+    assert len(list((tmp_path / "cache").iterdir())) == 3
+
+    cache.discard(outputs[1])
+    cache.discard(outputs[1])
+    assert cache.get(outputs[1]) is None
+    assert cache.get(outputs[0])["line_count"] == 1
+    assert cache.get(outputs[2])["line_count"] == 3
+
+
+def test_deleting_outputs_removes_their_stats(tmp_path):
+    history = HistoryManager(tmp_path)
+    items = []
+    for i in range(4):
+        output_file = history.outputs_dir / f"{i}.txt"
+        output_file.write_text("x\n", encoding="utf-8")
+        history.output_stats.record(output_file, 1, 0)
+        items.append(history.add(Path("/p"), output_file, settings={}))
+
+    history.remove_many([item["id"] for item in items[:3]])
+
+    assert len(list(history.output_stats.cache_dir.iterdir())) == 1
+    assert history.output_stats.get(Path(items[3]["output_file"])) is not None
@@ -0,0 +1,56 @@
+from pathlib import Path
+
+from storage.history_manager import HistoryManager
+from storage.project_stats import ProjectStats
+
+
+def _add_runs(history: HistoryManager, count: int, **fields):
+    items = []
+    for i in range(count):
+        item = history.add(
+            Path("/projects/app"), history.outputs_dir / f"run_{i}.txt", settings={},
+            line_count=i, output_size=100 + i, **fields
+        )
+        items.append(history.update(item["id"], created_at=f"2026-01-01T00:00:{i:02d}"))
+    return items
+
+
+def _stats(history: HistoryManager):
+    projects = history.project_stats.get_all()
+    assert len(projects) == 1
+    return projects[0]
+
+
+def test_removing_newest_runs_restores_last_run_from_history(tmp_path):
+    history = HistoryManager(tmp_path)
+    count = ProjectStats.TREND_LENGTH + 3
+    items = _add_runs(history, count)
+
+    history.remove_many([item["id"] for item in items[-ProjectStats.TREND_LENGTH:]])
+
+    stats = _stats(history)
+    assert stats["run_count"] == 3
+    assert stats["last_output_bytes"] == 102
+    assert stats["line_count_trend"] == [0, 1, 2]
+    assert stats["total_output_bytes"] == 100 + 101 + 102
+
+
+def test_incremental_stats_match_rebuild_after_removals(tmp_path):
+    history = HistoryManager(tmp_path)
+    items = _add_runs(history, 15, analysis_time=1.5)
+    history.remove_many([items[14]["id"], items[3]["id"], items[12]["id"]])
+
+    incremental = _stats(history)
+    history.rebuild_project_stats()
+    assert incremental == _stats(history)
+
+
+def test_last_output_bytes_skips_entries_without_size(tmp_path):
+    history = HistoryManager(tmp_path)
+    sized, = _add_runs(history, 1)
+    legacy = history.add(Path("/projects/app"), history.outputs_dir / "legacy.txt", settings={})
+    history.update(legacy["id"], created_at="2026-01-02T00:00:00")
+
+    stats = _stats(history)
+    assert stats["run_count"] == 2
+    assert stats["last_output_bytes"] == sized["output_size"]
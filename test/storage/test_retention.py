@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from storage.history_manager import HistoryManager
+from storage.retention import RetentionManager, RetentionPolicy
+
+
+def _add_run(history: HistoryManager, project: str, name: str, days_ago: int, size: int = 100):
+    output_file = history.outputs_dir / f"{name}.txt"
+    output_file.write_bytes(b"x" * size)
+    created_at = (datetime.now() - timedelta(days=days_ago)).isoformat(timespec="seconds")
+    item = history.add(Path(project), output_file, settings={})
+    return history.update(item["id"], created_at=created_at)
+
+
+def test_empty_policy_does_nothing(tmp_path):
+    history = HistoryManager(tmp_path)
+    _add_run(history, "/p", "a", days_ago=100)
+
+    result = RetentionManager(history).run(RetentionPolicy())
+
+    assert result.evicted_ids == []
+    assert not history.load()[0].get("evicted")
+
+
+def test_max_age_evicts_old_outputs_and_keeps_entries(tmp_path):
+    history = HistoryManager(tmp_path)
+    old = _add_run(history, "/p", "old", days_ago=40)
+    fresh = _add_run(history, "/p", "fresh", days_ago=1)
+
+    result = RetentionManager(history).run(RetentionPolicy(max_age_days=30))
+
+    assert result.evicted_ids == [old["id"]]
+    assert result.bytes_reclaimed == 100
+    assert not Path(old["output_file"]).exists()
+    assert Path(fresh["output_file"]).exists()
+
+    items = {item["id"]: item for item in history.load()}
+    assert items[old["id"]]["evicted"] is True
+    assert items[old["id"]]["evicted_bytes"] == 100
+    assert not items[fresh["id"]].get("evicted")
+
+
+def test_max_runs_per_project_keeps_most_recently_used(tmp_path):
+    history = HistoryManager(tmp_path)
+    runs = [_add_run(history, "/p", f"r{i}", days_ago=10 - i) for i in range(4)]
+    other = _add_run(history, "/other", "o", days_ago=20)
+    # Давний запуск, к которому недавно обращались, не вытесняется
+    history.touch(runs[0]["id"])
+
+    planned = RetentionManager(history).plan(RetentionPolicy(max_runs_per_project=2))
+
+    assert [item["id"] for item in planned] == [runs[1]["id"], runs[2]["id"]]
+    assert other["id"] not in {item["id"] for item in planned}
+
+
+def test_max_total_bytes_evicts_least_recently_used_first(tmp_path):
+    history = HistoryManager(tmp_path)
+    runs = [_add_run(history, f"/p{i}", f"r{i}", days_ago=5 - i, size=100) for i in range(5)]
+
+    result = RetentionManager(history).run(RetentionPolicy(max_total_bytes=250))
+
+    assert result.evicted_ids == [runs[0]["id"], runs[1]["id"], runs[2]["id"]]
+    assert result.bytes_reclaimed == 300
+
+    # Повторный запуск не трогает уже вытесненные записи
+    assert RetentionManager(history).run(RetentionPolicy(max_total_bytes=250)).evicted_ids == []
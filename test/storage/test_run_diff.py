@@ -0,0 +1,64 @@
+from pathlib import Path
+
+from analyzer.project_analyzer import ProjectAnalyzer
+from storage.history_manager import HistoryManager
+from storage.run_diff import RunDiffEngine
+
+
+def _run(history: HistoryManager, project: Path, name: str):
+    output_file = history.outputs_dir / f"{name}.txt"
+    ProjectAnalyzer(project, output_file).run()
+    return history.add(project, output_file, settings={}, created_at=name)
+
+
+def _write(project: Path, files: dict) -> None:
+    for rel_path, text in files.items():
+        path = project / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+
+
+def test_compare_finds_added_removed_and_changed_files(tmp_path):
+    history = HistoryManager(tmp_path / "storage")
+    project = (tmp_path / "project").resolve()
+    _write(project, {"same.py": "x = 1\n", "edit.py": "a = 1\nb = 2\n", "gone.py": "pass\n"})
+    old = _run(history, project, "1")
+
+    _write(project, {"edit.py": "a = 1\nb = 3\n", "pkg/new.py": "print()\n"})
+    (project / "gone.py").unlink()
+    new = _run(history, project, "2")
+
+    engine = RunDiffEngine(history)
+    diff = engine.compare(old, new)
+
+    assert diff.added == ["pkg/new.py"]
+    assert diff.removed == ["gone.py"]
+    assert diff.changed == ["edit.py"]
+    assert diff.unchanged_count == 1
+    assert diff.has_changes
+    assert not engine.compare(new, new).has_changes
+
+    lines = engine.file_diff(old, new, "edit.py")
+    assert "-b = 2" in lines
+    assert "+b = 3" in lines
+    assert "+print()" in engine.file_diff(old, new, "pkg/new.py")
+
+
+def test_manifest_is_cached_and_removed_with_the_output(tmp_path):
+    history = HistoryManager(tmp_path / "storage")
+    project = (tmp_path / "project").resolve()
+    _write(project, {"a.py": "x = 1\n"})
+    item = _run(history, project, "1")
+
+    engine = RunDiffEngine(history)
+    manifest = engine.manifest(item)
+    assert set(manifest) == {"a.py"}
+    assert manifest["a.py"]["size"] == len("x = 1\n")
+    assert len(list(history.manifests.cache_dir.iterdir())) == 1
+
+    # Повторный запрос не перечитывает разделы
+    history.section_index.get = None
+    assert engine.manifest(item) == manifest
+
+    history.remove(item["id"])
+    assert not list(history.manifests.cache_dir.iterdir())
@@ -0,0 +1,91 @@
+from pathlib import Path
+
+from analyzer.project_analyzer import ProjectAnalyzer
+from storage.section_index import STOP_CHECK_LINES, SectionIndex
+
+
+def _make_output(tmp_path: Path) -> Path:
+    project = tmp_path / "project"
+    (project / "pkg").mkdir(parents=True)
+    (project / "main.py").write_text("print('main')\n\nx = 1\n", encoding="utf-8")
+    (project / "pkg" / "util.py").write_text("def f():\n    return 'Содержимое'\n", encoding="utf-8")
+    (project / "pkg" / "empty.py").write_text("", encoding="utf-8")
+
+    output_file = tmp_path / "out.txt"
+    ProjectAnalyzer(project, output_file).run()
+    return output_file
+
+
+def test_scan_finds_tree_and_file_sections(tmp_path):
+    output_file = _make_output(tmp_path)
+    data = output_file.read_bytes()
+
+    index = SectionIndex.scan(output_file)
+
+    start, end = index["tree"]
+    assert data[start:end].decode("utf-8").startswith("Структура проекта:\n")
+    assert b"main.py" in data[start:end]
+
+    paths = [Path(path).name for path, _, _ in index["sections"]]
+    assert sorted(paths) == ["empty.py", "main.py", "util.py"]
+    for path, start, end in index["sections"]:
+        section = data[start:end].decode("utf-8")
+        assert section.startswith(f"Содержимое {path}:\n")
+        assert section.endswith("\n")
+        assert "Анализ завершен" not in section
+
+
+def test_read_sections_joins_ranges_in_file_order(tmp_path):
+    output_file = _make_output(tmp_path)
+    section_index = SectionIndex(tmp_path / "cache")
+    index = section_index.get(output_file)
+    by_name = {Path(path).name: (start, end) for path, start, end in index["sections"]}
+
+    text = section_index.read_sections(output_file, [by_name["util.py"], by_name["main.py"]])
+    assert text.index("print('main')") < text.index("return 'Содержимое'")
+
+    with_tree = section_index.read_sections(output_file, [by_name["main.py"]], include_tree=True)
+    assert with_tree.startswith("Структура проекта:")
+
+
+def test_get_uses_cache_until_file_changes(tmp_path, monkeypatch):
+    output_file = _make_output(tmp_path)
+    section_index = SectionIndex(tmp_path / "cache")
+    first = section_index.get(output_file)
+
+    scans = []
+    original_scan = SectionIndex.scan
+    monkeypatch.setattr(SectionIndex, "scan", staticmethod(
+        lambda *args, **kwargs: scans.append(1) or original_scan(*args, **kwargs)
+    ))
+
+    assert section_index.get(output_file)["sections"] == first["sections"]
+    assert scans == []
+
+    with open(output_file, "a", encoding="utf-8") as f:
+        f.write("\nСодержимое /extra.py:\nextra\n")
+    assert len(section_index.get(output_file)["sections"]) == len(first["sections"]) + 1
+    assert scans == [1]
+
+    section_index.discard(output_file)
+    assert not list((tmp_path / "cache").iterdir())
+
+
+def test_get_stops_on_request_without_caching(tmp_path):
+    output_file = tmp_path / "big.txt"
+    with open(output_file, "w", encoding="utf-8") as f:
+        f.write("Структура проекта:\n└── p\n\nТекст из файлов проекта:\n")
+        for i in range(STOP_CHECK_LINES * 3):
+            f.write(f"\nСодержимое /p/{i}.py:\nx\n")
+
+    checks = []
+
+    def should_stop():
+        checks.append(1)
+        return len(checks) > 1
+
+    section_index = SectionIndex(tmp_path / "cache")
+    assert section_index.get(output_file, should_stop=should_stop) is None
+    assert len(checks) == 2
+    assert not (tmp_path / "cache").exists()
+    assert len(section_index.get(output_file)["sections"]) == STOP_CHECK_LINES * 3
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+# Модуль импортирует FilterPlan как structurizer.analyzer.*
+template_manager = pytest.importorskip("structurizer.storage.template_manager")
+TemplateManager = template_manager.TemplateManager
+
+SETTINGS = {"ignored_dirs": [".git"], "ignored_files": ["*.pyc"], "allowed_extensions": [".py"]}
+
+
+def _stored(tmp_path):
+    with open(tmp_path / "templates.json", "r", encoding="utf-8") as f:
+        return json.load(f)["templates"]
+
+
+def test_filter_plan_is_cached_until_template_changes(tmp_path):
+    manager = TemplateManager(tmp_path, write_delay=0)
+    template = manager.create("Python", SETTINGS)
+
+    plan = manager.get_filter_plan(template["id"])
+    assert manager.get_filter_plan(template["id"]) is plan
+    assert plan.is_extension_allowed(".py")
+
+    manager.update(template["id"], settings={**SETTINGS, "allowed_extensions": [".js"]})
+    updated = manager.get_filter_plan(template["id"])
+    assert updated is not plan
+    assert updated.is_extension_allowed(".js") and not updated.is_extension_allowed(".py")
+
+    assert manager.get_filter_plan("missing") is None
+
+
+def test_edits_are_coalesced_into_one_write(tmp_path):
+    manager = TemplateManager(tmp_path, write_delay=60)
+    first = manager.create("A", SETTINGS)
+    manager.create("B", SETTINGS)
+    manager.update(first["id"], name="A2")
+
+    # Изменения пока только в памяти
+    assert _stored(tmp_path) == []
+    assert sorted(t["name"] for t in manager.get_all()) == ["A2", "B"]
+
+    manager.flush()
+    assert sorted(t["name"] for t in _stored(tmp_path)) == ["A2", "B"]
+
+
+def test_external_change_is_reloaded(tmp_path):
+    manager = TemplateManager(tmp_path, write_delay=0)
+    manager.create("A", SETTINGS)
+
+    other = TemplateManager(tmp_path, write_delay=0)
+    created = other.create("B", SETTINGS)
+
+    assert manager.get(created["id"])["name"] == "B"
+    assert manager.get_filter_plan(created["id"]) is not None
@@ -0,0 +1,45 @@
+import multiprocessing
+from pathlib import Path
+
+from storage.history_manager import HistoryManager
+
+PROCESSES = 6
+ITERATIONS = 30
+
+
+def _hammer(base_dir: str, worker: int) -> None:
+    history = HistoryManager(Path(base_dir))
+    for i in range(ITERATIONS):
+        item = history.add(
+            project_path=Path(f"/projects/worker{worker}"),
+            output_file=Path(base_dir) / "outputs" / f"{worker}_{i}.txt",
+            settings={}
+        )
+        history.update(item["id"], description=f"{worker}:{i}")
+        # Параллельное чтение не должно видеть полузаписанный файл
+        history.load()
+
+
+def test_concurrent_add_update(tmp_path):
+    HistoryManager(tmp_path)
+
+    processes = [
+        multiprocessing.Process(target=_hammer, args=(str(tmp_path), worker))
+        for worker in range(PROCESSES)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=120)
+        assert process.exitcode == 0
+
+    items = HistoryManager(tmp_path).load()
+    assert len(items) == PROCESSES * ITERATIONS
+    assert len({item["id"] for item in items}) == PROCESSES * ITERATIONS
+
+    descriptions = {item["description"] for item in items}
+    expected = {f"{w}:{i}" for w in range(PROCESSES) for i in range(ITERATIONS)}
+    assert descriptions == expected
+
+    assert not list(tmp_path.glob("history.json.corrupt-*"))
+
@@ -0,0 +1,57 @@
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from ui.completion_index import CompletionIndex, SearchCompletions, completion_terms
+
+
+def test_completion_terms_use_display_name_and_project_folder():
+    item = {"display_name": "Бэкенд", "project_path": "C:\\work\\backend\\"}
+    assert completion_terms(item) == ("Бэкенд", "backend")
+    assert completion_terms({"display_name": "app", "project_path": "/src/app"}) == ("app",)
+
+
+def test_index_counts_references_and_keeps_case_insensitive_order():
+    index = CompletionIndex()
+    index.reset(["beta", "Alpha", "beta", ""])
+    assert index.values() == ["Alpha", "beta"]
+
+    assert index.add("alpha") == 1
+    assert index.add("Alpha") is None
+    assert index.values() == ["Alpha", "alpha", "beta"]
+
+    # Строка исчезает только вместе с последней ссылкой
+    assert index.discard("beta") is None
+    assert "beta" in index
+    assert index.discard("beta") == 2
+    assert "beta" not in index
+    assert index.discard("beta") is None
+
+
+def test_index_prefix_and_substring_search():
+    index = CompletionIndex()
+    index.reset(["Structurizer", "stats", "Backend", "frontend"])
+
+    assert index.with_prefix("ST") == ["stats", "Structurizer"]
+    assert index.with_prefix("x") == []
+    assert index.containing("END") == ["Backend", "frontend"]
+    assert index.containing("e", limit=1) == ["Backend"]
+
+
+def test_search_completions_model_follows_entries():
+    completions = SearchCompletions()
+    completions.reset([
+        {"id": "1", "display_name": "one", "project_path": "/p/one"},
+        {"id": "2", "display_name": "two", "project_path": "/p/shared"},
+    ])
+    assert completions.model.stringList() == ["one", "shared", "two"]
+
+    completions.add_entry({"id": "3", "display_name": "three", "project_path": "/p/shared"})
+    completions.update_entry({"id": "1", "display_name": "renamed", "project_path": "/p/one"})
+    assert completions.model.stringList() == ["one", "renamed", "shared", "three", "two"]
+
+    completions.remove_entries(["2"])
+    assert completions.model.stringList() == ["one", "renamed", "shared", "three"]
+    completions.remove_entries(["3"])
+    assert completions.model.stringList() == ["one", "renamed"]
+    assert completions.model.stringList() == completions.index.values()
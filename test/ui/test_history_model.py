@@ -0,0 +1,77 @@
+from PySide6.QtCore import Qt
+
+from ui.history_model import HistoryFilterProxyModel, HistoryListModel
+
+
+def _items(count):
+    return [
+        {"id": f"id{i}", "display_name": f"project {i}", "project_path": f"/p/{i}"}
+        for i in range(count)
+    ]
+
+
+def _model(qapp, count, batch_size=200):
+    model = HistoryListModel(None, batch_size=batch_size)
+    model.set_items(_items(count))
+    return model
+
+
+def test_rows_are_fetched_in_batches(qapp):
+    model = _model(qapp, 450)
+
+    assert model.rowCount() == 200
+    assert model.total_count() == 450
+
+    model.fetchMore()
+    assert model.rowCount() == 400
+    model.fetchMore()
+    assert model.rowCount() == 450
+    assert not model.canFetchMore()
+    assert model.data(model.index(449), Qt.UserRole)["id"] == "id449"
+
+
+def test_item_added_to_unfetched_tail_stays_hidden(qapp):
+    model = _model(qapp, 300)
+    revision = model.revision
+
+    model.add_item({"id": "new", "display_name": "new"})
+
+    assert model.rowCount() == 200
+    assert model.total_count() == 301
+    assert model.revision == revision + 1
+
+
+def test_removal_updates_loaded_rows(qapp):
+    model = _model(qapp, 300)
+
+    assert model.remove_items(["id0", "id1", "id250"]) == 3
+
+    assert model.rowCount() == 198
+    assert model.total_count() == 297
+    assert model.item_at(0)["id"] == "id2"
+
+
+def test_proxy_fetches_until_minimum_rows_are_visible(qapp):
+    model = _model(qapp, 1000)
+    proxy = HistoryFilterProxyModel()
+    proxy.setSourceModel(model)
+
+    # Каждая третья запись: первой порции (67 совпадений) не хватает
+    proxy.set_matching_ids({f"id{i}" for i in range(0, 1000, 3)}, "project")
+
+    assert model.rowCount() == 400
+    assert proxy.rowCount() == 134
+
+
+def test_proxy_fetches_everything_for_rare_matches(qapp):
+    model = _model(qapp, 1000)
+    proxy = HistoryFilterProxyModel()
+    proxy.setSourceModel(model)
+
+    proxy.set_matching_ids({"id5", "id999"}, "project")
+
+    assert model.rowCount() == 1000
+    assert [proxy.data(proxy.index(row, 0), Qt.UserRole)["id"] for row in range(2)] == ["id5", "id999"]
+
+    proxy.set_matching_ids(None)
+    assert proxy.rowCount() == 1000
@@ -0,0 +1,117 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+# Окно импортирует соседей как structurizer.*
+main_window = pytest.importorskip("structurizer.ui.main_window")
+
+
+@pytest.fixture
+def window(qapp, tmp_path, monkeypatch):
+    monkeypatch.setattr(main_window, "STORAGE_DIR", tmp_path / "storage")
+    window = main_window.MainWindow()
+    deadline = time.monotonic() + 10
+    while window.history_manager is None and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.01)
+    yield window
+    window.close()
+
+
+@pytest.fixture
+def questions(monkeypatch):
+    asked = []
+
+    def question(*args, **kwargs):
+        asked.append(args[2])
+        return main_window.QMessageBox.Yes
+
+    monkeypatch.setattr(main_window.QMessageBox, "question", question)
+    return asked
+
+
+def _previous(window, tmp_path, git_revision=None):
+    output_file = tmp_path / "previous.txt"
+    output_file.write_text("результат\n", encoding="utf-8")
+    return window.history_manager.add(
+        tmp_path / "project", output_file, settings={}, filter_plan_key="key",
+        git_revision=git_revision, transforms_saved=None
+    )
+
+
+def test_working_tree_rerun_is_not_offered_old_output(window, tmp_path, questions):
+    previous = _previous(window, tmp_path)
+    transforms = main_window.ContentTransforms([])
+
+    assert not window._reuse_previous_output(previous, None, transforms, None)
+    assert questions == []
+
+
+def test_pinned_revision_offers_old_output(window, tmp_path, questions, monkeypatch):
+    commit = "0123456789abcdef0123456789abcdef01234567"
+    previous = _previous(window, tmp_path, git_revision=commit)
+    opened = []
+    monkeypatch.setattr(window, "_open_result_file", opened.append)
+    transforms = main_window.ContentTransforms([])
+
+    assert window._reuse_previous_output(previous, SimpleNamespace(commit=commit), transforms, None)
+    assert len(questions) == 1 and commit[:12] in questions[0]
+    assert opened == [previous]
+
+    # Другая ревизия — результат не подходит
+    other = SimpleNamespace(commit="f" * 40)
+    assert not window._reuse_previous_output(previous, other, transforms, None)
+    assert len(questions) == 1
+
+
+def test_first_run_is_warned_from_dry_run(window, tmp_path, monkeypatch):
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "main.py").write_text("x = 1\n" * 100, encoding="utf-8")
+    # Порог меньше любого результата; истории у проекта нет
+    monkeypatch.setattr(main_window, "LARGE_RUN_WARNING_MB", 0.0001)
+    warnings = []
+
+    def warning(*args, **kwargs):
+        warnings.append(args[2])
+        return main_window.QMessageBox.No
+
+    monkeypatch.setattr(main_window.QMessageBox, "warning", warning)
+    monkeypatch.setattr(window, "_show_error", pytest.fail)
+    monkeypatch.setattr(window, "_show_info", lambda message: None)
+
+    window.path_input.setText(str(project))
+    window.start_button.click()
+
+    assert len(warnings) == 1
+    assert warnings[0].startswith("Оценка с текущими фильтрами")
+    assert window.history_model.items() == []
+
+
+def test_first_run_workers_come_from_dry_run(window, tmp_path, monkeypatch):
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "main.py").write_text("x = 1\n" * 100, encoding="utf-8")
+    monkeypatch.setattr(main_window, "LARGE_RUN_WARNING_MB", None)
+    monkeypatch.setattr(main_window, "LARGE_RUN_WARNING_SECONDS", None)
+    monkeypatch.setattr(main_window, "PARALLEL_MIN_MB", 0.0001)
+    monkeypatch.setattr(main_window, "ANALYSIS_WORKERS", 3)
+    workers = []
+    monkeypatch.setattr(main_window.ProjectAnalyzer, "run", lambda self: workers.append(self.workers))
+    monkeypatch.setattr(window, "_show_error", pytest.fail)
+    monkeypatch.setattr(window, "_show_info", lambda message: None)
+
+    window.path_input.setText(str(project))
+    window.start_button.click()
+
+    assert workers == [3]
+
+
+def test_incomplete_estimate_selects_parallel_write(window, monkeypatch):
+    monkeypatch.setattr(main_window, "ANALYSIS_WORKERS", 3)
+    estimate = main_window.RunEstimate()
+
+    assert window._analysis_workers(estimate) == 1
+    estimate.complete = False
+    assert window._analysis_workers(estimate) == 3
@@ -0,0 +1,49 @@
+import time
+
+import pytest
+
+# Окно импортирует соседей как structurizer.*
+main_window = pytest.importorskip("structurizer.ui.main_window")
+
+
+@pytest.fixture
+def window(qapp, tmp_path, monkeypatch):
+    monkeypatch.setattr(main_window, "STORAGE_DIR", tmp_path)
+    window = main_window.MainWindow()
+    yield window
+    window.close()
+
+
+def _wait_loaded(qapp, window, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while window.history_manager is None and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.01)
+
+
+def test_storage_controls_are_disabled_until_loading_finishes(qapp, window, tmp_path):
+    # Данные передаются в окно через цикл событий — до него ничего не загружено
+    assert window.history_manager is None
+    assert not window.start_button.isEnabled()
+    assert not window.template_combo.isEnabled()
+    assert not window.templates_tab.isEnabled()
+
+    _wait_loaded(qapp, window)
+
+    assert window.history_manager is not None
+    assert window.start_button.isEnabled()
+    assert window.template_combo.isEnabled()
+    assert window.templates_tab.isEnabled()
+    assert window.history_model.history_manager is window.history_manager
+    assert window.retention_manager is not None
+
+
+def test_all_storage_lives_in_configured_dir(qapp, window, tmp_path):
+    _wait_loaded(qapp, window)
+
+    assert window.history_manager.base_dir == tmp_path
+    assert window.template_manager.storage_dir == tmp_path
+    assert window.listing_cache.cache_dir == tmp_path / "cache" / "listings"
+    # Стандартные шаблоны созданы в том же хранилище
+    assert window.template_combo.count() > 1
+    assert (tmp_path / "templates.json").exists()
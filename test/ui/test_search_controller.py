@@ -0,0 +1,83 @@
+import time
+
+import pytest
+
+from ui.history_model import HistoryListModel
+
+# Модуль импортирует соседей как structurizer.ui.*
+search_controller = pytest.importorskip("structurizer.ui.search_controller")
+
+
+def _model(count):
+    model = HistoryListModel(None)
+    model.set_items([
+        {"id": f"id{i}", "display_name": f"{'alpha' if i % 2 else 'beta'} {i}"}
+        for i in range(count)
+    ])
+    return model
+
+
+def _search(qapp, controller, text, field="Название"):
+    results = []
+    controller.results_ready.connect(lambda *args: results.append(args))
+    controller.request(text, field)
+    controller.refresh()
+    return results
+
+
+def _wait(qapp, results, count=1, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while len(results) < count and time.monotonic() < deadline:
+        qapp.processEvents()
+
+
+def test_search_runs_in_chunks(qapp):
+    model = _model(100)
+    controller = search_controller.HistorySearchController(model, delay_ms=0, chunk_size=10)
+
+    results = _search(qapp, controller, "alpha")
+    # Первая порция проверена сразу, остальные — через цикл событий
+    assert results == []
+    _wait(qapp, results)
+
+    matching_ids, text, found, total = results[0]
+    assert (text, found, total) == ("alpha", 50, 100)
+    assert matching_ids == {f"id{i}" for i in range(1, 100, 2)}
+
+
+def test_new_request_cancels_unfinished_search(qapp):
+    model = _model(100)
+    controller = search_controller.HistorySearchController(model, delay_ms=0, chunk_size=10)
+
+    results = _search(qapp, controller, "alpha")
+    controller.request("beta", "Название")
+    controller.refresh()
+    _wait(qapp, results)
+    qapp.processEvents()
+
+    assert [args[1] for args in results] == ["beta"]
+    assert results[0][2] == 50
+
+
+def test_search_scans_snapshot_when_model_changes(qapp):
+    model = _model(100)
+    controller = search_controller.HistorySearchController(model, delay_ms=0, chunk_size=10)
+
+    results = _search(qapp, controller, "alpha")
+    # Записи удаляются между порциями поиска
+    model.remove_items([f"id{i}" for i in range(10)])
+    _wait(qapp, results)
+
+    assert results[0][2] == 50
+
+
+def test_narrowing_reuses_previous_results(qapp):
+    model = _model(30)
+    controller = search_controller.HistorySearchController(model, delay_ms=0, chunk_size=1000)
+
+    results = _search(qapp, controller, "alpha")
+    assert results[0][2] == 15
+
+    controller.request("alpha 1", "Название")
+    controller.refresh()
+    assert results[-1][1:3] == ("alpha 1", 6)
@@ -1,73 +1,177 @@
-from PySide6.QtWidgets import QApplication, QMessageBox
+import codecs
+
+from PySide6.QtWidgets import QApplication, QMessageBox, QProgressDialog
 from PySide6.QtGui import QClipboard
+from PySide6.QtCore import Qt, QObject, QThread, Signal
 from pathlib import Path
 
+# Размер блока чтения в фоновом потоке
+READ_CHUNK_SIZE = 1024 * 1024
+
+# Задания копирования, которые ещё выполняются (держим ссылки до завершения)
+_active_jobs = set()
+
+
+def estimate_clipboard_memory(file_size):
+    """
+    Грубая оценка памяти для копирования файла размером file_size байт:
+    строка Python (для текста в UTF-8 — не больше размера файла) плюс
+    копия в UTF-16, которую делает Qt для буфера обмена.
+    """
+    return file_size + 2 * file_size
+
+
+class ClipboardReadWorker(QThread):
+    """Читает и декодирует файл блоками вне GUI-потока"""
+
+    progress = Signal(int)               # прочитано, в тысячных долях файла
+    content_ready = Signal(object, int)  # текст, число символов
+    failed = Signal(object)              # исключение
+
+    def __init__(self, file_path, parent=None):
+        super().__init__(parent)
+        self.file_path = Path(file_path)
+
+    def run(self):
+        try:
+            size = max(self.file_path.stat().st_size, 1)
+            decoder = codecs.getincrementaldecoder('utf-8')()
+            parts = []
+            char_count = 0
+            bytes_read = 0
+
+            with open(self.file_path, 'rb') as f:
+                while True:
+                    if self.isInterruptionRequested():
+                        return
+
+                    chunk = f.read(READ_CHUNK_SIZE)
+                    text = decoder.decode(chunk, final=not chunk)
+                    parts.append(text)
+                    char_count += len(text)
+
+                    if not chunk:
+                        break
+                    bytes_read += len(chunk)
+                    self.progress.emit(min(bytes_read * 1000 // size, 1000))
+
+            # Универсальные переводы строк, как при чтении в текстовом режиме
+            content = ''.join(parts)
+            if '\r' in content:
+                content = content.replace('\r\n', '\n').replace('\r', '\n')
+                char_count = len(content)
+
+            self.content_ready.emit(content, char_count)
+        except Exception as e:
+            self.failed.emit(e)
+
+
+class ClipboardCopyJob(QObject):
+    """Фоновое копирование файла в буфер обмена с прогрессом и отменой"""
+
+    def __init__(self, file_path, parent_widget=None):
+        super().__init__()
+        self.file_path = Path(file_path)
+        self.parent_widget = parent_widget
+
+        self.progress_dialog = QProgressDialog(
+            f"Чтение файла {self.file_path.name}...",
+            "Отмена", 0, 1000, parent_widget
+        )
+        self.progress_dialog.setWindowTitle("Копирование в буфер обмена")
+        self.progress_dialog.setWindowModality(Qt.WindowModal)
+        # Для небольших файлов диалог не успевает появиться
+        self.progress_dialog.setMinimumDuration(500)
+        self.progress_dialog.setValue(0)
+
+        self.worker = ClipboardReadWorker(self.file_path)
+        self.worker.progress.connect(self.progress_dialog.setValue)
+        self.worker.content_ready.connect(self._on_content_ready)
+        self.worker.failed.connect(self._on_failed)
+        self.worker.finished.connect(self._on_worker_finished)
+        self.progress_dialog.canceled.connect(self.worker.requestInterruption)
+
+    def start(self):
+        _active_jobs.add(self)
+        self.worker.start()
+
+    def _on_content_ready(self, content, char_count):
+        self.progress_dialog.reset()
+
+        clipboard = QApplication.clipboard()
+        clipboard.setText(content)
+
+        QMessageBox.information(
+            self.parent_widget,
+            "Успешно",
+            f"Содержимое файла скопировано в буфер обмена.\n"
+            f"Размер: {char_count:,} символов"
+        )
+
+    def _on_failed(self, error):
+        self.progress_dialog.reset()
+
+        if isinstance(error, UnicodeDecodeError):
+            QMessageBox.warning(
+                self.parent_widget,
+                "Ошибка чтения",
+                "Файл не является текстовым в кодировке UTF-8."
+            )
+        else:
+            QMessageBox.critical(
+                self.parent_widget,
+                "Ошибка",
+                f"Не удалось скопировать файл:\n{str(error)}"
+            )
+
+    def _on_worker_finished(self):
+        self.progress_dialog.reset()
+        self.progress_dialog.deleteLater()
+        self.worker.deleteLater()
+        _active_jobs.discard(self)
+
+
 def copy_file_content_to_clipboard(file_path, parent_widget=None, max_file_size_mb=10):
     """
     Копирует содержимое файла в буфер обмена.
-    
+
+    Чтение и декодирование идут в фоновом потоке с прогрессом и отменой;
+    буфер обмена заполняется по завершении. Возвращает True, если
+    копирование запущено.
+
     Args:
         file_path: путь к файлу
         parent_widget: родительское окно для диалоговых окон
         max_file_size_mb: максимальный размер файла в МБ для копирования без предупреждения
     """
     file_path = Path(file_path)
-    
+
     # Проверяем существование файла
     if not file_path.exists():
         QMessageBox.warning(
-            parent_widget, 
-            "Файл не найден", 
+            parent_widget,
+            "Файл не найден",
             f"Файл не существует:\n{file_path}"
         )
         return False
-    
+
     # Проверяем размер файла
-    file_size_mb = file_path.stat().st_size / (1024 * 1024)
-    
+    file_size = file_path.stat().st_size
+    file_size_mb = file_size / (1024 * 1024)
+
     if file_size_mb > max_file_size_mb:
+        memory_mb = estimate_clipboard_memory(file_size) / (1024 * 1024)
         reply = QMessageBox.question(
             parent_widget,
             "Большой файл",
             f"Файл имеет размер {file_size_mb:.1f} МБ.\n"
-            f"Копирование может занять некоторое время.\n"
+            f"Для копирования потребуется около {memory_mb:.0f} МБ памяти.\n"
             "Вы хотите продолжить?",
             QMessageBox.Yes | QMessageBox.No
         )
-        
+
         if reply != QMessageBox.Yes:
             return False
-    
-    try:
-        # Читаем содержимое файла
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Копируем в буфер обмена
-        clipboard = QApplication.clipboard()
-        clipboard.setText(content)
-        
-        # Показываем сообщение об успехе
-        QMessageBox.information(
-            parent_widget,
-            "Успешно",
-            f"Содержимое файла скопировано в буфер обмена.\n"
-            f"Размер: {len(content):,} символов"
-        )
-        return True
-        
-    except UnicodeDecodeError:
-        QMessageBox.warning(
-            parent_widget,
-            "Ошибка чтения",
-            "Файл не является текстовым в кодировке UTF-8."
-        )
-        return False
-        
-    except Exception as e:
-        QMessageBox.critical(
-            parent_widget,
-            "Ошибка",
-            f"Не удалось скопировать файл:\n{str(e)}"
-        )
-        return False
\ No newline at end of file
+
+    ClipboardCopyJob(file_path, parent_widget).start()
+    return True
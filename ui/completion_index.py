@@ -0,0 +1,165 @@
+# ui/completion_index.py
+
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from PySide6.QtCore import QModelIndex, QStringListModel
+
+
+def completion_terms(item: Dict) -> Tuple[str, ...]:
+    """Строки автодополнения для записи истории: название и имя папки проекта"""
+    terms = []
+
+    display_name = item.get('display_name', '')
+    if display_name:
+        terms.append(display_name)
+
+    # Без Path: имя последнего компонента пути в обоих стилях разделителей
+    project_path = (item.get('project_path') or '').replace('\\', '/').rstrip('/')
+    project_name = project_path.rsplit('/', 1)[-1]
+    if project_name and project_name != display_name:
+        terms.append(project_name)
+
+    return tuple(terms)
+
+
+class CompletionIndex:
+    """
+    Отсортированный набор строк со счётчиком ссылок.
+
+    Одна строка может приходить от нескольких записей истории и
+    исчезает из набора только вместе с последней из них. Порядок —
+    без учёта регистра, что позволяет искать по префиксу бинарным поиском.
+    """
+
+    def __init__(self):
+        self._keys: List[Tuple[str, str]] = []
+        self._counts: Dict[str, int] = {}
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, value: str) -> bool:
+        return value in self._counts
+
+    def values(self) -> List[str]:
+        return [value for _, value in self._keys]
+
+    def reset(self, values: Iterable[str]) -> None:
+        counts: Dict[str, int] = {}
+        for value in values:
+            if value:
+                counts[value] = counts.get(value, 0) + 1
+        self._counts = counts
+        self._keys = sorted((value.casefold(), value) for value in counts)
+
+    def add(self, value: str) -> Optional[int]:
+        """
+        Увеличивает счётчик строки. Возвращает позицию вставки,
+        если строка появилась в наборе впервые, иначе None.
+        """
+        if not value:
+            return None
+
+        count = self._counts.get(value, 0)
+        self._counts[value] = count + 1
+        if count:
+            return None
+
+        key = (value.casefold(), value)
+        row = bisect_left(self._keys, key)
+        self._keys.insert(row, key)
+        return row
+
+    def discard(self, value: str) -> Optional[int]:
+        """
+        Уменьшает счётчик строки. Возвращает позицию удаления,
+        если строка исчезла из набора, иначе None.
+        """
+        count = self._counts.get(value)
+        if not count:
+            return None
+
+        if count > 1:
+            self._counts[value] = count - 1
+            return None
+
+        del self._counts[value]
+        row = bisect_left(self._keys, (value.casefold(), value))
+        del self._keys[row]
+        return row
+
+    def with_prefix(self, prefix: str) -> List[str]:
+        """Строки, начинающиеся с prefix (без учёта регистра)"""
+        prefix = prefix.casefold()
+        start = bisect_left(self._keys, (prefix,))
+        end = bisect_right(self._keys, (prefix + '\U0010ffff',))
+        return [value for _, value in self._keys[start:end]]
+
+    def containing(self, text: str, limit: Optional[int] = None) -> List[str]:
+        """Строки, содержащие text (без учёта регистра)"""
+        text = text.casefold()
+        result = []
+        for key, value in self._keys:
+            if text in key:
+                result.append(value)
+                if limit is not None and len(result) >= limit:
+                    break
+        return result
+
+
+class SearchCompletions:
+    """
+    Модель автодополнения поиска, которая поддерживается точечными
+    вставками и удалениями строк вместо пересоздания при каждом изменении.
+    """
+
+    def __init__(self, parent=None):
+        self.index = CompletionIndex()
+        self.model = QStringListModel(parent)
+        self._terms_by_id: Dict[str, Tuple[str, ...]] = {}
+
+    def reset(self, items: Iterable[Dict]) -> None:
+        """Полностью перестраивает набор (при загрузке истории)"""
+        self._terms_by_id = {
+            item.get('id'): completion_terms(item) for item in items
+        }
+        self.index.reset(
+            term for terms in self._terms_by_id.values() for term in terms
+        )
+        self.model.setStringList(self.index.values())
+
+    def add_entry(self, item: Dict) -> None:
+        terms = completion_terms(item)
+        self._terms_by_id[item.get('id')] = terms
+        for term in terms:
+            self._insert(term)
+
+    def update_entry(self, item: Dict) -> None:
+        """Учитывает переименование записи"""
+        old_terms = self._terms_by_id.get(item.get('id'), ())
+        new_terms = completion_terms(item)
+        if old_terms == new_terms:
+            return
+
+        self._terms_by_id[item.get('id')] = new_terms
+        for term in new_terms:
+            self._insert(term)
+        for term in old_terms:
+            self._remove(term)
+
+    def remove_entries(self, item_ids: Iterable[str]) -> None:
+        for item_id in item_ids:
+            for term in self._terms_by_id.pop(item_id, ()):
+                self._remove(term)
+
+    def _insert(self, term: str) -> None:
+        row = self.index.add(term)
+        if row is not None:
+            self.model.insertRows(row, 1, QModelIndex())
+            self.model.setData(self.model.index(row), term)
+
+    def _remove(self, term: str) -> None:
+        row = self.index.discard(term)
+        if row is not None:
+            self.model.removeRows(row, 1, QModelIndex())
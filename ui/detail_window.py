@@ -9,11 +9,15 @@ from pathlib import Path
 import os
 from structurizer.ui.clipboard_utils import copy_file_content_to_clipboard
 from structurizer.ui.file_clipboard import copy_file_to_clipboard_as_object
+from structurizer.ui.output_viewer import OutputViewer
+from structurizer.ui.section_picker import SectionPickerDialog
+from structurizer.ui.history_model import format_size
 
 class DetailWindow(QDialog):
     """Окно для просмотра и редактирования деталей анализа"""
     
     item_updated = Signal(dict)  # Сигнал при обновлении элемента
+    stats_refreshed = Signal(object)  # Пересчитанные характеристики файла (из фонового потока)
     
     def __init__(self, history_item, history_manager, parent=None):
         super().__init__(parent)
@@ -24,6 +28,8 @@ class DetailWindow(QDialog):
         self.setWindowTitle("Детали анализа")
         self.resize(600, 500)
         
+        self.stats_refreshed.connect(self._show_output_stats)
+
         self._build_ui()
         self._load_data()
         
@@ -59,6 +65,15 @@ class DetailWindow(QDialog):
         self.line_count_label = QLabel()
         self.info_layout.addWidget(QLabel("Количество строк:"))
         self.info_layout.addWidget(self.line_count_label)
+
+        # Размер и число файлов в результате
+        self.output_size_label = QLabel()
+        self.info_layout.addWidget(QLabel("Размер файла:"))
+        self.info_layout.addWidget(self.output_size_label)
+
+        self.file_count_label = QLabel()
+        self.info_layout.addWidget(QLabel("Файлов в результате:"))
+        self.info_layout.addWidget(self.file_count_label)
         
         # Дата создания
         self.date_label = QLabel()
@@ -89,6 +104,9 @@ class DetailWindow(QDialog):
         self.copy_file_button = QPushButton("📋 Копировать содержимое") 
         self.copy_file_button.clicked.connect(self._copy_file_to_clipboard)
 
+        self.copy_sections_button = QPushButton("📑 Копировать файлы...")
+        self.copy_sections_button.clicked.connect(self._copy_sections_to_clipboard)
+
         self.delete_button = QPushButton("🗑 Удалить")
         self.delete_button.clicked.connect(self._delete_item)
         
@@ -101,6 +119,7 @@ class DetailWindow(QDialog):
         buttons_layout.addWidget(self.copy_path_button)
         buttons_layout.addWidget(self.copy_file_object_button)
         buttons_layout.addWidget(self.copy_file_button) 
+        buttons_layout.addWidget(self.copy_sections_button)
         buttons_layout.addWidget(self.delete_button)
         buttons_layout.addWidget(self.close_button)
         
@@ -118,9 +137,21 @@ class DetailWindow(QDialog):
         output_file = self.history_item.get('output_file', '')
         self.output_file_label.setText(output_file)
         
-        # Подсчет строк в файле
-        line_count = self._count_lines(output_file)
-        self.line_count_label.setText(str(line_count))
+        # Характеристики файла берутся из кэша; если файл изменился,
+        # показываем данные истории и пересчитываем в фоне
+        stats = self.history_manager.output_stats.get(output_file) if output_file else None
+        if stats is not None:
+            self._show_output_stats(stats)
+        else:
+            self.line_count_label.setText(str(self.history_item.get('line_count', '—')))
+            output_size = self.history_item.get('output_size')
+            self.output_size_label.setText(format_size(output_size) if output_size else '—')
+            self.file_count_label.setText('—')
+            if output_file and Path(output_file).exists():
+                self.line_count_label.setText(self.line_count_label.text() + " (обновляется...)")
+                self.history_manager.output_stats.refresh_in_background(
+                    output_file, self._emit_output_stats
+                )
         
         # Форматирование даты
         created_at = self.history_item.get('created_at', '')
@@ -142,14 +173,35 @@ class DetailWindow(QDialog):
         else:
             QMessageBox.warning(self, "Ошибка", "Файл не найден")
 
-    def _count_lines(self, file_path):
-        """Подсчитывает количество строк в файле"""
+    def _copy_sections_to_clipboard(self):
+        """Копирует в буфер обмена только выбранные файлы из результата"""
+        output_file = Path(self.history_item.get('output_file', ''))
+        if output_file.exists():
+            SectionPickerDialog(
+                output_file,
+                self.history_manager.section_index,
+                project_path=self.history_item.get('project_path', ''),
+                parent=self
+            ).exec()
+        else:
+            QMessageBox.warning(self, "Ошибка", "Файл не найден")
+
+    def _emit_output_stats(self, stats):
+        """Передаёт результат фонового пересчёта в GUI-поток"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return sum(1 for _ in f)
-        except:
-            return 0
-            
+            self.stats_refreshed.emit(stats)
+        except RuntimeError:
+            # Окно уже закрыто
+            pass
+
+    def _show_output_stats(self, stats):
+        """Показывает число строк, размер и число файлов результата"""
+        if stats is None:
+            return
+        self.line_count_label.setText(str(stats['line_count']))
+        self.output_size_label.setText(format_size(stats['byte_size']))
+        self.file_count_label.setText(str(stats['file_count']))
+
     def _save_changes(self):
         """Сохраняет изменения в элементе истории"""
         display_name = self.name_input.text().strip()
@@ -185,7 +237,7 @@ class DetailWindow(QDialog):
         output_file = Path(self.history_item['output_file'])
         if output_file.exists():
             try:
-                os.startfile(str(output_file))
+                OutputViewer(output_file, parent=self).show()
             except Exception as e:
                 QMessageBox.critical(self, "Ошибка", f"Не удалось открыть файл: {e}")
         else:
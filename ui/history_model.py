@@ -0,0 +1,310 @@
+# ui/history_model.py
+
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from PySide6.QtCore import (
+    Qt,
+    QAbstractListModel,
+    QModelIndex,
+    QSortFilterProxyModel,
+)
+from PySide6.QtGui import QColor, QFont
+
+
+SEARCH_FIELDS = {
+    "Все поля": ("display_name", "project_path", "description"),
+    "Название": ("display_name",),
+    "Путь к проекту": ("project_path",),
+    "Описание": ("description",),
+    "Дата": ("created_at",),
+}
+
+
+def format_history_item(item: Dict) -> str:
+    """Формирует текст элемента истории для отображения в списке"""
+    display_name = item.get('display_name', '')
+    if not display_name:
+        project_path = Path(item.get('project_path', ''))
+        display_name = project_path.name if project_path.name else str(project_path)
+
+    text = display_name
+    created_at = item.get('created_at', '')
+    if created_at:
+        try:
+            dt = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+            date_str = dt.strftime("%d.%m.%Y %H:%M")
+        except ValueError:
+            date_str = created_at
+        text = f"{display_name} ({date_str})"
+
+    if item.get('evicted'):
+        text += " — файл удалён"
+    return text
+
+
+def format_size(size: float) -> str:
+    """Форматирует размер в байтах для отображения"""
+    for unit in ("Б", "КБ", "МБ"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "Б" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} ГБ"
+
+
+def item_matches(item: Dict, search_text: str, search_field: str) -> bool:
+    """Проверяет, содержит ли запись строку поиска в выбранном поле"""
+    fields = SEARCH_FIELDS.get(search_field, SEARCH_FIELDS["Все поля"])
+    return any(search_text in (item.get(f) or '').lower() for f in fields)
+
+
+class HistoryListModel(QAbstractListModel):
+    """
+    Модель списка истории поверх данных HistoryManager.
+
+    Строки отдаются представлению порциями (canFetchMore/fetchMore),
+    а отображаемый текст вычисляется один раз и кэшируется по id записи.
+    """
+
+    def __init__(self, history_manager, batch_size: int = 200, parent=None):
+        super().__init__(parent)
+        self.history_manager = history_manager
+        self.batch_size = batch_size
+
+        self._items: List[Dict] = []
+        self._loaded = 0
+        self._display_cache: Dict[str, str] = {}
+        # Увеличивается при любом изменении данных (не при подгрузке порций)
+        self.revision = 0
+
+    # =====================
+    # Интерфейс Qt
+    # =====================
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return self._loaded
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self._loaded:
+            return None
+
+        item = self._items[index.row()]
+
+        if role == Qt.DisplayRole:
+            return self._display_text(item)
+        if role == Qt.UserRole:
+            return item
+        if role == Qt.ToolTipRole:
+            return item.get('project_path', '')
+        if role == Qt.ForegroundRole and item.get('evicted'):
+            return QColor(Qt.gray)
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        if parent.isValid():
+            return False
+        return self._loaded < len(self._items)
+
+    def fetchMore(self, parent=QModelIndex()) -> None:
+        if parent.isValid():
+            return
+
+        count = min(self.batch_size, len(self._items) - self._loaded)
+        if count <= 0:
+            return
+
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    # =====================
+    # Публичный API
+    # =====================
+
+    def reload(self) -> None:
+        """Перечитывает историю из HistoryManager"""
+        self.set_items(self.history_manager.load())
+
+    def set_items(self, items: List[Dict]) -> None:
+        """Заменяет данные модели, показывая только первую порцию строк"""
+        self.beginResetModel()
+        self.revision += 1
+        self._items = items
+        self._loaded = min(self.batch_size, len(items))
+        self._display_cache.clear()
+        self.endResetModel()
+
+    def items(self) -> List[Dict]:
+        """Возвращает все записи, включая ещё не показанные"""
+        return self._items
+
+    def total_count(self) -> int:
+        return len(self._items)
+
+    def item_at(self, row: int) -> Optional[Dict]:
+        if 0 <= row < len(self._items):
+            return self._items[row]
+        return None
+
+    def add_item(self, item: Dict) -> None:
+        """Добавляет новую запись в конец списка"""
+        row = len(self._items)
+        self.revision += 1
+
+        if self._loaded < row:
+            # Хвост ещё не показан — запись станет видна через fetchMore
+            self._items.append(item)
+            return
+
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._items.append(item)
+        self._loaded += 1
+        self.endInsertRows()
+
+    def update_item(self, item: Dict) -> None:
+        """Заменяет запись с тем же id и сбрасывает её кэш отображения"""
+        row = self._row_of(item.get('id'))
+        if row is None:
+            return
+
+        self.revision += 1
+        self._items[row] = item
+        self._display_cache.pop(item.get('id'), None)
+
+        if row < self._loaded:
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+
+    def remove_item(self, item_id: str) -> bool:
+        """Удаляет запись из модели"""
+        row = self._row_of(item_id)
+        if row is None:
+            return False
+
+        self.revision += 1
+        self._display_cache.pop(item_id, None)
+
+        if row >= self._loaded:
+            del self._items[row]
+            return True
+
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._items[row]
+        self._loaded -= 1
+        self.endRemoveRows()
+        return True
+
+    def remove_items(self, item_ids) -> int:
+        """Удаляет несколько записей, снимая строки непрерывными диапазонами"""
+        item_ids = set(item_ids)
+        rows = [row for row, item in enumerate(self._items) if item.get('id') in item_ids]
+        if not rows:
+            return 0
+
+        self.revision += 1
+        for item_id in item_ids:
+            self._display_cache.pop(item_id, None)
+
+        # Идём с конца, чтобы индексы оставшихся диапазонов не сдвигались
+        end = len(rows) - 1
+        while end >= 0:
+            start = end
+            while start > 0 and rows[start - 1] == rows[start] - 1:
+                start -= 1
+            first, last = rows[start], rows[end]
+
+            if first >= self._loaded:
+                del self._items[first:last + 1]
+            else:
+                visible_last = min(last, self._loaded - 1)
+                self.beginRemoveRows(QModelIndex(), first, visible_last)
+                del self._items[first:last + 1]
+                self._loaded -= visible_last - first + 1
+                self.endRemoveRows()
+
+            end = start - 1
+
+        return len(rows)
+
+    # =====================
+    # Внутренние методы
+    # =====================
+
+    def _row_of(self, item_id: Optional[str]) -> Optional[int]:
+        for row, item in enumerate(self._items):
+            if item.get('id') == item_id:
+                return row
+        return None
+
+    def _display_text(self, item: Dict) -> str:
+        item_id = item.get('id', '')
+        text = self._display_cache.get(item_id)
+        if text is None:
+            text = format_history_item(item)
+            self._display_cache[item_id] = text
+        return text
+
+
+class HistoryFilterProxyModel(QSortFilterProxyModel):
+    """
+    Показывает только записи из результата поиска.
+
+    Сам поиск выполняет HistorySearchController; прокси лишь применяет
+    набор найденных id через invalidateFilter, который убирает и добавляет
+    строки точечно, а не пересоздаёт список.
+    """
+
+    # Сколько совпадений подгружать сразу, чтобы заполнить видимую область
+    MIN_VISIBLE_ROWS = 100
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._search_text = ""
+        self._matching_ids: Optional[Set[str]] = None
+
+    def set_matching_ids(self, matching_ids: Optional[Set[str]], search_text: str = "") -> None:
+        """Применяет результат поиска; None — показать все записи"""
+        self._search_text = search_text.strip().lower()
+        self._matching_ids = matching_ids
+        self.invalidateFilter()
+        self._fetch_visible_rows()
+
+    def is_active(self) -> bool:
+        return self._matching_ids is not None
+
+    def _fetch_visible_rows(self) -> None:
+        """
+        Подгружает порции источника, пока совпадений меньше видимого минимума.
+        Иначе при редких совпадениях список остаётся пустым без прокрутки.
+        """
+        if self._matching_ids is None:
+            return
+
+        source = self.sourceModel()
+        while self.rowCount() < self.MIN_VISIBLE_ROWS and source.canFetchMore():
+            source.fetchMore()
+
+    def filterAcceptsRow(self, source_row, source_parent) -> bool:
+        if self._matching_ids is None:
+            return True
+
+        item = self.sourceModel().item_at(source_row)
+        if item is None:
+            return False
+        return item.get('id') in self._matching_ids
+
+    def data(self, index, role=Qt.DisplayRole):
+        if self._search_text and role in (Qt.FontRole, Qt.BackgroundRole):
+            item = super().data(index, Qt.UserRole)
+            # Подсвечиваем совпадения в названии, пути или описании
+            if item and item_matches(item, self._search_text, "Все поля"):
+                if role == Qt.FontRole:
+                    font = QFont()
+                    font.setBold(True)
+                    return font
+                return QColor(Qt.yellow)
+
+        return super().data(index, role)
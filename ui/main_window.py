@@ -2,8 +2,10 @@ from PySide6.QtWidgets import (
     QMainWindow,
     QWidget,
     QListWidget,
+    QListView,
     QVBoxLayout,
     QHBoxLayout,
+    QGridLayout,
     QLineEdit,
     QPushButton,
     QLabel,
@@ -18,67 +20,171 @@ from PySide6.QtWidgets import (
     QGroupBox, 
     QFormLayout,
     QApplication, 
-    QMessageBox
+    QMessageBox,
+    QTableWidget,
+    QTableWidgetItem,
+    QHeaderView,
+    QPlainTextEdit
 )
 
-from PySide6.QtGui import QClipboard
-from PySide6.QtCore import Qt, QStringListModel
+from PySide6.QtGui import QClipboard, QDesktopServices, QFontDatabase
+from PySide6.QtCore import Qt, Signal, QUrl, QTimer
 
 from structurizer.storage.history_manager import HistoryManager
 from pathlib import Path
 from datetime import datetime
 import os
-from structurizer.config import STORAGE_DIR
+import threading
+import time
+from structurizer.config import (
+    STORAGE_DIR,
+    RETENTION_MAX_TOTAL_MB,
+    RETENTION_MAX_RUNS_PER_PROJECT,
+    RETENTION_MAX_AGE_DAYS,
+    LARGE_RUN_WARNING_MB,
+    LARGE_RUN_WARNING_SECONDS,
+    RUN_ESTIMATE_TIME_LIMIT_SECONDS,
+    ANALYSIS_WORKERS,
+    PARALLEL_MIN_MB,
+)
 from structurizer.ui.detail_window import DetailWindow
+from structurizer.ui.history_model import HistoryListModel, HistoryFilterProxyModel, format_size
+from structurizer.ui.search_controller import HistorySearchController
+from structurizer.ui.completion_index import SearchCompletions
+from structurizer.ui.output_viewer import OutputViewer
+from structurizer.ui.run_diff_dialog import RunDiffDialog
+from structurizer.ui import startup_timing
 from structurizer.ui.clipboard_utils import copy_file_content_to_clipboard
 from structurizer.ui.file_clipboard import copy_file_to_clipboard_as_object
-from structurizer.analyzer.project_analyzer import ProjectAnalyzer
+from structurizer.analyzer.project_analyzer import ProjectAnalyzer, RunEstimate
+from structurizer.analyzer.filter_plan import FilterPlan
+from structurizer.analyzer.project_detector import ProjectDetector
+from structurizer.analyzer.snapshot import DirectorySnapshot
+from structurizer.analyzer.sources import GitRevisionSource
+from structurizer.analyzer.transforms import TRANSFORMS, TRANSFORM_TITLES, ContentTransforms
 from PySide6.QtGui import QKeySequence, QShortcut
 from structurizer.storage.template_manager import TemplateManager
+from structurizer.storage.retention import RetentionManager, RetentionPolicy
+from structurizer.storage.run_diff import RunDiffEngine
+from structurizer.storage.listing_cache import DirectoryListingCache
 
 class MainWindow(QMainWindow):
+    # Результат фоновой очистки (RetentionResult, запущена ли вручную)
+    retention_finished = Signal(object, bool)
+
+    # Созданные в фоне менеджеры и прочитанные ими данные
+    # (HistoryManager, TemplateManager, записи истории, шаблоны)
+    startup_data_loaded = Signal(object, object, object, object)
+    startup_failed = Signal(str)
+
+    # Снимок папки для предпросмотра фильтров (номер запроса, DirectorySnapshot)
+    snapshot_ready = Signal(int, object)
+
+    # Оценка результата по кнопке «Оценить» (RunEstimate или None, текст ошибки)
+    estimate_ready = Signal(object, str)
+
+    # Этапы, после которых печатается отчёт о времени запуска
+    STARTUP_STAGES = ("первая отрисовка", "история загружена")
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Structurizer")
         self.resize(600, 350)
         self._set_window_icon()
-        BASE_DIR = Path(__file__).resolve().parent.parent
 
-        self.history_manager = HistoryManager(
-            base_dir=BASE_DIR / "storage"
-        )
+        # Менеджеры истории и шаблонов создаются в фоне (_start_deferred_loading):
+        # их конструкторы берут блокировку, читают JSON и могут пересчитать
+        # сводку по проектам. До этого запуск анализа и шаблоны недоступны.
+        self.history_manager = None
+        self.template_manager = None
+        self.retention_manager = None
+        self.run_diff = None
 
-        # Добавляем менеджер шаблонов
-        self.template_manager = TemplateManager(
-            storage_dir=BASE_DIR / "storage"
-        )
+        # Списки неизменившихся папок для раздела структуры между запусками
+        self.listing_cache = DirectoryListingCache(STORAGE_DIR / "cache" / "listings")
+        self.retention_finished.connect(self._on_retention_finished)
 
-        self._build_ui()
-        self._load_history()
-    
-    # Переносим загрузку шаблонов в конец _build_ui
+        self.project_detector = ProjectDetector()
+        self._suggested_template_id = None
 
-    def _load_history(self):
-        """Загружает историю анализов"""
-        self.history_list.clear()
+        # Снимок дерева проекта для предпросмотра фильтров
+        self._snapshot = None
+        self._snapshot_generation = 0
+        self.snapshot_ready.connect(self._on_snapshot_ready)
+        self.estimate_ready.connect(self._on_estimate_ready)
 
-        items = self.history_manager.load()
+        self._build_ui()
+        startup_timing.mark("окно создано")
 
-        for item in items:
-            display_name = item.get('display_name', '')
-            if not display_name:
-                project_path = Path(item.get('project_path', ''))
-                display_name = project_path.name if project_path.name else str(project_path)
+        # История и шаблоны читаются в фоне: окно показывается сразу,
+        # а списки заполняются, когда данные готовы
+        self.startup_data_loaded.connect(self._on_startup_data_loaded)
+        self.startup_failed.connect(self._on_startup_failed)
+        self._start_deferred_loading()
 
-            created_at = item.get('created_at', '')
-            if created_at:
-                display_text = f"{display_name} ({created_at})"
-            else:
-                display_text = display_name
+    def _start_deferred_loading(self):
+        """Создаёт менеджеры и читает историю и шаблоны в фоновом потоке"""
+        self.search_info_label.setText("Загрузка истории...")
+        self.search_info_label.show()
+        self._set_storage_controls_enabled(False)
 
-            list_item = QListWidgetItem(display_text)
-            list_item.setData(Qt.UserRole, item)
-            self.history_list.addItem(list_item)
+        def worker():
+            try:
+                history_manager = HistoryManager(base_dir=STORAGE_DIR)
+                template_manager = TemplateManager(storage_dir=STORAGE_DIR)
+                items = history_manager.load()
+                templates = template_manager.get_all()
+            except Exception as e:
+                self.startup_failed.emit(str(e))
+                return
+            self.startup_data_loaded.emit(history_manager, template_manager, items, templates)
+
+        threading.Thread(target=worker, name="structurizer-startup", daemon=True).start()
+
+    def _on_startup_data_loaded(self, history_manager, template_manager, items, templates):
+        """Подключает менеджеры и заполняет историю и шаблоны данными фоновой загрузки"""
+        self.history_manager = history_manager
+        self.template_manager = template_manager
+        self.retention_manager = RetentionManager(history_manager)
+        self.run_diff = RunDiffEngine(history_manager)
+        self.history_model.history_manager = history_manager
+
+        self._populate_templates(templates)
+        startup_timing.mark("шаблоны загружены")
+
+        self.history_model.set_items(items)
+        self.search_completions.reset(items)
+        self.search_info_label.hide()
+        self._set_storage_controls_enabled(True)
+        self._refresh_stats_if_visible()
+        startup_timing.mark("история загружена")
+        startup_timing.report_when(self.STARTUP_STAGES)
+
+        # Путь могли ввести во время загрузки — шаблон подбираем теперь
+        self._detect_project_template()
+
+    def _on_startup_failed(self, message):
+        self.search_info_label.setText("История не загружена")
+        self._show_error(f"Не удалось загрузить историю и шаблоны: {message}")
+
+    def _set_storage_controls_enabled(self, enabled):
+        """Элементы, которым нужны история и шаблоны (до фоновой загрузки отключены)"""
+        self.start_button.setEnabled(enabled)
+        self.estimate_button.setEnabled(enabled)
+        self.template_combo.setEnabled(enabled)
+        self.save_as_template_button.setEnabled(enabled)
+        self.templates_tab.setEnabled(enabled)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not startup_timing.has("первая отрисовка"):
+            startup_timing.mark("первая отрисовка")
+            startup_timing.report_when(self.STARTUP_STAGES)
+
+    def _load_history(self):
+        """Загружает историю анализов"""
+        self.history_model.reload()
+        self.search_completions.reset(self.history_model.items())
 
     def _build_ui(self):
         central = QWidget(self)
@@ -119,8 +225,18 @@ class MainWindow(QMainWindow):
         # Добавляем панель поиска
         left_layout.addWidget(search_panel)
 
-        # Список истории
-        self.history_list = QListWidget()
+        # Список истории (модель подгружает строки порциями);
+        # менеджер истории модель получает после фоновой загрузки
+        self.history_model = HistoryListModel(None, parent=self)
+        self.history_proxy = HistoryFilterProxyModel(self)
+        self.history_proxy.setSourceModel(self.history_model)
+        self.history_search = HistorySearchController(self.history_model, parent=self)
+
+        self.history_list = QListView()
+        self.history_list.setModel(self.history_proxy)
+        self.history_list.setUniformItemSizes(True)
+        self.history_list.setEditTriggers(QListView.NoEditTriggers)
+        self.history_list.setSelectionMode(QListView.ExtendedSelection)
         self.history_list.setMinimumWidth(320)
         self.history_list.setSizePolicy(
             QSizePolicy.Fixed, QSizePolicy.Expanding
@@ -150,6 +266,12 @@ class MainWindow(QMainWindow):
         self._build_templates_tab()
         self.tab_widget.addTab(self.templates_tab, "Шаблоны настроек")
 
+        # Вкладка 3: Статистика по проектам
+        self.stats_tab = QWidget()
+        self._build_stats_tab()
+        self.tab_widget.addTab(self.stats_tab, "Статистика")
+        self.tab_widget.currentChanged.connect(self._on_tab_changed)
+
         main_layout.addWidget(self.tab_widget)
 
         # =====================
@@ -158,9 +280,10 @@ class MainWindow(QMainWindow):
         # Сигналы для поиска
         self.search_input.textChanged.connect(self._on_search_text_changed)
         self.search_field_combo.currentTextChanged.connect(self._on_search_text_changed)
+        self.history_search.results_ready.connect(self._on_search_results)
 
         # Сигналы для списка истории
-        self.history_list.itemClicked.connect(self._on_history_item_clicked)
+        self.history_list.clicked.connect(self._on_history_item_clicked)
         self.history_list.setContextMenuPolicy(Qt.CustomContextMenu)
         self.history_list.customContextMenuRequested.connect(
             self._on_history_context_menu
@@ -172,12 +295,18 @@ class MainWindow(QMainWindow):
         # Настраиваем горячие клавиши
         self.setup_shortcuts()
 
-        # Загружаем шаблоны ПОСЛЕ создания всех виджетов
-        self._load_templates()
+        # Шаблоны загружаются вместе с историей после показа окна
+        # (_start_deferred_loading)
 
         # Настраиваем автодополнение для поиска (опционально)
         self._setup_search_autocomplete()
 
+    def closeEvent(self, event):
+        """Записывает отложенные изменения шаблонов перед закрытием"""
+        if self.template_manager is not None:
+            self.template_manager.flush()
+        super().closeEvent(event)
+
     def _set_window_icon(self):
         """Устанавливает иконку окна"""
         base_dir = Path(__file__).resolve().parent.parent
@@ -261,6 +390,60 @@ class MainWindow(QMainWindow):
         layout.addStretch()
 
 
+    def _build_stats_tab(self):
+        """Создаёт вкладку со сводкой по проектам"""
+        layout = QVBoxLayout(self.stats_tab)
+
+        self.stats_table = QTableWidget(0, 6)
+        self.stats_table.setHorizontalHeaderLabels([
+            "Проект",
+            "Запусков",
+            "Размер всего",
+            "Последний размер",
+            "Строки (тренд)",
+            "Среднее время",
+        ])
+        self.stats_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.stats_table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.stats_table.verticalHeader().setVisible(False)
+        self.stats_table.horizontalHeader().setSectionResizeMode(
+            0, QHeaderView.Stretch
+        )
+
+        layout.addWidget(self.stats_table)
+
+    def _on_tab_changed(self, index):
+        """Обновляет статистику при переходе на её вкладку"""
+        if self.tab_widget.widget(index) is self.stats_tab:
+            self._refresh_stats()
+
+    def _refresh_stats_if_visible(self):
+        if self.tab_widget.currentWidget() is self.stats_tab:
+            self._refresh_stats()
+
+    def _refresh_stats(self):
+        """Заполняет таблицу из готовой сводки (без чтения истории и файлов)"""
+        if self.history_manager is None:
+            return
+        projects = self.history_manager.project_stats.get_all()
+
+        self.stats_table.setRowCount(len(projects))
+        for row, stats in enumerate(projects):
+            trend = stats["line_count_trend"][-5:]
+            avg_time = stats["avg_analysis_time"]
+
+            values = [
+                stats["project_path"],
+                str(stats["run_count"]),
+                format_size(stats["total_output_bytes"]),
+                format_size(stats["last_output_bytes"]),
+                " → ".join(str(count) for count in trend),
+                f"{avg_time:.1f} с" if avg_time is not None else "—",
+            ]
+            for column, value in enumerate(values):
+                self.stats_table.setItem(row, column, QTableWidgetItem(value))
+
+
     def _build_settings_tab(self):
         """Создаёт вкладку настроек анализа"""
         layout = QVBoxLayout(self.settings_tab)
@@ -283,6 +466,14 @@ class MainWindow(QMainWindow):
 
         layout.addWidget(template_group)
 
+        # Подсказка автоопределения типа проекта
+        self.template_hint_label = QLabel()
+        self.template_hint_label.setStyleSheet("color: gray;")
+        self.template_hint_label.setWordWrap(True)
+        self.template_hint_label.linkActivated.connect(self._apply_suggested_template)
+        self.template_hint_label.hide()
+        layout.addWidget(self.template_hint_label)
+
         # Путь к проекту
         path_layout = QHBoxLayout()
         self.path_input = QLineEdit()
@@ -291,8 +482,23 @@ class MainWindow(QMainWindow):
         self.browse_button = QPushButton("📂")
         self.browse_button.setFixedWidth(40)
 
+        self.browse_archive_button = QPushButton("🗜")
+        self.browse_archive_button.setFixedWidth(40)
+        self.browse_archive_button.setToolTip("Выбрать архив (.zip, .tar.gz, ...)")
+
+        # Ревизия git: анализ коммита/ветки/тега без checkout
+        self.revision_input = QLineEdit()
+        self.revision_input.setPlaceholderText("Ревизия git")
+        self.revision_input.setToolTip(
+            "Необязательно: ветка, тег или коммит локального git-репозитория.\n"
+            "Файлы читаются из репозитория, рабочая копия не меняется."
+        )
+        self.revision_input.setFixedWidth(140)
+
         path_layout.addWidget(self.path_input)
+        path_layout.addWidget(self.revision_input)
         path_layout.addWidget(self.browse_button)
+        path_layout.addWidget(self.browse_archive_button)
 
         layout.addLayout(path_layout)
 
@@ -324,24 +530,102 @@ class MainWindow(QMainWindow):
         layout.addWidget(self.allowed_ext_input)
         layout.addWidget(self.all_extensions_checkbox)
 
+        # Список файлов из индекса git вместо обхода папки
+        git_index_layout = QHBoxLayout()
+        self.git_index_checkbox = QCheckBox("Только файлы git-репозитория")
+        self.git_index_checkbox.setToolTip(
+            "Список файлов берётся из индекса git (git ls-files): игнорируемые\n"
+            "папки сборки не просматриваются. Вне репозитория — обычный обход."
+        )
+        self.git_untracked_checkbox = QCheckBox("и неотслеживаемые")
+        self.git_untracked_checkbox.setToolTip(
+            "Добавить новые файлы, ещё не добавленные в git, но не игнорируемые"
+        )
+        self.git_untracked_checkbox.setEnabled(False)
+
+        git_index_layout.addWidget(self.git_index_checkbox)
+        git_index_layout.addWidget(self.git_untracked_checkbox)
+        git_index_layout.addStretch()
+        layout.addLayout(git_index_layout)
+
+        # Преобразования содержимого: меньше байт в результате
+        transforms_group = QGroupBox("Сжатие содержимого")
+        transforms_layout = QGridLayout(transforms_group)
+        self.transform_checkboxes = {}
+        for i, (name, title, _) in enumerate(TRANSFORMS):
+            checkbox = QCheckBox(title)
+            self.transform_checkboxes[name] = checkbox
+            transforms_layout.addWidget(checkbox, i // 2, i % 2)
+        layout.addWidget(transforms_group)
+
+        # Предпросмотр фильтров по снимку папки (без чтения файлов)
+        self.preview_group = QGroupBox("Предпросмотр")
+        self.preview_group.setCheckable(True)
+        self.preview_group.setChecked(False)
+        preview_layout = QVBoxLayout(self.preview_group)
+
+        self.preview_info_label = QLabel()
+        self.preview_tree = QPlainTextEdit()
+        self.preview_tree.setReadOnly(True)
+        self.preview_tree.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.preview_tree.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+
+        preview_layout.addWidget(self.preview_info_label)
+        preview_layout.addWidget(self.preview_tree, 1)
+        self.preview_tree.setVisible(False)
+        self.preview_info_label.setVisible(False)
+
+        self._preview_timer = QTimer(self)
+        self._preview_timer.setSingleShot(True)
+        self._preview_timer.setInterval(150)
+        self._preview_timer.timeout.connect(self._update_preview)
+
+        layout.addWidget(self.preview_group)
+
         # Spacer
         layout.addStretch()
 
-        # Кнопка запуска
+        # Кнопки оценки и запуска
+        run_layout = QHBoxLayout()
+
+        self.estimate_button = QPushButton("📏 Оценить")
+        self.estimate_button.setFixedHeight(40)
+        self.estimate_button.setToolTip(
+            "Обойти папку с текущими фильтрами и оценить размер результата,\n"
+            "число строк и время анализа, не читая файлы целиком"
+        )
+        self.estimate_button.clicked.connect(self._on_estimate_clicked)
+
         self.start_button = QPushButton("Начать анализ")
         self.start_button.setFixedHeight(40)
-        layout.addWidget(self.start_button)
+
+        run_layout.addWidget(self.estimate_button)
+        run_layout.addWidget(self.start_button, 1)
+        layout.addLayout(run_layout)
 
         # Подключаем сигналы
         self.browse_button.clicked.connect(self._on_browse_clicked)
+        self.browse_archive_button.clicked.connect(self._on_browse_archive_clicked)
+        self.path_input.editingFinished.connect(self._detect_project_template)
+        self.path_input.editingFinished.connect(self._take_snapshot_if_needed)
+
+        self.preview_group.toggled.connect(self._on_preview_toggled)
+        for field in (self.ignored_dirs_input, self.ignored_files_input, self.allowed_ext_input):
+            field.textChanged.connect(self._schedule_preview)
+        self.all_extensions_checkbox.toggled.connect(self._schedule_preview)
         self.all_extensions_checkbox.toggled.connect(
             self.allowed_ext_input.setDisabled
         )
+        self.git_index_checkbox.toggled.connect(self.git_untracked_checkbox.setEnabled)
     # =====================
     # Обработчики
     # =====================
     def _load_templates(self):
         """Загружает список шаблонов"""
+        self._populate_templates(self.template_manager.get_all())
+
+    def _populate_templates(self, templates):
+        """Заполняет комбобокс и список шаблонов"""
         # Очищаем списки
         self.template_combo.clear()
         self.templates_list.clear()
@@ -349,14 +633,13 @@ class MainWindow(QMainWindow):
         # Добавляем пустой элемент
         self.template_combo.addItem("-- Выберите шаблон --", None)
 
-        # Загружаем шаблоны
-        templates = self.template_manager.get_all()
-
         # Если шаблонов нет, добавляем стандартные
         if not templates:
             default_templates = self.template_manager.get_default_templates()
-            for template in default_templates:
-                self.template_manager.create(template["name"], template["settings"])
+            self.template_manager.create_many(
+                (template["name"], template["settings"])
+                for template in default_templates
+            )
 
             # Перезагружаем
             templates = self.template_manager.get_all()
@@ -523,6 +806,25 @@ class MainWindow(QMainWindow):
             "allowed_extensions": allowed_extensions
         }
 
+    def _current_filter_plan(self, settings):
+        """
+        Возвращает скомпилированные фильтры для текущих настроек.
+        Если поля совпадают с выбранным шаблоном, берётся кэшированный
+        план шаблона, иначе план строится из полей.
+        """
+        template_id = self.template_combo.currentData()
+        if template_id:
+            template = self.template_manager.get(template_id)
+            if template and self._same_settings(template.get("settings", {}), settings):
+                return self.template_manager.get_filter_plan(template_id)
+
+        return FilterPlan.from_settings(settings)
+
+    @staticmethod
+    def _same_settings(first, second):
+        keys = ("ignored_dirs", "ignored_files", "allowed_extensions")
+        return all(list(first.get(k) or []) == list(second.get(k) or []) for k in keys)
+
     def _add_template(self):
         """Добавляет новый шаблон"""
         self._save_current_as_template()
@@ -640,11 +942,20 @@ class MainWindow(QMainWindow):
             self._load_templates()
             QMessageBox.information(self, "Успех", f"Шаблон '{name}' создан!")
     def _open_result_file(self, entry):
-        """Открывает файл результата"""
+        """Открывает файл результата во встроенном просмотрщике"""
         output_file = Path(entry["output_file"])
         if output_file.exists():
-            import os
-            os.startfile(str(output_file))
+            self.history_manager.touch(entry["id"])
+            OutputViewer(output_file, parent=self).show()
+        else:
+            self._show_error("Файл не найден")
+
+    def _open_result_file_external(self, entry):
+        """Открывает файл результата в программе по умолчанию"""
+        output_file = Path(entry["output_file"])
+        if output_file.exists():
+            self.history_manager.touch(entry["id"])
+            QDesktopServices.openUrl(QUrl.fromLocalFile(str(output_file)))
         else:
             self._show_error("Файл не найден")
 
@@ -670,13 +981,15 @@ class MainWindow(QMainWindow):
         """Удаляет элемент истории по ID"""
         success = self.history_manager.remove(item_id, delete_output=True)
         if success:
-            self._load_history()  # Обновляем список
+            self.history_model.remove_item(item_id)
+            self.search_completions.remove_entries([item_id])
+            self._refresh_stats_if_visible()
             QMessageBox.information(self, "Удалено", "Элемент успешно удален")
         else:
             QMessageBox.warning(self, "Ошибка", "Не удалось удалить элемент")
 
 
-    def _delete_history_item(self, entry, item):
+    def _delete_history_item(self, entry):
         """Удаляет элемент истории"""
         from PySide6.QtWidgets import QMessageBox
 
@@ -690,14 +1003,45 @@ class MainWindow(QMainWindow):
         if reply == QMessageBox.Yes:
             success = self.history_manager.remove(entry["id"])
             if success:
-                self.history_list.takeItem(self.history_list.row(item))
+                self.history_model.remove_item(entry["id"])
+                self.search_completions.remove_entries([entry["id"]])
+                self._refresh_stats_if_visible()
                 self._show_info("Запись удалена")
             else:
                 self._show_error("Ошибка при удалении")
 
-    def _on_history_item_clicked(self, item):
+    def _delete_history_items(self, entries):
+        """Удаляет несколько элементов истории одной операцией"""
+        reply = QMessageBox.question(
+            self,
+            "Подтверждение",
+            f"Удалить выбранные записи: {len(entries)}?",
+            QMessageBox.Yes | QMessageBox.No
+        )
+
+        if reply == QMessageBox.Yes:
+            removed = self.history_manager.remove_many(e["id"] for e in entries)
+            removed_ids = [item["id"] for item in removed]
+            self.history_model.remove_items(removed_ids)
+            self.search_completions.remove_entries(removed_ids)
+            self._refresh_stats_if_visible()
+            self._show_info(f"Удалено записей: {len(removed)}")
+
+    def _selected_history_entries(self):
+        """Возвращает записи, выделенные в списке истории"""
+        return [
+            index.data(Qt.UserRole)
+            for index in self.history_list.selectionModel().selectedIndexes()
+            if index.data(Qt.UserRole)
+        ]
+
+    def _on_history_item_clicked(self, index):
         """Открывает окно с деталями элемента при клике"""
-        entry = item.data(Qt.UserRole)
+        # Ctrl/Shift+клик только меняет выделение (для удаления нескольких записей)
+        if QApplication.keyboardModifiers() & (Qt.ControlModifier | Qt.ShiftModifier):
+            return
+
+        entry = index.data(Qt.UserRole)
         if entry:
             self._open_detail_window(entry)
 
@@ -715,7 +1059,9 @@ class MainWindow(QMainWindow):
         detail_window.exec()
     def _on_item_updated(self, updated_item):
         """Обновляет элемент в списке после сохранения изменений"""
-        self._load_history()  # Перезагружаем список
+        self.history_model.update_item(updated_item)
+        self.search_completions.update_entry(updated_item)
+        self.history_search.refresh()
 
     def _on_browse_clicked(self):
         """Открывает диалог выбора папки"""
@@ -726,14 +1072,139 @@ class MainWindow(QMainWindow):
     
         if dir_path:
             self.path_input.setText(dir_path)
+            self._detect_project_template()
+            self._take_snapshot_if_needed()
+
+    def _on_browse_archive_clicked(self):
+        """Открывает диалог выбора архива с исходниками"""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Выберите архив проекта",
+            "",
+            "Архивы (*.zip *.tar *.tar.gz *.tgz *.tar.bz2 *.tbz2 *.tar.xz *.txz)"
+        )
+
+        if file_path:
+            self.path_input.setText(file_path)
+
+    def _detect_project_template(self):
+        """
+        Быстро определяет тип проекта по маркерам и выборке расширений.
+        Если шаблон ещё не выбран — применяет подходящий сразу,
+        если выбран другой — предлагает его в подсказке.
+        """
+        self.template_hint_label.hide()
+        self._suggested_template_id = None
+
+        # Шаблоны ещё загружаются — подбор выполнится после загрузки
+        if self.template_manager is None:
+            return None
+
+        project_path = Path(self.path_input.text().strip())
+        if not self.path_input.text().strip() or not project_path.is_dir():
+            return None
+
+        detection = self.project_detector.detect(project_path)
+        template = self.project_detector.suggest_template(
+            detection, self.template_manager.get_all()
+        )
+        if template is None or template["id"] == self.template_combo.currentData():
+            return template
+
+        if self.template_combo.currentData() is None:
+            index = self.template_combo.findData(template["id"])
+            if index >= 0:
+                self.template_combo.setCurrentIndex(index)
+            self.template_hint_label.setText(
+                f"Шаблон «{template['name']}» выбран автоматически"
+            )
+        else:
+            self._suggested_template_id = template["id"]
+            self.template_hint_label.setText(
+                f"Похоже, подходит шаблон «{template['name']}»: "
+                f"<a href=\"apply\">применить</a>"
+            )
+        self.template_hint_label.show()
+        return template
+
+    def _on_preview_toggled(self, checked):
+        """Включает предпросмотр: снимок делается только при включённой панели"""
+        self.preview_tree.setVisible(checked)
+        self.preview_info_label.setVisible(checked)
+        self.settings_tab.layout().setStretchFactor(self.preview_group, 1 if checked else 0)
+        if checked:
+            self._take_snapshot_if_needed()
+
+    def _take_snapshot_if_needed(self):
+        """Снимает дерево выбранной папки в фоне (имена и размеры, без содержимого)"""
+        if not self.preview_group.isChecked():
+            return
+
+        project_path = Path(self.path_input.text().strip())
+        if not self.path_input.text().strip() or not project_path.is_dir():
+            self._snapshot = None
+            self.preview_info_label.setText("Укажите папку проекта")
+            self.preview_tree.clear()
+            return
+
+        if self._snapshot is not None and self._snapshot.root_dir == project_path.resolve():
+            self._schedule_preview()
+            return
+
+        self._snapshot_generation += 1
+        generation = self._snapshot_generation
+        self.preview_info_label.setText("Чтение структуры папки...")
+
+        def worker():
+            snapshot = DirectorySnapshot.take(
+                project_path,
+                should_stop=lambda: generation != self._snapshot_generation
+            )
+            if snapshot is not None:
+                self.snapshot_ready.emit(generation, snapshot)
+
+        threading.Thread(target=worker, name="structurizer-snapshot", daemon=True).start()
+
+    def _on_snapshot_ready(self, generation, snapshot):
+        if generation != self._snapshot_generation:
+            return
+        self._snapshot = snapshot
+        self._update_preview()
+
+    def _schedule_preview(self, *args):
+        if self.preview_group.isChecked() and self._snapshot is not None:
+            self._preview_timer.start()
+
+    def _update_preview(self):
+        """Применяет текущие фильтры к снимку"""
+        if self._snapshot is None:
+            return
+
+        preview = self._snapshot.preview(FilterPlan.from_settings(self._get_current_settings()))
+
+        self.preview_info_label.setText(
+            f"Файлов в результате: {preview.file_count}, "
+            f"размер результата ≈ {format_size(preview.estimated_bytes)}"
+        )
+        text = "\n".join(preview.tree_lines)
+        if preview.tree_truncated:
+            text += f"\n… ещё {preview.tree_line_count - len(preview.tree_lines)} строк"
+        self.preview_tree.setPlainText(text)
+
+    def _apply_suggested_template(self, _link=None):
+        """Применяет шаблон, предложенный автоопределением"""
+        index = self.template_combo.findData(self._suggested_template_id)
+        if index >= 0:
+            self.template_combo.setCurrentIndex(index)
+        self.template_hint_label.hide()
 
     def _on_history_context_menu(self, pos):
         """Показывает контекстное меню для элемента истории"""
-        item = self.history_list.itemAt(pos)
-        if not item:
+        index = self.history_list.indexAt(pos)
+        if not index.isValid():
             return
 
-        entry = item.data(Qt.UserRole)
+        entry = index.data(Qt.UserRole)
         if not entry:
             return
 
@@ -743,12 +1214,15 @@ class MainWindow(QMainWindow):
 
         rename_action = menu.addAction("✏️ Переименовать")
         open_action = menu.addAction("📄 Открыть файл")
+        open_external_action = menu.addAction("📝 Открыть во внешнем редакторе")
         open_in_explorer_action = menu.addAction("📂 Открыть в проводнике")
         copy_file_object_action = menu.addAction("📁 Копировать файл (как объект)")
         copy_file_action = menu.addAction("📋 Копировать содержимое")
         copy_path_action = menu.addAction("📋 Копировать путь")
+        compare_action = menu.addAction("🔀 Сравнить с предыдущим запуском")
         menu.addSeparator()
         delete_action = menu.addAction("🗑 Удалить")
+        cleanup_action = menu.addAction("🧹 Очистить старые результаты")
 
         action = menu.exec(self.history_list.mapToGlobal(pos))
         if action == copy_file_object_action:
@@ -759,17 +1233,56 @@ class MainWindow(QMainWindow):
             self._open_detail_window(entry)
         elif action == open_action:
             self._open_result_file(entry)
+        elif action == open_external_action:
+            self._open_result_file_external(entry)
         elif action == open_in_explorer_action:
             self._open_in_explorer(entry)
         elif action == copy_path_action:
             self._copy_to_clipboard(entry)
+        elif action == compare_action:
+            self._compare_runs(entry)
         elif action == delete_action:
-            self._delete_history_item(entry, item)
+            selected = self._selected_history_entries()
+            if len(selected) > 1 and any(e["id"] == entry["id"] for e in selected):
+                self._delete_history_items(selected)
+            else:
+                self._delete_history_item(entry)
+        elif action == cleanup_action:
+            self._cleanup_outputs()
+
+    def _compare_runs(self, entry):
+        """
+        Сравнивает запуски: два выделенных или выбранный
+        с предыдущим запуском того же проекта.
+        """
+        selected = self._selected_history_entries()
+        if len(selected) == 2 and any(e["id"] == entry["id"] for e in selected):
+            old_item, new_item = sorted(selected, key=lambda e: e.get("created_at", ""))
+        else:
+            earlier = [
+                item for item in self.history_model.items()
+                if item.get("project_path") == entry.get("project_path")
+                and item.get("created_at", "") < entry.get("created_at", "")
+                and not item.get("evicted")
+            ]
+            if not earlier:
+                self._show_info("Нет более раннего запуска этого проекта")
+                return
+            old_item = max(earlier, key=lambda e: e.get("created_at", ""))
+            new_item = entry
+
+        for item in (old_item, new_item):
+            if not Path(item.get("output_file", "")).exists():
+                self._show_error(f"Файл не найден: {item.get('output_file', '')}")
+                return
+
+        RunDiffDialog(self.run_diff, old_item, new_item, parent=self).exec()
 
     def _copy_file_to_clipboard(self, entry):
         """Копирует содержимое файла в буфер обмена"""
         output_file = Path(entry.get('output_file', ''))
         if output_file.exists():
+            self.history_manager.touch(entry["id"])
             copy_file_content_to_clipboard(output_file, self)
         else:
             self._show_error("Файл не найден")
@@ -779,6 +1292,7 @@ class MainWindow(QMainWindow):
         """Копирует файл как объект в буфер обмена"""
         output_file = Path(entry.get('output_file', ''))
         if output_file.exists():
+            self.history_manager.touch(entry["id"])
             copy_file_to_clipboard_as_object(output_file, self)
         else:
             self._show_error("Файл не найден")
@@ -798,44 +1312,77 @@ class MainWindow(QMainWindow):
             self._show_error(f"Путь не существует: {project_path}")
             return
 
-        ignored_dirs = [
-            d.strip() for d in self.ignored_dirs_input.text().split(';') 
-            if d.strip()
-        ]
-        ignored_files = [
-            f.strip() for f in self.ignored_files_input.text().split(';') 
-            if f.strip()
-        ]
+        # Шаблон не выбран и поля пусты — подбираем шаблон до запуска анализа
+        current_settings = self._get_current_settings()
+        if self.template_combo.currentData() is None and not any(current_settings.values()):
+            self._detect_project_template()
+            current_settings = self._get_current_settings()
+
+        ignored_dirs = current_settings["ignored_dirs"]
+        ignored_files = current_settings["ignored_files"]
 
         if self.all_extensions_checkbox.isChecked():
             allowed_extensions = None
         else:
-            allowed_extensions = [
-                ext.strip() for ext in self.allowed_ext_input.text().split(';') 
-                if ext.strip()
-            ]
+            allowed_extensions = current_settings["allowed_extensions"]
 
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        project_name = project_path.name or "project"
-        output_filename = f"{project_name}_{timestamp}.txt"
-        output_file = self.history_manager.outputs_dir / output_filename
+        filter_plan = self._current_filter_plan(current_settings)
+        output_file = self._new_output_file(project_path)
+        revision = self.revision_input.text().strip()
 
         try:
+            source = None
+            if revision:
+                if not project_path.is_dir():
+                    self._show_error("Ревизию git можно указать только для папки репозитория")
+                    return
+                source = GitRevisionSource(project_path, revision)
+
+            transforms = ContentTransforms(
+                name for name, checkbox in self.transform_checkboxes.items()
+                if checkbox.isChecked()
+            )
+            git_index = self._git_index_mode()
+
+            # Тот же проект с теми же фильтрами уже анализировался — можно открыть
+            # готовый результат, а его размер и время служат оценкой нового запуска
+            previous = self.history_manager.find_latest(project_path, filter_plan.key)
+            if self._reuse_previous_output(previous, source, transforms, git_index):
+                if source is not None:
+                    source.close()
+                return
+
             analyzer = ProjectAnalyzer(
                 root_dir=project_path,
                 output_file=output_file,
-                ignored_dirs=ignored_dirs,
-                ignored_files=ignored_files,
-                allowed_extensions=allowed_extensions
+                filter_plan=filter_plan,
+                source=source,
+                use_git_index=git_index is not None,
+                include_untracked=git_index == "untracked",
+                transforms=transforms,
+                listing_cache=self.listing_cache
             )
 
+            estimate = self._estimate_from_previous_run(previous)
+            from_history = estimate is not None
+            if estimate is None:
+                estimate = self._estimate_new_run(analyzer)
+            if estimate is not None and not self._confirm_large_run(estimate, from_history):
+                analyzer.close()
+                return
+            analyzer.workers = self._analysis_workers(estimate)
+
+            started = time.perf_counter()
             analyzer.run()
+            analysis_time = time.perf_counter() - started
 
-            # Подсчитываем количество строк в результате
-            line_count = 0
+            # Характеристики результата известны анализатору — файл не перечитываем
+            line_count = analyzer.line_count
+            output_size = 0
             if output_file.exists():
-                with open(output_file, 'r', encoding='utf-8') as f:
-                    line_count = sum(1 for _ in f)
+                output_size = self.history_manager.output_stats.record(
+                    output_file, line_count, analyzer.file_count
+                )["byte_size"]
 
             # Добавляем в историю
             settings = {
@@ -847,96 +1394,362 @@ class MainWindow(QMainWindow):
             history_item = self.history_manager.add(
                 project_path=project_path,
                 output_file=output_file,
-                settings=settings
+                settings=settings,
+                line_count=line_count,
+                output_size=output_size,
+                analysis_time=round(analysis_time, 3),
+                filter_plan_key=filter_plan.key,
+                git_revision=source.commit if source is not None else None,
+                git_index=git_index,
+                transforms_saved=(
+                    dict(analyzer.transforms.bytes_saved)
+                    if analyzer.transforms is not None else None
+                )
             )
 
-            # Обновляем счетчик строк (если метод add вернул словарь)
+            # Добавляем запись в список без перезагрузки всей истории
             if history_item and isinstance(history_item, dict):
-                self.history_manager.update(
-                    history_item['id'],
-                    line_count=line_count
-                )
+                self.history_model.add_item(history_item)
+                self.search_completions.add_entry(history_item)
+                self.history_search.refresh()
 
-                # Обновляем локальную копию для немедленного отображения
-                history_item['line_count'] = line_count
-
-            # Обновляем список
-            self._load_history()
+            self._refresh_stats_if_visible()
 
             # Показываем сообщение об успехе
-            self._show_info(f"Анализ завершен. Строк: {line_count}")
+            message = f"Анализ завершен. Строк: {line_count}"
+            if analyzer.transforms is not None:
+                message += "\n\nСэкономлено преобразованиями:\n" + "\n".join(
+                    f"{TRANSFORM_TITLES[name]}: {format_size(saved)}"
+                    for name, saved in analyzer.transforms.bytes_saved.items()
+                )
+            self._show_info(message)
+
+            # Очищаем старые результаты по политике хранения
+            policy = self._configured_retention_policy()
+            if not policy.is_empty():
+                self._run_retention(policy, manual=False)
 
         except Exception as e:
             self._show_error(f"Ошибка при анализе: {str(e)}")
 
 
-    def _show_error(self, message):
-        """Показывает сообщение об ошибке"""
-        from PySide6.QtWidgets import QMessageBox
-        QMessageBox.critical(self, "Ошибка", message)
+    def _git_index_mode(self):
+        """Список файлов из индекса git: None, "tracked" или "untracked" (с неотслеживаемыми)"""
+        if not self.git_index_checkbox.isChecked():
+            return None
+        return "untracked" if self.git_untracked_checkbox.isChecked() else "tracked"
 
+    def _new_output_file(self, project_path):
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        project_name = project_path.name or "project"
+        return self.history_manager.outputs_dir / f"{project_name}_{timestamp}.txt"
+
+    def _reuse_previous_output(self, previous, source, transforms, git_index):
+        """
+        previous — последний запуск проекта с тем же ключом фильтров
+        (FilterPlan.key). Если анализ закреплён за той же ревизией git,
+        с теми же преобразованиями, и результат на месте, предлагает
+        открыть его вместо повторного анализа. True — открыт.
+
+        Для рабочей папки не предлагается: файлы могли измениться,
+        а проверить это можно только обходом всего дерева.
+        """
+        if source is None or previous is None:
+            return False
+        if not Path(previous["output_file"]).exists():
+            return False
+
+        if (
+            previous.get("git_revision") != source.commit
+            or previous.get("git_index") != git_index
+            or sorted(previous.get("transforms_saved") or {}) != sorted(transforms.names)
+        ):
+            return False
+
+        created_at = previous.get("created_at", "").replace("T", " ")
+        # Коммит зафиксирован — результат совпадёт с прошлым байт в байт
+        reply = QMessageBox.question(
+            self,
+            "Готовый результат",
+            f"Ревизия {source.commit[:12]} с теми же фильтрами уже анализировалась "
+            f"({created_at}).\n\nОткрыть прошлый результат вместо нового анализа?",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.Yes
+        )
+        if reply != QMessageBox.Yes:
+            return False
+
+        self._open_result_file(previous)
+        return True
+
+    def _estimate_from_previous_run(self, previous):
+        """
+        Оценка запуска по прошлому запуску проекта с теми же фильтрами —
+        для предупреждения о большом результате и выбора параллельной
+        записи без обхода папки. None, если такого запуска нет.
+        """
+        if previous is None or not previous.get("output_size"):
+            return None
+
+        estimate = RunEstimate()
+        estimate.output_bytes = previous["output_size"]
+        estimate.line_count = previous.get("line_count") or None
+        estimate.projected_time = previous.get("analysis_time")
+
+        stats = self.history_manager.output_stats.get(Path(previous["output_file"]))
+        if stats is not None:
+            estimate.file_count = stats["file_count"]
+        return estimate
+
+    def _estimate_new_run(self, analyzer):
+        """
+        Оценка запуска без подходящей истории (первый запуск, новые
+        фильтры): ProjectAnalyzer.dry_run по снимку предпросмотра
+        фильтров, если он снят с той же папки, иначе обход, ограниченный
+        RUN_ESTIMATE_TIME_LIMIT_SECONDS. None — оценка не нужна или не удалась.
+        """
+        if LARGE_RUN_WARNING_MB is None and LARGE_RUN_WARNING_SECONDS is None and PARALLEL_MIN_MB is None:
+            return None
+
+        snapshot = None
+        if (
+            analyzer.source is None
+            and self._snapshot is not None
+            and self._snapshot.root_dir == analyzer.root_dir
+        ):
+            snapshot = self._snapshot
 
-    def _show_info(self, message):
-        """Показывает информационное сообщение"""
-        from PySide6.QtWidgets import QMessageBox
-        QMessageBox.information(self, "Информация", message)
-    
-    def _on_search_text_changed(self, text):
-        """Обработчик изменения текста в поле поиска"""
-        if text:
-            self._perform_search()
-        else:
-            self._clear_search()
+        try:
+            return analyzer.dry_run(
+                self.history_manager.recent_throughput(),
+                time_limit=RUN_ESTIMATE_TIME_LIMIT_SECONDS,
+                snapshot=snapshot
+            )
+        except OSError:
+            # Оценка только для предупреждения — сам анализ она не останавливает
+            return None
 
-    def _perform_search(self):
-        """Выполняет поиск по истории"""
-        search_text = self.search_input.text().strip().lower()
-        search_field = self.search_field_combo.currentText()
+    def _on_estimate_clicked(self):
+        """Оценивает результат с текущими настройками в фоновом потоке (ProjectAnalyzer.dry_run)"""
+        project_path_str = self.path_input.text().strip()
+        if not project_path_str or not Path(project_path_str).exists():
+            self._show_error("Укажите существующий путь к проекту")
+            return
 
-        if not search_text:
-            self._clear_search()
+        project_path = Path(project_path_str)
+        revision = self.revision_input.text().strip()
+        if revision and not project_path.is_dir():
+            self._show_error("Ревизию git можно указать только для папки репозитория")
             return
 
-        all_items = self.history_manager.load()
+        # Как и при запуске: без шаблона и настроек сначала подбираем шаблон
+        current_settings = self._get_current_settings()
+        if self.template_combo.currentData() is None and not any(current_settings.values()):
+            self._detect_project_template()
+            current_settings = self._get_current_settings()
+
+        filter_plan = self._current_filter_plan(current_settings)
+        output_file = self._new_output_file(project_path)
+        git_index = self._git_index_mode()
+        throughput = self.history_manager.recent_throughput()
+
+        self.estimate_button.setEnabled(False)
+        self.statusBar().showMessage("Оценка результата...")
 
-        if not all_items:
+        def worker():
+            try:
+                analyzer = ProjectAnalyzer(
+                    root_dir=project_path,
+                    output_file=output_file,
+                    filter_plan=filter_plan,
+                    source=GitRevisionSource(project_path, revision) if revision else None,
+                    use_git_index=git_index is not None,
+                    include_untracked=git_index == "untracked",
+                )
+                try:
+                    estimate = analyzer.dry_run(throughput)
+                finally:
+                    analyzer.close()
+            except Exception as e:
+                self.estimate_ready.emit(None, str(e))
+                return
+            self.estimate_ready.emit(estimate, "")
+
+        threading.Thread(target=worker, name="structurizer-estimate", daemon=True).start()
+
+    def _on_estimate_ready(self, estimate, error):
+        self.estimate_button.setEnabled(True)
+        self.statusBar().clearMessage()
+        if estimate is None:
+            self._show_error(f"Не удалось оценить результат: {error}")
             return
 
-        self.history_list.clear()
+        details = self._estimate_details(estimate)
+        details.append(f"Оценка заняла {estimate.scan_time:.1f} с")
+        self._show_info("Оценка результата:\n\n" + "\n".join(details))
+
+    def _estimate_details(self, estimate):
+        # Неполная оценка (обход прерван по времени) — только нижняя граница
+        about = "≈" if estimate.complete else "не менее"
+        details = []
+        if estimate.file_count:
+            details.append(f"Файлов: {'' if estimate.complete else 'не менее '}{estimate.file_count}")
+        details.append(f"Размер результата: {about} {format_size(estimate.output_bytes)}")
+        if estimate.line_count is not None:
+            details.append(f"Строк: {about} {estimate.line_count}")
+        if estimate.projected_time is not None:
+            details.append(f"Время анализа: {about} {estimate.projected_time:.0f} с")
+        return details
+
+    def _analysis_workers(self, estimate):
+        """
+        Число процессов для записи результата: несколько — только для
+        больших проектов. estimate — по прошлому запуску или dry_run;
+        неполная оценка (обход прерван по времени) означает большое дерево.
+        """
+        if estimate is None or PARALLEL_MIN_MB is None:
+            return 1
+        if estimate.complete and estimate.output_bytes < PARALLEL_MIN_MB * 1024 * 1024:
+            return 1
+        return max(1, ANALYSIS_WORKERS or os.cpu_count() or 1)
+
+    def _confirm_large_run(self, estimate, from_history=True):
+        """
+        Если оценка результата больше порогов из config.py, спрашивает,
+        запускать ли анализ. from_history — оценка по прошлому запуску,
+        иначе по ProjectAnalyzer.dry_run. Обход, не уложившийся в
+        RUN_ESTIMATE_TIME_LIMIT_SECONDS, сам говорит о большом проекте.
+        """
+        if not estimate.complete:
+            return self._ask_large_run(
+                f"Обход папки не уложился в {RUN_ESTIMATE_TIME_LIMIT_SECONDS} с — "
+                "проект очень большой. Уже найдено:",
+                estimate
+            )
+
+        too_big = (
+            LARGE_RUN_WARNING_MB is not None
+            and estimate.output_bytes > LARGE_RUN_WARNING_MB * 1024 * 1024
+        )
+        too_slow = (
+            LARGE_RUN_WARNING_SECONDS is not None
+            and estimate.projected_time is not None
+            and estimate.projected_time > LARGE_RUN_WARNING_SECONDS
+        )
+        if not too_big and not too_slow:
+            return True
+
+        if from_history:
+            return self._ask_large_run("Прошлый запуск с теми же фильтрами дал большой результат:", estimate)
+        return self._ask_large_run("Оценка с текущими фильтрами показывает большой результат:", estimate)
+
+    def _ask_large_run(self, reason, estimate):
+        reply = QMessageBox.warning(
+            self,
+            "Большой результат",
+            reason + "\n\n"
+            + "\n".join(self._estimate_details(estimate))
+            + "\n\nПроверьте фильтры. Всё равно запустить анализ?",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No
+        )
+        return reply == QMessageBox.Yes
+
+    def _configured_retention_policy(self):
+        """Возвращает политику хранения из config.py"""
+        max_total_bytes = None
+        if RETENTION_MAX_TOTAL_MB is not None:
+            max_total_bytes = int(RETENTION_MAX_TOTAL_MB * 1024 * 1024)
+
+        return RetentionPolicy(
+            max_total_bytes=max_total_bytes,
+            max_runs_per_project=RETENTION_MAX_RUNS_PER_PROJECT,
+            max_age_days=RETENTION_MAX_AGE_DAYS,
+        )
 
-        filtered_items = []
-        for item in all_items:
-            match = False
+    def _cleanup_outputs(self):
+        """Удаляет старые файлы результатов по политике хранения"""
+        policy = self._configured_retention_policy()
+
+        if policy.is_empty():
+            # Политика не настроена — спрашиваем лимит запусков на проект
+            max_runs, ok = QInputDialog.getInt(
+                self,
+                "Очистка результатов",
+                "Сколько последних запусков хранить для каждого проекта?",
+                5, 1, 10000
+            )
+            if not ok:
+                return
+            policy = RetentionPolicy(max_runs_per_project=max_runs)
 
-            if search_field == "Все поля":
-                fields = [
-                    item.get('display_name', '').lower(),
-                    item.get('project_path', '').lower(),
-                    item.get('description', '').lower(),
-                ]
-                match = any(search_text in field for field in fields)
+        candidates = self.retention_manager.plan(policy)
+        if not candidates:
+            self._show_info("Нет результатов для очистки")
+            return
 
-            elif search_field == "Название":
-                match = search_text in item.get('display_name', '').lower()
+        reply = QMessageBox.question(
+            self,
+            "Подтверждение",
+            f"Удалить файлы результатов: {len(candidates)}?\n"
+            "Записи останутся в истории с пометкой об удалении.",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply == QMessageBox.Yes:
+            self._run_retention(policy, manual=True)
 
-            elif search_field == "Путь к проекту":
-                match = search_text in item.get('project_path', '').lower()
+    def _run_retention(self, policy, manual):
+        """Запускает очистку в фоновом потоке"""
+        self.retention_manager.run_in_background(
+            policy,
+            on_finished=lambda result: self.retention_finished.emit(result, manual)
+        )
 
-            elif search_field == "Описание":
-                match = search_text in item.get('description', '').lower()
+    def _on_retention_finished(self, result, manual):
+        """Обновляет список после фоновой очистки"""
+        if result.evicted_ids:
+            self._load_history()
+            self.history_search.refresh()
+            self._refresh_stats_if_visible()
+
+        message = (
+            f"Удалено файлов: {len(result.evicted_ids)}, "
+            f"освобождено {result.bytes_reclaimed / (1024 * 1024):.1f} МБ"
+        )
+        if manual:
+            if result.errors:
+                message += "\nОшибки:\n" + "\n".join(result.errors[:10])
+            self._show_info(message)
+        else:
+            self.statusBar().showMessage(message, 10000)
+
+    def _show_error(self, message):
+        """Показывает сообщение об ошибке"""
+        from PySide6.QtWidgets import QMessageBox
+        QMessageBox.critical(self, "Ошибка", message)
 
-            elif search_field == "Дата":
-                # Ищем в дате создания
-                created_at = item.get('created_at', '').lower()
-                match = search_text in created_at
 
-            if match:
-                filtered_items.append(item)
+    def _show_info(self, message):
+        """Показывает информационное сообщение"""
+        from PySide6.QtWidgets import QMessageBox
+        QMessageBox.information(self, "Информация", message)
+    
+    def _on_search_text_changed(self, text):
+        """Обработчик изменения текста в поле поиска"""
+        # Сигнал комбобокса передаёт название поля, поэтому текст берём из поля ввода
+        self.history_search.request(
+            self.search_input.text(),
+            self.search_field_combo.currentText()
+        )
 
-        for item in filtered_items:
-            self._add_history_item_to_list(item)
+    def _on_search_results(self, matching_ids, search_text, found, total):
+        """Применяет результат поиска к списку"""
+        self.history_proxy.set_matching_ids(matching_ids, search_text)
 
-        self._update_search_info(len(filtered_items), len(all_items))
+        if matching_ids is None:
+            self.search_info_label.hide()
+        else:
+            self._update_search_info(found, total)
 
     def _update_search_info(self, found, total):
         """Обновляет информацию о результатах поиска"""
@@ -953,62 +1766,8 @@ class MainWindow(QMainWindow):
     def _clear_search(self):
         """Очищает поиск и показывает все элементы"""
         self.search_input.clear()
-        self.search_info_label.hide()
-        self._load_history()  # Загружаем полный список
-
-    def _add_history_item_to_list(self, item_data):
-        """Добавляет элемент в список истории (вспомогательный метод)"""
-        display_name = item_data.get('display_name', '')
-        if not display_name:
-            project_path = Path(item_data.get('project_path', ''))
-            display_name = project_path.name if project_path.name else str(project_path)
-
-        created_at = item_data.get('created_at', '')
-
-        # Форматируем дату для отображения
-        if created_at:
-            try:
-                from datetime import datetime
-                dt = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                date_str = dt.strftime("%d.%m.%Y %H:%M")
-            except:
-                date_str = created_at
-
-            display_text = f"{display_name} ({date_str})"
-        else:
-            display_text = display_name
+        self.history_search.clear()
 
-        list_item = QListWidgetItem(display_text)
-        list_item.setData(Qt.UserRole, item_data)
-
-        # Подсветка совпадений (опционально)
-        if self.search_input.text():
-            self._highlight_matches(list_item, display_text, item_data)
-
-        self.history_list.addItem(list_item)
-
-    def _highlight_matches(self, list_item, display_text, item_data):
-        """Подсвечивает совпадения в тексте элемента"""
-        search_text = self.search_input.text().lower()
-
-        # Проверяем, есть ли совпадение в разных полях
-        fields_to_check = [
-            item_data.get('display_name', '').lower(),
-            item_data.get('project_path', '').lower(),
-            item_data.get('description', '').lower(),
-        ]
-
-        # Если есть совпадение, подсвечиваем элемент
-        for field in fields_to_check:
-            if search_text in field:
-                # Устанавливаем жирный шрифт для найденных элементов
-                font = list_item.font()
-                font.setBold(True)
-                list_item.setFont(font)
-
-                # Можно добавить цвет фона
-                list_item.setBackground(Qt.yellow)
-                break
     def setup_shortcuts(self):
         """Настраивает горячие клавиши"""
         
@@ -1027,35 +1786,15 @@ class MainWindow(QMainWindow):
     
     def _setup_search_autocomplete(self):
         """Настраивает автодополнение для поиска"""
-        from PySide6.QtCore import QStringListModel
         from PySide6.QtWidgets import QCompleter
 
-        # Создаем модель для автодополнения
+        # Модель обновляется точечно при добавлении, переименовании и удалении
+        self.search_completions = SearchCompletions(self)
+
         self.search_completer = QCompleter()
         self.search_completer.setCaseSensitivity(Qt.CaseInsensitive)
         self.search_completer.setFilterMode(Qt.MatchContains)
-
-        # Устанавливаем модель с данными из истории
-        self._update_search_completer_model()
+        self.search_completer.setModel(self.search_completions.model)
 
         # Настраиваем поле поиска
         self.search_input.setCompleter(self.search_completer)
-
-    def _update_search_completer_model(self):
-        """Обновляет модель автодополнения данными из истории"""
-        items = self.history_manager.load()
-
-        # Собираем уникальные строки для автодополнения
-        completions = set()
-
-        for item in items:
-            completions.add(item.get('display_name', ''))
-            completions.add(Path(item.get('project_path', '')).name)
-            # Можно добавить другие поля
-
-        # Удаляем пустые строки
-        completions = {c for c in completions if c}
-
-        # Создаем и устанавливаем модель
-        model = QStringListModel(sorted(completions))
-        self.search_completer.setModel(model)
@@ -0,0 +1,486 @@
+# ui/output_viewer.py
+
+import mmap
+import os
+from bisect import bisect_right
+from collections import OrderedDict
+from itertools import accumulate
+from pathlib import Path
+from typing import List, Tuple
+
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton,
+    QComboBox, QSpinBox, QAbstractScrollArea
+)
+from PySide6.QtCore import Qt, QThread, Signal
+from PySide6.QtGui import QFontDatabase, QKeySequence, QShortcut, QPainter, QPalette
+
+
+# Смещение запоминается для каждой LINE_STRIDE-й строки: для 2 ГБ файла
+# индекс занимает десятки мегабайт, а до любой строки не больше
+# LINE_STRIDE поисков перевода строки
+LINE_STRIDE = 32
+
+# Размер блока, который индексатор обрабатывает за один шаг
+CHUNK_SIZE = 1024 * 1024
+
+# Длинные строки (минифицированный код) обрезаются при отображении
+MAX_LINE_BYTES = 4096
+
+# Начала строк-заголовков разделов в файле результата
+SECTION_PREFIXES = ("Структура проекта:", "Содержимое ")
+
+
+class LineIndexer(QThread):
+    """
+    Строит разреженный индекс строк файла в фоновом потоке.
+
+    checkpoints[k] — смещение начала строки k * LINE_STRIDE. Список только
+    дополняется, поэтому модель читает его без блокировок; число строк,
+    которым можно пользоваться, приходит сигналом progress.
+    """
+
+    progress = Signal(int, int)          # готовых строк, проиндексировано байт
+    sections_found = Signal(object)      # список (номер строки, заголовок)
+    indexing_finished = Signal(int)      # итоговое число строк
+
+    def __init__(self, file_path: Path, parent=None):
+        super().__init__(parent)
+        self.file_path = Path(file_path)
+        self.checkpoints: List[int] = [0]
+
+    def run(self):
+        size = os.path.getsize(self.file_path)
+        if size == 0:
+            self.indexing_finished.emit(0)
+            return
+
+        needles = [b"\n" + prefix.encode("utf-8") for prefix in SECTION_PREFIXES]
+
+        with open(self.file_path, "rb") as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            lines = 0
+            pos = 0
+            while pos < size:
+                if self.isInterruptionRequested():
+                    return
+
+                end = min(pos + CHUNK_SIZE, size)
+                data = mm[pos:end]
+
+                sections = self._find_sections(mm, data, pos, end, lines, needles)
+
+                # Позиции переводов строк считаются на уровне C:
+                # split + accumulate, а в Python-цикл попадает только
+                # каждая LINE_STRIDE-я строка
+                parts = data.split(b"\n")
+                newlines = len(parts) - 1
+                if newlines:
+                    ends = list(accumulate(map(len, parts[:-1])))
+                    first = (-lines - 1) % LINE_STRIDE
+                    for i in range(first, newlines, LINE_STRIDE):
+                        self.checkpoints.append(pos + ends[i] + i + 1)
+                    lines += newlines
+
+                pos = end
+                if sections:
+                    self.sections_found.emit(sections)
+                self.progress.emit(lines, pos)
+
+            if mm[size - 1:size] != b"\n":
+                lines += 1
+
+        self.indexing_finished.emit(lines)
+
+    def _find_sections(self, mm, data, pos, end, lines, needles) -> List[Tuple[int, str]]:
+        """Ищет заголовки разделов, перевод строки перед которыми лежит в [pos, end)"""
+        hits = []
+        for needle in needles:
+            idx = mm.find(needle, pos, end + len(needle) - 1)
+            while idx != -1:
+                hits.append(idx)
+                idx = mm.find(needle, idx + 1, end + len(needle) - 1)
+        hits.sort()
+
+        # Номера строк считаются нарастающим итогом между соседними находками
+        found = []
+        counted_to = 0
+        for idx in hits:
+            lines += data.count(b"\n", counted_to, idx - pos + 1)
+            counted_to = idx - pos + 1
+
+            line_end = mm.find(b"\n", idx + 1, idx + 1 + MAX_LINE_BYTES)
+            if line_end == -1:
+                line_end = min(idx + 1 + MAX_LINE_BYTES, len(mm))
+            title = mm[idx + 1:line_end].decode("utf-8", errors="replace")
+            found.append((lines, title))
+
+        return found
+
+
+class OutputLines:
+    """
+    Строки файла результата поверх mmap.
+
+    Текст строки читается из отображённого файла только когда его
+    запрашивают для отрисовки, поэтому память не зависит от размера файла.
+    """
+
+    CACHE_SIZE = 512
+
+    def __init__(self, file_path: Path, checkpoints: List[int]):
+        self.file_path = Path(file_path)
+        self.checkpoints = checkpoints
+        self._line_count = 0
+        self._indexed_bytes = 0
+        self._cache: "OrderedDict[int, str]" = OrderedDict()
+
+        self._file = open(self.file_path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+    # =====================
+    # Публичный API
+    # =====================
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    @property
+    def line_count(self) -> int:
+        return self._line_count if self._mm is not None else 0
+
+    def set_indexed(self, line_count: int, indexed_bytes: int) -> None:
+        """Открывает доступ к line_count строкам по мере работы индексатора"""
+        self._indexed_bytes = indexed_bytes
+        self._line_count = max(self._line_count, line_count)
+
+    def line_text(self, row: int) -> str:
+        cached = self._cache.get(row)
+        if cached is not None:
+            self._cache.move_to_end(row)
+            return cached
+
+        start = self.row_offset(row)
+        end = self._mm.find(b"\n", start, start + MAX_LINE_BYTES)
+        truncated = end == -1 and start + MAX_LINE_BYTES < len(self._mm)
+        if end == -1:
+            end = min(start + MAX_LINE_BYTES, len(self._mm))
+
+        text = self._mm[start:end].decode("utf-8", errors="replace").rstrip("\r")
+        text = text.replace("\t", "    ")
+        if truncated:
+            text += " …"
+
+        self._cache[row] = text
+        if len(self._cache) > self.CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return text
+
+    def row_offset(self, row: int) -> int:
+        """Смещение начала строки row в файле"""
+        offset = self.checkpoints[row // LINE_STRIDE]
+        for _ in range(row % LINE_STRIDE):
+            offset = self._mm.find(b"\n", offset) + 1
+        return offset
+
+    def offset_to_row(self, offset: int) -> int:
+        """Номер строки, содержащей байт offset"""
+        cp = bisect_right(self.checkpoints, offset) - 1
+        start = self.checkpoints[cp]
+        row = cp * LINE_STRIDE + self._mm[start:offset].count(b"\n")
+        return min(row, max(self._line_count - 1, 0))
+
+    def find(self, text: str, from_row: int, backwards: bool = False) -> int:
+        """
+        Ищет text (с учётом регистра) в уже проиндексированной части файла,
+        начиная со строки from_row, с переходом через конец. Возвращает
+        номер строки или -1.
+        """
+        if not text or self._mm is None or not self._line_count:
+            return -1
+
+        needle = text.encode("utf-8")
+        limit = self._indexed_bytes
+        start = self.row_offset(min(from_row, self._line_count - 1))
+
+        if backwards:
+            idx = self._mm.rfind(needle, 0, start)
+            if idx == -1:
+                idx = self._mm.rfind(needle, start, limit)
+        else:
+            idx = self._mm.find(needle, start, limit)
+            if idx == -1:
+                idx = self._mm.find(needle, 0, min(start + len(needle) - 1, limit))
+
+        return -1 if idx == -1 else self.offset_to_row(idx)
+
+
+
+class LinesView(QAbstractScrollArea):
+    """
+    Область просмотра, рисующая только строки, попавшие в окно.
+
+    Стандартные QListView/QTreeView при каждом добавлении строк
+    раскладывают все элементы, что на миллионах строк занимает секунды;
+    здесь полоса прокрутки просто считает строки, а paintEvent читает
+    из OutputLines несколько десятков видимых.
+    """
+
+    def __init__(self, lines: OutputLines, parent=None):
+        super().__init__(parent)
+        self.lines = lines
+        self.current_row = -1
+        self._max_width = 0
+
+        self.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        self.setFocusPolicy(Qt.StrongFocus)
+        self.verticalScrollBar().setSingleStep(1)
+
+    # =====================
+    # Публичный API
+    # =====================
+
+    def update_line_count(self) -> None:
+        self._update_scroll_range()
+        self.viewport().update()
+
+    def set_current_row(self, row: int, center: bool = False) -> None:
+        row = max(0, min(row, self.lines.line_count - 1))
+        self.current_row = row
+
+        first = self.verticalScrollBar().value()
+        visible = self._visible_rows()
+        if center:
+            self.verticalScrollBar().setValue(row - visible // 2)
+        elif row < first:
+            self.verticalScrollBar().setValue(row)
+        elif row >= first + visible:
+            self.verticalScrollBar().setValue(row - visible + 1)
+        self.viewport().update()
+
+    # =====================
+    # QAbstractScrollArea
+    # =====================
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        metrics = self.fontMetrics()
+        line_height = metrics.height()
+        x = -self.horizontalScrollBar().value() + 4
+
+        first = self.verticalScrollBar().value()
+        last = min(first + self._visible_rows() + 1, self.lines.line_count)
+        for i, row in enumerate(range(first, last)):
+            y = i * line_height
+            text = self.lines.line_text(row)
+            self._max_width = max(self._max_width, metrics.horizontalAdvance(text))
+
+            if row == self.current_row:
+                painter.fillRect(
+                    0, y, self.viewport().width(), line_height,
+                    self.palette().color(QPalette.Highlight)
+                )
+                painter.setPen(self.palette().color(QPalette.HighlightedText))
+            else:
+                painter.setPen(self.palette().color(QPalette.Text))
+
+            painter.drawText(x, y + metrics.ascent(), text)
+
+        painter.end()
+        self.horizontalScrollBar().setRange(
+            0, max(0, self._max_width + 8 - self.viewport().width())
+        )
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_scroll_range()
+
+    def mousePressEvent(self, event):
+        row = self.verticalScrollBar().value() + int(event.position().y()) // self.fontMetrics().height()
+        if row < self.lines.line_count:
+            self.set_current_row(row)
+
+    def keyPressEvent(self, event):
+        steps = {
+            Qt.Key_Up: -1,
+            Qt.Key_Down: 1,
+            Qt.Key_PageUp: -self._visible_rows(),
+            Qt.Key_PageDown: self._visible_rows(),
+        }
+        if event.key() in steps:
+            self.set_current_row(max(self.current_row, 0) + steps[event.key()])
+        elif event.key() == Qt.Key_Home and event.modifiers() & Qt.ControlModifier:
+            self.set_current_row(0)
+        elif event.key() == Qt.Key_End and event.modifiers() & Qt.ControlModifier:
+            self.set_current_row(self.lines.line_count - 1)
+        else:
+            super().keyPressEvent(event)
+
+    # =====================
+    # Внутренние методы
+    # =====================
+
+    def _visible_rows(self) -> int:
+        return max(1, self.viewport().height() // self.fontMetrics().height())
+
+    def _update_scroll_range(self) -> None:
+        visible = self._visible_rows()
+        scroll_bar = self.verticalScrollBar()
+        scroll_bar.setPageStep(visible)
+        scroll_bar.setRange(0, max(0, self.lines.line_count - visible))
+
+
+class OutputViewer(QDialog):
+    """
+    Встроенный просмотрщик файла результата.
+
+    Файл отображается в память, индекс строк строится в фоне, а список
+    рисует только видимые строки — первый экран многогигабайтного файла
+    появляется сразу, остальные строки подгружаются по мере индексации.
+    """
+
+    def __init__(self, file_path: Path, parent=None):
+        super().__init__(parent)
+        self.file_path = Path(file_path)
+        self._sections: List[Tuple[int, str]] = []
+        self._total_bytes = os.path.getsize(self.file_path)
+
+        self.setWindowTitle(f"Просмотр: {self.file_path.name}")
+        self.resize(900, 700)
+        self.setAttribute(Qt.WA_DeleteOnClose)
+
+        self.indexer = LineIndexer(self.file_path, self)
+        self.lines = OutputLines(self.file_path, self.indexer.checkpoints)
+
+        self._build_ui()
+
+        self.indexer.progress.connect(self._on_index_progress)
+        self.indexer.sections_found.connect(self._on_sections_found)
+        self.indexer.indexing_finished.connect(self._on_index_finished)
+        self.indexer.start()
+
+    def _build_ui(self):
+        layout = QVBoxLayout(self)
+
+        # Панель навигации
+        nav_layout = QHBoxLayout()
+
+        self.line_spin = QSpinBox()
+        self.line_spin.setMinimum(1)
+        self.line_spin.setMaximum(1)
+        self.go_button = QPushButton("Перейти")
+        self.go_button.clicked.connect(self._jump_to_line)
+
+        self.section_combo = QComboBox()
+        self.section_combo.addItem("-- Раздел --")
+        self.section_combo.activated.connect(self._jump_to_section)
+
+        nav_layout.addWidget(QLabel("Строка:"))
+        nav_layout.addWidget(self.line_spin)
+        nav_layout.addWidget(self.go_button)
+        nav_layout.addWidget(self.section_combo, 1)
+        layout.addLayout(nav_layout)
+
+        # Поиск
+        find_layout = QHBoxLayout()
+
+        self.find_input = QLineEdit()
+        self.find_input.setPlaceholderText("Поиск (Enter — далее, Shift+Enter — назад)")
+        self.find_input.textChanged.connect(self._on_find_text_changed)
+        self.find_input.returnPressed.connect(self._find_next)
+        QShortcut(
+            QKeySequence("Shift+Return"), self.find_input,
+            self._find_previous, context=Qt.WidgetShortcut
+        )
+
+        self.find_prev_button = QPushButton("▲")
+        self.find_prev_button.setFixedWidth(30)
+        self.find_prev_button.clicked.connect(self._find_previous)
+        self.find_next_button = QPushButton("▼")
+        self.find_next_button.setFixedWidth(30)
+        self.find_next_button.clicked.connect(self._find_next)
+
+        find_layout.addWidget(self.find_input, 1)
+        find_layout.addWidget(self.find_prev_button)
+        find_layout.addWidget(self.find_next_button)
+        layout.addLayout(find_layout)
+
+        # Строки файла
+        self.view = LinesView(self.lines)
+        layout.addWidget(self.view, 1)
+
+        self.status_label = QLabel("Индексация...")
+        layout.addWidget(self.status_label)
+
+    # =====================
+    # Индексация
+    # =====================
+
+    def _on_index_progress(self, line_count, indexed_bytes):
+        self.lines.set_indexed(line_count, indexed_bytes)
+        self.view.update_line_count()
+        self.line_spin.setMaximum(max(line_count, 1))
+        percent = indexed_bytes * 100 // max(self._total_bytes, 1)
+        self.status_label.setText(f"Индексация: {line_count:,} строк ({percent}%)".replace(",", " "))
+
+    def _on_sections_found(self, sections):
+        self._sections.extend(sections)
+        self.section_combo.addItems([title for _, title in sections])
+
+    def _on_index_finished(self, line_count):
+        self.lines.set_indexed(line_count, self._total_bytes)
+        self.view.update_line_count()
+        self.line_spin.setMaximum(max(line_count, 1))
+        self.status_label.setText(f"Строк: {line_count:,}".replace(",", " "))
+
+    # =====================
+    # Навигация и поиск
+    # =====================
+
+    def _select_row(self, row):
+        if 0 <= row < self.lines.line_count:
+            self.view.set_current_row(row, center=True)
+
+    def _current_row(self):
+        return max(self.view.current_row, 0)
+
+    def _jump_to_line(self):
+        self._select_row(self.line_spin.value() - 1)
+
+    def _jump_to_section(self, combo_index):
+        if combo_index > 0:
+            self._select_row(self._sections[combo_index - 1][0])
+
+    def _on_find_text_changed(self, text):
+        """Инкрементальный поиск: совпадение ищется с текущей строки"""
+        self._show_find_result(self.lines.find(text, self._current_row()))
+
+    def _find_next(self):
+        row = self._current_row() + 1
+        if row >= self.lines.line_count:
+            row = 0
+        self._show_find_result(self.lines.find(self.find_input.text(), row))
+
+    def _find_previous(self):
+        self._show_find_result(
+            self.lines.find(self.find_input.text(), self._current_row(), backwards=True)
+        )
+
+    def _show_find_result(self, row):
+        if row >= 0:
+            self.find_input.setStyleSheet("")
+            self._select_row(row)
+        elif self.find_input.text():
+            self.find_input.setStyleSheet("background-color: #ffdddd;")
+        else:
+            self.find_input.setStyleSheet("")
+
+    def done(self, result):
+        self.indexer.requestInterruption()
+        self.indexer.wait()
+        self.lines.close()
+        super().done(result)
@@ -0,0 +1,128 @@
+# ui/run_diff_dialog.py
+
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QListWidget, QListWidgetItem, QPlainTextEdit, QSplitter
+)
+from PySide6.QtCore import Qt, QThread, Signal
+from PySide6.QtGui import QColor, QFontDatabase
+
+
+class RunCompareWorker(QThread):
+    """Строит манифесты (если их нет в кэше) и сравнивает запуски вне GUI-потока"""
+
+    diff_ready = Signal(object)
+    failed = Signal(str)
+
+    def __init__(self, engine, old_item, new_item, parent=None):
+        super().__init__(parent)
+        self.engine = engine
+        self.old_item = old_item
+        self.new_item = new_item
+
+    def run(self):
+        try:
+            self.diff_ready.emit(self.engine.compare(self.old_item, self.new_item))
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
+class RunDiffDialog(QDialog):
+    """Сравнение двух запусков: список изменённых файлов и diff выбранного"""
+
+    STATUS_COLORS = {
+        "+": QColor("#2e7d32"),
+        "-": QColor("#c62828"),
+        "~": QColor("#1565c0"),
+    }
+
+    def __init__(self, engine, old_item, new_item, parent=None):
+        super().__init__(parent)
+        self.engine = engine
+        self.old_item = old_item
+        self.new_item = new_item
+
+        self.setWindowTitle("Сравнение запусков")
+        self.resize(900, 600)
+
+        self._build_ui()
+
+        self.worker = RunCompareWorker(engine, old_item, new_item, self)
+        self.worker.diff_ready.connect(self._on_diff_ready)
+        self.worker.failed.connect(self._on_failed)
+        self.worker.start()
+
+    def _build_ui(self):
+        layout = QVBoxLayout(self)
+
+        layout.addWidget(QLabel(
+            f"Было: {self.old_item.get('display_name', '')} ({self.old_item.get('created_at', '')})\n"
+            f"Стало: {self.new_item.get('display_name', '')} ({self.new_item.get('created_at', '')})"
+        ))
+
+        self.summary_label = QLabel("Сравнение...")
+        layout.addWidget(self.summary_label)
+
+        splitter = QSplitter(Qt.Horizontal)
+
+        self.files_list = QListWidget()
+        self.files_list.currentItemChanged.connect(self._on_file_selected)
+        splitter.addWidget(self.files_list)
+
+        self.diff_view = QPlainTextEdit()
+        self.diff_view.setReadOnly(True)
+        self.diff_view.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.diff_view.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        splitter.addWidget(self.diff_view)
+        splitter.setSizes([300, 600])
+
+        layout.addWidget(splitter, 1)
+
+        buttons_layout = QHBoxLayout()
+        self.close_button = QPushButton("✕ Закрыть")
+        self.close_button.clicked.connect(self.close)
+        buttons_layout.addStretch()
+        buttons_layout.addWidget(self.close_button)
+        layout.addLayout(buttons_layout)
+
+    # =====================
+    # Обработчики
+    # =====================
+
+    def _on_diff_ready(self, diff):
+        self.summary_label.setText(
+            f"Добавлено: {len(diff.added)}, удалено: {len(diff.removed)}, "
+            f"изменено: {len(diff.changed)}, без изменений: {diff.unchanged_count}"
+        )
+
+        for status, paths in (("~", diff.changed), ("+", diff.added), ("-", diff.removed)):
+            for path in paths:
+                item = QListWidgetItem(f"{status} {path}")
+                item.setData(Qt.UserRole, path)
+                item.setForeground(self.STATUS_COLORS[status])
+                self.files_list.addItem(item)
+
+        if not diff.has_changes:
+            self.diff_view.setPlainText("Содержимое файлов не изменилось")
+
+    def _on_failed(self, message):
+        self.summary_label.setText(f"Не удалось сравнить запуски: {message}")
+
+    def _on_file_selected(self, current, previous):
+        if current is None:
+            return
+
+        # Построчный diff считается только для выбранного файла
+        try:
+            lines = self.engine.file_diff(
+                self.old_item, self.new_item, current.data(Qt.UserRole)
+            )
+        except Exception as e:
+            self.diff_view.setPlainText(f"Не удалось построить diff: {e}")
+            return
+
+        self.diff_view.setPlainText("\n".join(lines))
+
+    def done(self, result):
+        self.worker.wait()
+        super().done(result)
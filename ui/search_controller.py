@@ -0,0 +1,135 @@
+# ui/search_controller.py
+
+from typing import Dict, List, Optional, Set
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from structurizer.ui.history_model import item_matches
+
+
+class HistorySearchController(QObject):
+    """
+    Поиск по истории с задержкой ввода и сужением результатов.
+
+    Запрос выполняется после паузы в наборе текста. Если новый запрос
+    продолжает предыдущий (то же поле, строка начинается с прежней),
+    проверяются только ранее найденные записи. Поиск идёт порциями через
+    цикл событий, и каждый новый запрос отменяет незавершённый.
+    """
+
+    # Найденные id (None — поиск сброшен), строка поиска, найдено, всего
+    results_ready = Signal(object, str, int, int)
+
+    def __init__(self, history_model, delay_ms: int = 200, chunk_size: int = 2000, parent=None):
+        super().__init__(parent)
+        self.history_model = history_model
+        self.chunk_size = chunk_size
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self._start_search)
+
+        self._pending_text = ""
+        self._pending_field = ""
+
+        # Поколение отменяет устаревшие порции поиска
+        self._generation = 0
+
+        # Последний завершённый поиск — основа для сужения
+        self._last_text = ""
+        self._last_field = ""
+        self._last_revision = -1
+        self._last_results: List[Dict] = []
+
+    # =====================
+    # Публичный API
+    # =====================
+
+    def request(self, search_text: str, search_field: str) -> None:
+        """Планирует поиск после паузы в вводе"""
+        self._pending_text = search_text.strip().lower()
+        self._pending_field = search_field
+
+        if not self._pending_text:
+            self.clear()
+            return
+
+        self._timer.start()
+
+    def refresh(self) -> None:
+        """Повторяет текущий поиск сразу (например, после изменения истории)"""
+        if self._pending_text:
+            self._timer.stop()
+            self._start_search()
+
+    def clear(self) -> None:
+        """Отменяет поиск и показывает все записи"""
+        self._timer.stop()
+        self._generation += 1
+        self._pending_text = ""
+        self._last_text = ""
+        self._last_results = []
+
+        total = self.history_model.total_count()
+        self.results_ready.emit(None, "", total, total)
+
+    # =====================
+    # Внутренние методы
+    # =====================
+
+    def _start_search(self) -> None:
+        self._generation += 1
+        generation = self._generation
+
+        search_text = self._pending_text
+        search_field = self._pending_field
+        revision = self.history_model.revision
+
+        can_narrow = (
+            self._last_text
+            and search_field == self._last_field
+            and revision == self._last_revision
+            and search_text.startswith(self._last_text)
+        )
+        # Копия: пока поиск идёт порциями, список модели может измениться
+        candidates = self._last_results if can_narrow else list(self.history_model.items())
+
+        self._search_chunk(generation, search_text, search_field, revision, candidates, 0, [])
+
+    def _search_chunk(
+        self,
+        generation: int,
+        search_text: str,
+        search_field: str,
+        revision: int,
+        candidates: List[Dict],
+        start: int,
+        found: List[Dict],
+    ) -> None:
+        if generation != self._generation:
+            return  # Запрос устарел
+
+        end = min(start + self.chunk_size, len(candidates))
+        for item in candidates[start:end]:
+            if item_matches(item, search_text, search_field):
+                found.append(item)
+
+        if end < len(candidates):
+            QTimer.singleShot(
+                0,
+                lambda: self._search_chunk(
+                    generation, search_text, search_field, revision, candidates, end, found
+                )
+            )
+            return
+
+        self._last_text = search_text
+        self._last_field = search_field
+        self._last_revision = revision
+        self._last_results = found
+
+        matching_ids: Set[Optional[str]] = {item.get('id') for item in found}
+        self.results_ready.emit(
+            matching_ids, search_text, len(found), self.history_model.total_count()
+        )
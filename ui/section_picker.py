@@ -0,0 +1,178 @@
+# ui/section_picker.py
+
+from pathlib import Path
+
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton,
+    QListWidget, QListWidgetItem, QCheckBox, QMessageBox, QApplication
+)
+from PySide6.QtCore import Qt, QThread, Signal
+
+
+class SectionIndexWorker(QThread):
+    """Получает индекс разделов (из кэша или потоковым проходом) вне GUI-потока"""
+
+    index_ready = Signal(object)
+    failed = Signal(str)
+
+    def __init__(self, section_index, output_file, parent=None):
+        super().__init__(parent)
+        self.section_index = section_index
+        self.output_file = output_file
+
+    def run(self):
+        try:
+            index = self.section_index.get(
+                self.output_file, should_stop=self.isInterruptionRequested
+            )
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+
+        # None — диалог закрыт во время сканирования
+        if index is not None:
+            self.index_ready.emit(index)
+
+
+class SectionPickerDialog(QDialog):
+    """Выбор файлов из результата анализа для копирования в буфер обмена"""
+
+    def __init__(self, output_file, section_index, project_path="", parent=None):
+        super().__init__(parent)
+        self.output_file = Path(output_file)
+        self.section_index = section_index
+        self.project_path = project_path
+        self._index = None
+
+        self.setWindowTitle("Копирование файлов из результата")
+        self.resize(600, 500)
+
+        self._build_ui()
+
+        self.worker = SectionIndexWorker(section_index, self.output_file, self)
+        self.worker.index_ready.connect(self._on_index_ready)
+        self.worker.failed.connect(self._on_index_failed)
+        self.worker.start()
+
+    def _build_ui(self):
+        layout = QVBoxLayout(self)
+
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Фильтр по пути файла")
+        self.filter_input.textChanged.connect(self._apply_filter)
+        layout.addWidget(self.filter_input)
+
+        self.sections_list = QListWidget()
+        self.sections_list.itemChanged.connect(self._update_selection_info)
+        layout.addWidget(self.sections_list, 1)
+
+        self.include_tree_checkbox = QCheckBox("Добавить структуру проекта")
+        self.include_tree_checkbox.setChecked(True)
+        self.include_tree_checkbox.toggled.connect(self._update_selection_info)
+        layout.addWidget(self.include_tree_checkbox)
+
+        self.info_label = QLabel("Индексация файла...")
+        layout.addWidget(self.info_label)
+
+        buttons_layout = QHBoxLayout()
+
+        self.copy_button = QPushButton("📋 Копировать выбранные")
+        self.copy_button.setEnabled(False)
+        self.copy_button.clicked.connect(self._copy_selected)
+
+        self.cancel_button = QPushButton("✕ Отмена")
+        self.cancel_button.clicked.connect(self.reject)
+
+        buttons_layout.addStretch()
+        buttons_layout.addWidget(self.copy_button)
+        buttons_layout.addWidget(self.cancel_button)
+        layout.addLayout(buttons_layout)
+
+    # =====================
+    # Обработчики
+    # =====================
+
+    def _on_index_ready(self, index):
+        self._index = index
+        prefix = str(self.project_path).rstrip("/\\")
+
+        self.sections_list.blockSignals(True)
+        for path, start, end in index.get("sections", []):
+            # Пути показываем относительно корня проекта
+            display = path
+            if prefix and path.startswith(prefix):
+                display = path[len(prefix):].lstrip("/\\") or path
+
+            item = QListWidgetItem(display)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Unchecked)
+            item.setData(Qt.UserRole, (start, end))
+            item.setToolTip(path)
+            self.sections_list.addItem(item)
+        self.sections_list.blockSignals(False)
+
+        self.include_tree_checkbox.setEnabled(bool(index.get("tree")))
+        self._update_selection_info()
+
+    def _on_index_failed(self, message):
+        self.info_label.setText(f"Не удалось прочитать файл: {message}")
+
+    def _apply_filter(self, text):
+        text = text.strip().lower()
+        for row in range(self.sections_list.count()):
+            item = self.sections_list.item(row)
+            item.setHidden(bool(text) and text not in item.text().lower())
+
+    def _selected_ranges(self):
+        ranges = []
+        for row in range(self.sections_list.count()):
+            item = self.sections_list.item(row)
+            if item.checkState() == Qt.Checked:
+                ranges.append(item.data(Qt.UserRole))
+        return ranges
+
+    def _include_tree(self):
+        return (
+            self.include_tree_checkbox.isEnabled()
+            and self.include_tree_checkbox.isChecked()
+        )
+
+    def _update_selection_info(self, *args):
+        if self._index is None:
+            return
+
+        ranges = self._selected_ranges()
+        size = sum(end - start for start, end in ranges)
+        if self._include_tree() and self._index.get("tree"):
+            start, end = self._index["tree"]
+            size += end - start
+
+        total = len(self._index.get("sections", []))
+        self.info_label.setText(
+            f"Выбрано файлов: {len(ranges)} из {total}, ~{size / 1024:.1f} КБ"
+        )
+        self.copy_button.setEnabled(bool(ranges) or self._include_tree())
+
+    def _copy_selected(self):
+        try:
+            content = self.section_index.read_sections(
+                self.output_file, self._selected_ranges(), self._include_tree()
+            )
+        except Exception as e:
+            QMessageBox.critical(self, "Ошибка", f"Не удалось прочитать файл:\n{e}")
+            return
+
+        QApplication.clipboard().setText(content)
+        QMessageBox.information(
+            self,
+            "Успешно",
+            f"Выбранные файлы скопированы в буфер обмена.\n"
+            f"Размер: {len(content):,} символов"
+        )
+        self.accept()
+
+    def done(self, result):
+        # Сканирование большого файла прерывается, а не дожидается конца
+        self.worker.requestInterruption()
+        self.worker.wait()
+        super().done(result)
@@ -0,0 +1,54 @@
+# ui/startup_timing.py
+
+"""
+Замеры этапов запуска приложения.
+
+Отсчёт идёт от первого импорта модуля (app.py импортирует его раньше
+PySide6). Отчёт печатается в stderr, если задана переменная окружения
+STRUCTURIZER_STARTUP_TIMING=1.
+"""
+
+import os
+import sys
+import time
+from typing import Iterable, List, Tuple
+
+ENV_VAR = "STRUCTURIZER_STARTUP_TIMING"
+
+_started = time.perf_counter()
+_marks: List[Tuple[str, float]] = []
+_reported = False
+
+
+def enabled() -> bool:
+    return os.environ.get(ENV_VAR, "") not in ("", "0")
+
+
+def mark(name: str) -> None:
+    """Отмечает завершение этапа (повторная отметка игнорируется)"""
+    if not has(name):
+        _marks.append((name, time.perf_counter()))
+
+
+def has(name: str) -> bool:
+    return any(mark_name == name for mark_name, _ in _marks)
+
+
+def elapsed() -> List[Tuple[str, float]]:
+    """Этапы и время от старта в миллисекундах"""
+    return [(name, (moment - _started) * 1000) for name, moment in _marks]
+
+
+def report_when(names: Iterable[str]) -> None:
+    """Печатает отчёт один раз, когда отмечены все этапы из names"""
+    global _reported
+    if _reported or not enabled() or not all(has(name) for name in names):
+        return
+    _reported = True
+
+    previous = 0.0
+    lines = ["Запуск Structurizer:"]
+    for name, ms in elapsed():
+        lines.append(f"  {name:<22} {ms:8.1f} мс  (+{ms - previous:.1f})")
+        previous = ms
+    print("\n".join(lines), file=sys.stderr)